@@ -0,0 +1,87 @@
+"""Check fetched bookings against the expected ones: per-field asserts on dicts, the field checks of
+assert_booking_matches and pydantic models against BookingBatch columns and diff_bookings, and the
+memory each form holds.
+
+Comparing bookings that are already decoded dicts is not faster through a batch, building one costs
+more than the comparisons; what it buys is a smaller retained expected set and every mismatch of a
+run reported per field instead of stopping at the first assert.
+
+Run: python -m benchmarks.bench_booking_diff [--bookings 50000]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from core.data.booking_generator import BookingGenerator
+from core.models.booking import Booking, BookingBatch, booking_mismatches, diff_bookings
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def held_kb(func):
+    # Memory still allocated by what func returns
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def peak_kb(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def assert_dicts(expected, actual):
+    for want, got in zip(expected, actual):
+        assert got["firstname"] == want["firstname"]
+        assert got["lastname"] == want["lastname"]
+        assert got["totalprice"] == want["totalprice"]
+        assert got["depositpaid"] == want["depositpaid"]
+        assert got["bookingdates"]["checkin"] == want["bookingdates"]["checkin"]
+        assert got["bookingdates"]["checkout"] == want["bookingdates"]["checkout"]
+        assert got["additionalneeds"] == want["additionalneeds"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    expected = list(BookingGenerator(seed=1).iter_bookings(args.bookings))
+    # Fetched bookings are decoded from JSON, so they share nothing with the expected payloads
+    fetched_raw = json.dumps(expected).encode()
+    fetched = json.loads(fetched_raw)
+    expected_batch = BookingBatch.from_payloads(expected)
+
+    cases = [
+        ("dict asserts", lambda: assert_dicts(expected, fetched)),
+        ("field checks", lambda: [booking_mismatches(got, want) for want, got in zip(expected, fetched)]),
+        ("pydantic ==", lambda: [Booking.model_validate(item) for item in fetched]
+         == [Booking.model_validate(item) for item in expected]),
+        ("batch build + diff", lambda: diff_bookings(expected_batch, BookingBatch.from_payloads(fetched))),
+    ]
+    batch = BookingBatch.from_payloads(fetched)
+    cases.append(("diff only", lambda: diff_bookings(expected_batch, batch)))
+
+    print(f"{args.bookings} bookings")
+    print(f"{'case':<22}{'ms':>10}{'peak KB':>12}")
+    for name, func in cases:
+        _, peak = peak_kb(func)
+        print(f"{name:<22}{best_of(func) * 1000:>10.1f}{peak:>12.0f}")
+    _, dicts_kb = held_kb(lambda: json.loads(fetched_raw))
+    # Built from its own decoded payloads, which are dropped, so the strings it shares are counted
+    _, batch_kb = held_kb(lambda: BookingBatch.from_payloads(json.loads(fetched_raw)))
+    print(f"held as dicts {dicts_kb:.0f} KB, as a batch {batch_kb:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
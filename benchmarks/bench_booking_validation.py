@@ -0,0 +1,50 @@
+"""Compare response.json() + Model(**dict) with TypeAdapter.validate_json on raw response bytes.
+
+Run: python -m benchmarks.bench_booking_validation [--ids 100000] [--bookings 10000]
+"""
+import argparse
+import json
+import timeit
+
+from core.data.booking_generator import BookingGenerator
+from core.models.booking import Booking, BookingId, BookingResponse, validate_json
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    generator = BookingGenerator(seed=1)
+    ids_raw = json.dumps([{"bookingid": booking_id} for booking_id in range(args.ids)]).encode()
+    bookings = list(generator.iter_bookings(args.bookings))
+    bookings_raw = json.dumps(bookings).encode()
+    responses_raw = [json.dumps({"bookingid": index, "booking": booking}).encode()
+                     for index, booking in enumerate(bookings)]
+
+    cases = [
+        (f"GET /booking ({args.ids} ids)",
+         lambda: [BookingId(**item) for item in json.loads(ids_raw)],
+         lambda: validate_json(list[BookingId], ids_raw)),
+        (f"booking list ({args.bookings} bookings)",
+         lambda: [Booking(**item) for item in json.loads(bookings_raw)],
+         lambda: validate_json(list[Booking], bookings_raw)),
+        (f"POST /booking x{args.bookings}",
+         lambda: [BookingResponse(**json.loads(raw)) for raw in responses_raw],
+         lambda: [validate_json(BookingResponse, raw) for raw in responses_raw]),
+    ]
+
+    print(f"{'case':<34}{'json()+Model(**d) ms':>22}{'validate_json ms':>18}{'speedup':>9}")
+    for name, baseline, fast in cases:
+        assert baseline() == fast()
+        baseline_time, fast_time = best_of(baseline), best_of(fast)
+        print(f"{name:<34}{baseline_time * 1000:>22.1f}{fast_time * 1000:>18.1f}{baseline_time / fast_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cost of Allure reporting per ApiClient call: full per-step reporting against the buffered mode.
+
+An allure-pytest listener and file logger are registered as in a pytest run with --alluredir and
+one test case is open while the client makes N calls. The session's adapter answers from memory,
+so the numbers are reporting overhead on top of the HTTP exchange, not network time.
+
+Run: python -m benchmarks.bench_reporting [--calls 20000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import allure_commons
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import TestResult
+from allure_commons.utils import uuid4
+from allure_pytest.listener import AllureListener
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from core.clients import reporting
+from core.clients.api_client import ApiClient
+
+BOOKING = json.dumps({"firstname": "Jim", "lastname": "Brown", "totalprice": 111, "depositpaid": True,
+                      "bookingdates": {"checkin": "2026-01-01", "checkout": "2026-01-05"},
+                      "additionalneeds": "Breakfast"}).encode()
+
+
+class CannedAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response._content = BOOKING
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def run(mode, calls, report_dir):
+    # mode "none" runs without a listener, as a baseline for what the client costs on its own
+    listener = AllureListener(config=None)
+    file_logger = AllureFileLogger(report_dir)
+    plugins = [] if mode == "none" else [listener, file_logger]
+    for plugin in plugins:
+        allure_commons.plugin_manager.register(plugin)
+    client = ApiClient(base_url="http://bench.invalid", transport=CannedAdapter())
+    test_uuid = uuid4()
+    listener.allure_logger.schedule_test(test_uuid, TestResult(name=f"bench {mode}", uuid=test_uuid))
+    buffer = reporting.StepBuffer().start() if mode == "buffered" else None
+    previous = reporting.use_buffer(buffer)
+    try:
+        started = time.perf_counter()
+        for _ in range(calls):
+            client.get_booking_by_id(1)
+        if buffer is not None:
+            buffer.close()
+            buffer.flush()
+        listener.allure_logger.close_test(test_uuid)
+        elapsed = time.perf_counter() - started
+    finally:
+        reporting.use_buffer(previous)
+        for plugin in plugins:
+            allure_commons.plugin_manager.unregister(plugin)
+    written = sum(entry.stat().st_size for entry in os.scandir(report_dir))
+    files = len(os.listdir(report_dir))
+    return elapsed, files, written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.calls} x get_booking_by_id, adapter answers from memory")
+    print(f"{'mode':<10}{'us/call':>10}{'overhead':>10}{'files':>8}{'written KB':>12}")
+    baseline = None
+    for mode in ("none", "full", "buffered"):
+        with tempfile.TemporaryDirectory() as report_dir:
+            elapsed, files, written = run(mode, args.calls, report_dir)
+        per_call = elapsed / args.calls * 1e6
+        baseline = per_call if baseline is None else baseline
+        print(f"{mode:<10}{per_call:>10.1f}{per_call - baseline:>10.1f}{files:>8}{written / 1024:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare the requests (urllib3) transport with httpx HTTP/1.1 and HTTP/2 under concurrent load.
+
+Every transport gets one adapter shared by all worker threads, as in a load run, and the same
+GET /booking/{id} workload. Runs against the stand-in app served by hypercorn (keep-alive
+HTTP/1.1 and h2c) or, with --base-url, against a real environment where HTTP/2 is negotiated
+through TLS ALPN.
+
+Run: python -m benchmarks.bench_transports [--threads 32] [--requests 3000] [--base-url URL]
+"""
+import argparse
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.clients.api_client import ApiClient
+from core.clients.transport import create_adapter
+from core.data.booking_generator import BookingGenerator
+from core.load.histogram import LatencyHistogram
+from core.server.booking_server import H2BookingServer
+
+TRANSPORTS = ("requests", "http1", "http2")
+
+
+def run(base_url, transport, threads, requests, booking_ids):
+    adapter = create_adapter(transport, pool_maxsize=threads)
+    local = threading.local()
+    histogram = LatencyHistogram()
+    lock = threading.Lock()
+
+    def one(index):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = ApiClient(base_url=base_url, attach_timings=False, transport=adapter)
+        started = time.perf_counter()
+        client.get_booking_by_id(booking_ids[index % len(booking_ids)])
+        elapsed = time.perf_counter() - started
+        with lock:
+            histogram.record(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    protocols = ",".join(sorted(getattr(adapter, "protocols", {"HTTP/1.1": requests})))
+    connections = adapter.stats.snapshot()["new_connections"]
+    adapter.close()
+    return histogram.summary(), requests / elapsed, connections, protocols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--base-url", default=None, help="defaults to a local hypercorn stand-in server")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS))
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        base_url = args.base_url or stack.enter_context(H2BookingServer()).url
+        setup = ApiClient(base_url=base_url, attach_timings=False)
+        booking_ids = [setup.create_booking(booking).json()["bookingid"]
+                       for booking in BookingGenerator(seed=1).iter_bookings(20)]
+
+        print(f"{args.requests} x GET /booking/{{id}} from {args.threads} threads against {base_url}")
+        print(f"{'transport':<10}{'protocol':>10}{'conns':>7}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'p99.9 ms':>10}")
+        for transport in args.transports.split(","):
+            summary, rate, connections, protocols = run(base_url, transport, args.threads, args.requests,
+                                                        booking_ids)
+            print(f"{transport:<10}{protocols:>10}{connections:>7}{rate:>9.0f}{summary['p50_ms']:>9.2f}"
+                  f"{summary['p99_ms']:>9.2f}{summary['p99.9_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,219 @@
-from unittest.mock import Mock
-
 import pytest
-from pytest_mock import mocker
 
 from core.clients.api_client import ApiClient
-from datetime import datetime, timedelta
-from faker import Faker
+from core.clients.cassette import cassette_from_env, cassette_mode, merge_worker_cassettes, set_scope
+from core.clients.reporting import buffer_from_env, current_buffer, use_buffer
+from core.clients.response_cache import cache_from_env
+from core.clients.timing import timing_registry
+from core.clients.token_provider import TokenProvider
+from core.data.booking_registry import BookingRegistry, DataScope
+from core.settings.environments import Environment, load_environment
+from datetime import date, timedelta
+import os
 import random
+import warnings
+
+
+BOOKING_DATA_SEED = int(os.getenv('BOOKING_DATA_SEED') or random.randrange(2 ** 32))
+BOOKING_DATA_DATE = date.fromisoformat(os.getenv('BOOKING_DATA_DATE') or date.today().isoformat())
+
+
+def pytest_report_header():
+    return (f"booking data seed: {BOOKING_DATA_SEED}, base date: {BOOKING_DATA_DATE} "
+            f"(set BOOKING_DATA_SEED and BOOKING_DATA_DATE to reproduce)")
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        # CASSETTE_MODE=replay pytest -m api replays the API suite without the tooling tests
+        if 'api_client' in item.fixturenames:
+            item.add_marker(pytest.mark.api)
+        # With --dist loadgroup every read-only test lands on one worker and reuses its shared bookings
+        if item.get_closest_marker('readonly'):
+            item.add_marker(pytest.mark.xdist_group('readonly'))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # xdist workers send their timings back, the controller writes the merged file
+    state = getattr(node, 'workeroutput', {}).get('api_timings')
+    if state:
+        timing_registry.merge_state(state)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Before any fixture of the test, so session fixtures set up for it record under it too
+    set_scope(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    yield
+    # Innermost wrapper, so the aggregated steps land in this test's Allure result
+    buffer = current_buffer()
+    if buffer is not None:
+        buffer.flush()
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, 'workeroutput'):
+        session.config.workeroutput['api_timings'] = timing_registry.state()
+        return
+    if cassette_mode() == 'record':
+        merge_worker_cassettes()
+    # Per-endpoint timing summary lands next to allure-results so Jenkins can archive both
+    allure_dir = session.config.getoption('allure_report_dir', default=None)
+    if allure_dir and timing_registry.endpoints:
+        target_dir = os.path.dirname(os.path.abspath(allure_dir))
+        timing_registry.write_json(os.path.join(target_dir, 'api-timings.json'))
+
+
+@pytest.fixture(scope="session")
+def local_server():
+    # Flask, NumPy, Faker and httpx are imported by the fixtures that need them, so a run that only
+    # touches some of them does not pay for the rest at collection
+    from core.server.booking_server import LocalBookingServer
+
+    with LocalBookingServer() as server:
+        os.environ['LOCAL_BASE_URL'] = server.url
+        yield server
+
+
+@pytest.fixture
+def server_faults(local_server):
+    yield local_server.faults
+    local_server.faults.reset()
+
+
+@pytest.fixture(scope="session")
+def base_url(request):
+    load_environment()
+    if os.getenv('ENVIRONMENT') == Environment.LOCAL.name:
+        return request.getfixturevalue('local_server').url
+    return ApiClient.base_url_from_env()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def step_buffer():
+    # ALLURE_REPORTING=buffered: steps are aggregated per test instead of written one per call
+    buffer = buffer_from_env()
+    if buffer is None:
+        yield None
+        return
+    previous = use_buffer(buffer.start())
+    yield buffer
+    use_buffer(previous)
+    buffer.close()
+    buffer.flush()
+
+
+@pytest.fixture(autouse=True)
+def full_reporting(request, step_buffer):
+    # Tests marked full_reporting check what reaches Allure per call, so they bypass the buffer
+    if step_buffer is None or not request.node.get_closest_marker('full_reporting'):
+        yield
+        return
+    previous = use_buffer(None)
+    yield
+    use_buffer(previous)
+
+
+@pytest.fixture(scope="session")
+def cassette():
+    cassette = cassette_from_env()
+    yield cassette
+    if cassette is not None:
+        cassette.close()
+
+
+@pytest.fixture(scope="session")
+def response_cache():
+    return cache_from_env()
+
+
+@pytest.fixture(autouse=True)
+def no_cache(request, response_cache):
+    # Tests marked no_cache read server state directly even when API_CACHE is on
+    if response_cache is None or not request.node.get_closest_marker('no_cache'):
+        yield
+        return
+    with response_cache.disabled():
+        yield
 
 
 @pytest.fixture(scope="session")
-def api_client():
-    client = ApiClient()
-    client.auth()
+def api_client(base_url, cassette, response_cache):
+    # The only client whose traffic the performance gate sees; ad-hoc clients against the
+    # stand-in server keep their own registries
+    client = ApiClient(base_url=base_url, cassette=cassette, cache=response_cache, timings=timing_registry)
+    # A cassette must contain the /auth exchange, so the shared token cache is bypassed
+    client.auth(None if cassette else TokenProvider(base_url, fetch=client.fetch_token))
     return client
 
 
+@pytest.fixture(scope="session")
+def data_scope(cassette):
+    # A fixed seed also fixes the namespace, so recorded request bodies match on replay
+    return DataScope(run_id=os.getenv('BOOKING_DATA_SEED'), per_worker=cassette is None)
+
+
+@pytest.fixture(scope="session")
+def worker_bookings(api_client, cassette):
+    registry = BookingRegistry(api_client)
+    yield registry
+    if cassette is None or cassette.mode != 'replay':
+        left = registry.cleanup()
+        if left:
+            warnings.warn(f"Could not delete {len(left)} bookings created by tests: "
+                          f"{', '.join(map(str, left))}")
+
+
 @pytest.fixture
-def booking_dates():
-    today = datetime.today()
-    checkin_date = today + timedelta(days=10)
-    checkout_date = checkin_date + timedelta(days=5)
+def booking_registry(worker_bookings, request):
+    return worker_bookings.for_owner(request.node.nodeid)
+
+
+@pytest.fixture(scope="session")
+def shared_bookings(worker_bookings, data_scope):
+    shared = worker_bookings.for_owner('shared')
+    checkin_date = BOOKING_DATA_DATE + timedelta(days=30)
+    for index in range(3):
+        shared.create({
+            "firstname": data_scope.firstname(f"Shared{index}"),
+            "lastname": "Readonly",
+            "totalprice": 100 + index,
+            "depositpaid": True,
+            "bookingdates": {
+                "checkin": checkin_date.strftime('%Y-%m-%d'),
+                "checkout": (checkin_date + timedelta(days=index + 1)).strftime('%Y-%m-%d')
+            },
+            "additionalneeds": "Breakfast"
+        })
+    return shared.ids
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def async_api_client(anyio_backend, base_url):
+    from core.clients.async_api_client import AsyncApiClient
+
+    async with AsyncApiClient(base_url=base_url) as client:
+        await client.auth()
+        yield client
+
+
+@pytest.fixture(scope="session")
+def booking_generator():
+    from core.data.booking_generator import BookingGenerator
 
-    return {
-        "checkin": checkin_date.strftime('%Y-%m-%d'),
-        "checkout": checkout_date.strftime('%Y-%m-%d')
-    }
+    return BookingGenerator(seed=BOOKING_DATA_SEED, base_date=BOOKING_DATA_DATE)
 
 
 @pytest.fixture
-def generate_random_booking_data(booking_dates):
-    faker = Faker()
-    firstname = faker.first_name()
-    lastname = faker.last_name()
-    totalprice = random.randint(100, 999)
-    depositpaid = faker.boolean()
-    additionalneeds = faker.sentence()
-
-    data = {
-        "firstname": firstname,
-        "lastname": lastname,
-        "totalprice": totalprice,
-        "depositpaid": depositpaid,
-        "bookingdates": booking_dates,
-        "additionalneeds": additionalneeds
-    }
-
-    return data
+def generate_random_booking_data(booking_generator, data_scope, request):
+    return data_scope.apply(booking_generator.for_key(request.node.nodeid))
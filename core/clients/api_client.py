@@ -1,124 +1,252 @@
-from wsgiref import headers
 import requests
 import os
-from dotenv import load_dotenv
-from core.settings.environments import Environment
+import time
+from core.settings.environments import Environment, load_environment
 from core.clients.endpoints import Endpoints
-from core.settings.config import Users, Timeouts
+from core.clients.reporting import attach_json, step
+from core.clients.resilience import is_overload
+from core.clients.transport import create_session
+from core.clients.timing import TimingRegistry, start_timing, stop_timing, endpoint_label
+from core.settings.config import Users, Timeouts, EndpointTimeouts, Pool
 from requests.auth import HTTPBasicAuth
-import allure
-
-load_dotenv()
 
 
 class ApiClient:
-    def __init__(self):
+    def __init__(self, base_url=None, pool_connections=Pool.POOL_CONNECTIONS.value,
+                 pool_maxsize=Pool.POOL_MAXSIZE.value, max_retries=None, timeouts=None,
+                 timings=None, attach_timings=True, cassette=None, cache=None, transport=None, limiter=None, breakers=None):
+        self.base_url = base_url or self.base_url_from_env()
+        # Only clients given the session's timing_registry end up in api-timings.json
+        self.timings = timings if timings is not None else TimingRegistry()
+        self.token_provider = None
+        self.attach_timings = attach_timings
+        self.cache = cache
+        self.limiter = limiter
+        self.breakers = breakers
+        self.timeouts = {endpoint.name: EndpointTimeouts[endpoint.name].value for endpoint in Endpoints}
+        self.timeouts.update(timeouts or {})
+        self.session, self.adapter = create_session(pool_connections=pool_connections,
+                                                    pool_maxsize=pool_maxsize,
+                                                    max_retries=max_retries,
+                                                    cassette=cassette,
+                                                    transport=transport)
+
+    @classmethod
+    def base_url_from_env(cls) -> str:
+        load_environment()
         environment_str = os.getenv('ENVIRONMENT')
         try:
             environment = Environment[environment_str]
         except KeyError:
             raise ValueError(f"Unsupported environment value: {environment_str}")
+        return cls.get_base_url(environment)
 
-        self.base_url = self.get_base_url(environment)
-        self.session = requests.Session()
-
-
-    def get_base_url(self, environment: Environment) -> str:
+    @staticmethod
+    def get_base_url(environment: Environment) -> str:
         if environment == Environment.TEST:
             return os.getenv('TEST_BASE_URL')
         elif environment == Environment.PROD:
             return os.getenv('PROD_BASE_URL')
+        elif environment == Environment.LOCAL:
+            return os.getenv('LOCAL_BASE_URL')
         else:
             raise ValueError(f"Unsupported environment value: {environment}")
 
+    @property
+    def connection_stats(self):
+        return self.adapter.stats
+
+    def timeout_for(self, path):
+        for endpoint in Endpoints:
+            if path.startswith(endpoint.value):
+                return self.timeouts[endpoint.name]
+        return Timeouts.CONNECT_TIMEOUT.value, Timeouts.READ_TIMEOUT.value
+
+    def _request(self, method, path, **kwargs):
+        # ping() is the breakers' half-open probe, so it is never limited or short-circuited itself
+        if (self.limiter is None and self.breakers is None) or path == Endpoints.PING_ENDPOINT.value:
+            return self._exchange(method, path, **kwargs)
+        breaker = self.breakers.get(endpoint_label(method, path)) if self.breakers is not None else None
+        if breaker is not None:
+            breaker.before_request(self._probe)
+        if self.limiter is not None:
+            self.limiter.acquire()
+        started = time.perf_counter()
+        latency, overloaded = None, False
+        try:
+            response = self._exchange(method, path, **kwargs)
+            overloaded = is_overload(response.status_code)
+            latency = time.perf_counter() - started
+            return response
+        except (requests.Timeout, requests.ConnectionError):
+            overloaded = True
+            raise
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(latency, overloaded)
+            if breaker is not None and (overloaded or latency is not None):
+                breaker.record(not overloaded)
+
+    def _probe(self):
+        return self.ping() == 201
+
+    def _exchange(self, method, path, **kwargs):
+        response = self._send(method, path, **kwargs)
+        if response.status_code == 403 and self.token_provider and 'auth' not in kwargs:
+            # The cached token was revoked or expired server-side: refresh once and resend
+            self._refresh_token()
+            response = self._send(method, path, **kwargs)
+        return response
+
+    def _send(self, method, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout_for(path))
+        kwargs.setdefault('verify', False)
+        label = endpoint_label(method, path)
+        timing = start_timing()
+        started = time.perf_counter()
+        try:
+            response = getattr(self.session, method)(f"{self.base_url}{path}", **kwargs)
+        finally:
+            stop_timing()
+        timing.finish(time.perf_counter() - started, response)
+        self.timings.record(label, timing)
+        if self.attach_timings:
+            attach_json(timing.to_dict(), f'Timings {label}')
+        response.timing_label = label
+        return response
+
+    def _cached_get(self, path, params=None):
+        if self.cache is None or not self.cache.enabled:
+            return self._request('get', path, params=params)
+        key = self.cache.key(path, params)
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            return entry.response
+        generation = self.cache.generation
+        headers = {'If-None-Match': entry.etag} if entry else None
+        response = self._request('get', path, params=params, headers=headers)
+        if response.status_code == 304 and entry:
+            self.cache.revalidated(key)
+            return entry.response
+        if entry:
+            # lookup() left a stale entry uncounted until the server answered
+            self.cache.stats.count("misses")
+        self.cache.store(key, response, generation)
+        return response
+
+    def _invalidate(self, booking_id=None):
+        # Any write can change filtered id lists; updates and deletes also stale the booking itself
+        if self.cache is not None:
+            paths = [Endpoints.BOOKING_ENDPOINT.value]
+            if booking_id is not None:
+                paths.append(f"{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}")
+            self.cache.invalidate(*paths)
+
+    def _json(self, response, model=None):
+        # pydantic is only imported once a typed response is actually decoded
+        from core.models.booking import validate_json
+
+        started = time.perf_counter()
+        data = response.json() if model is None else validate_json(model, response.content)
+        self.timings.record_decode(getattr(response, 'timing_label', 'unknown'), time.perf_counter() - started)
+        return data
+
+    @staticmethod
+    def _basic_auth():
+        return HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value)
+
     def get(self, endpoint, params=None, status_code=200):
-        url = self.base_url + endpoint
-        response = requests.get(url, headers=self.headers, params=params, verify=False)
+        response = self._request('get', endpoint, params=params)
         if status_code:
             assert response.status_code == status_code
-        return response.json()
+        return self._json(response)
 
     def post(self, endpoint, data=None, status_code=200):
-        url = self.base_url + endpoint
-        response = requests.post(url, headers=self.headers, json=data, verify=False)
+        response = self._request('post', endpoint, json=data)
         if status_code:
             assert response.status_code == status_code
-        return response.json()
+        return self._json(response)
 
     def ping(self):
-        with allure.step('Ping api client'):
-            url = f"{self.base_url}{Endpoints.PING_ENDPOINT.value}"
-            response = self.session.get(url, verify=False)
+        with step('Ping api client'):
+            response = self._request('get', Endpoints.PING_ENDPOINT.value)
             response.raise_for_status()
-        with allure.step('Assert status code'):
+        with step('Assert status code'):
             assert response.status_code == 201, f"Expected status 201 but got {response.status_code}"
             return response.status_code
 
-    def auth(self):
-        with allure.step('Getting authenticate'):
-            url = f"{self.base_url}{Endpoints.AUTH_ENDPOINT.value}"
+    def fetch_token(self):
+        with step('Getting authenticate'):
             payload = {"username": Users.USERNAME.value, "password": Users.PASSWORD.value}
-            response = self.session.post(url, json=payload, timeout=Timeouts.TIMEOUT.value, verify=False)
+            response = self._request('post', Endpoints.AUTH_ENDPOINT.value, json=payload)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            token = response.json().get("token")
-            with allure.step('Updating header with authorization'):
-                self.session.headers.update({"Authorization": f"Bearer {token}"})
-
-    def get_booking_by_id(self, booking_id):
-        with allure.step('Getting Booking by ID'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}"
-            response = self.session.get(url, verify=False)
+            return self._json(response).get("token")
+
+    def auth(self, token_provider=None):
+        self.token_provider = token_provider
+        token = token_provider.get_token() if token_provider else self.fetch_token()
+        with step('Updating header with authorization'):
+            self.session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def _refresh_token(self):
+        stale_token = self.session.headers.get("Authorization", "").removeprefix("Bearer ")
+        token = self.token_provider.refresh(stale_token)
+        with step('Refreshing authorization after 403'):
+            self.session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def get_booking_by_id(self, booking_id, model=None):
+        with step('Getting Booking by ID'):
+            response = self._cached_get(f"{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}")
             response.raise_for_status()
-        with allure.step('Assert status code'):
+        with step('Assert status code'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            return response.json()
+            return self._json(response, model)
 
     def delete_booking(self, booking_id):
-        with allure.step('Deleting booking'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}"
-            response = self.session.delete(url,
-                                           auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value, verify=False))
+        with step('Deleting booking'):
+            response = self._request('delete', f"{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}",
+                                     auth=self._basic_auth())
+            self._invalidate(booking_id)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 201, f"Expected status 201 but got {response.status_code}"
             return response.status_code == 201
 
-    def create_booking(self, booking_data):
-        with allure.step('Creating booking'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}"
-            response = self.session.post(url, json=booking_data, verify=False)
+    def create_booking(self, booking_data, model=None):
+        with step('Creating booking'):
+            response = self._request('post', Endpoints.BOOKING_ENDPOINT.value, json=booking_data)
+            self._invalidate()
             response.raise_for_status()
-        with allure.step('Operation success check'):
+        with step('Operation success check'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            return response
+            return response if model is None else self._json(response, model)
 
-    def get_bookings_ids(self, params=None):
-        with allure.step('Setting object with bookings'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}"
-            response = self.session.get(url, params=params, verify=False)
+    def get_bookings_ids(self, params=None, model=None):
+        with step('Setting object with bookings'):
+            response = self._cached_get(Endpoints.BOOKING_ENDPOINT.value, params=params)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            return response
+            return response if model is None else self._json(response, model)
 
-    def update_booking(self, booking_id):
-        with allure.step('Updating booking'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}"
-            response = self.session.put(url,
-                                        auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value, verify=False))
+    def update_booking(self, booking_id, booking_data=None, model=None):
+        with step('Updating booking'):
+            response = self._request('put', f"{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}",
+                                     json=booking_data, auth=self._basic_auth())
+            self._invalidate(booking_id)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            return response.json()
+            return self._json(response, model)
 
-    def partial_booking(self, booking_id):
-        with allure.step('Partial Updating booking'):
-            url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}"
-            response = self.session.patch(url,
-                                          auth=HTTPBasicAuth(Users.USERNAME.value, Users.PASSWORD.value, verify=False))
+    def partial_booking(self, booking_id, booking_data=None, model=None):
+        with step('Partial Updating booking'):
+            response = self._request('patch', f"{Endpoints.BOOKING_ENDPOINT.value}/{booking_id}",
+                                     json=booking_data, auth=self._basic_auth())
+            self._invalidate(booking_id)
             response.raise_for_status()
-        with allure.step('Checking status code'):
+        with step('Checking status code'):
             assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
-            return response.json()
+            return self._json(response, model)
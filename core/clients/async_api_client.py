@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+
+from core.clients.api_client import ApiClient
+from core.clients.endpoints import Endpoints
+from core.clients.reporting import step
+from core.settings.config import Users, Timeouts, Concurrency
+
+
+class AsyncApiClient:
+    def __init__(self, base_url=None, max_connections=Concurrency.MAX_CONNECTIONS.value, transport=None):
+        self.base_url = base_url or ApiClient.base_url_from_env()
+        self.client = httpx.AsyncClient(
+            verify=False,
+            timeout=Timeouts.TIMEOUT.value,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _booking_url(self, booking_id=None):
+        url = f"{self.base_url}{Endpoints.BOOKING_ENDPOINT.value}"
+        return url if booking_id is None else f"{url}/{booking_id}"
+
+    @staticmethod
+    def _basic_auth():
+        return Users.USERNAME.value, Users.PASSWORD.value
+
+    async def ping(self):
+        with step('Ping api client'):
+            url = f"{self.base_url}{Endpoints.PING_ENDPOINT.value}"
+            response = await self.client.get(url)
+            response.raise_for_status()
+        with step('Assert status code'):
+            assert response.status_code == 201, f"Expected status 201 but got {response.status_code}"
+            return response.status_code
+
+    async def auth(self):
+        with step('Getting authenticate'):
+            url = f"{self.base_url}{Endpoints.AUTH_ENDPOINT.value}"
+            payload = {"username": Users.USERNAME.value, "password": Users.PASSWORD.value}
+            response = await self.client.post(url, json=payload)
+            response.raise_for_status()
+        with step('Checking status code'):
+            assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+            token = response.json().get("token")
+            with step('Updating header with authorization'):
+                self.client.headers.update({"Authorization": f"Bearer {token}"})
+
+    async def _get_booking_by_id(self, booking_id):
+        response = await self.client.get(self._booking_url(booking_id))
+        response.raise_for_status()
+        assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+        return response.json()
+
+    async def _delete_booking(self, booking_id):
+        response = await self.client.delete(self._booking_url(booking_id), auth=self._basic_auth())
+        response.raise_for_status()
+        assert response.status_code == 201, f"Expected status 201 but got {response.status_code}"
+        return response.status_code == 201
+
+    async def _create_booking(self, booking_data):
+        response = await self.client.post(self._booking_url(), json=booking_data)
+        response.raise_for_status()
+        assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+        return response
+
+    async def get_booking_by_id(self, booking_id):
+        with step('Getting Booking by ID'):
+            return await self._get_booking_by_id(booking_id)
+
+    async def delete_booking(self, booking_id):
+        with step('Deleting booking'):
+            return await self._delete_booking(booking_id)
+
+    async def create_booking(self, booking_data):
+        with step('Creating booking'):
+            return await self._create_booking(booking_data)
+
+    async def get_bookings_ids(self, params=None):
+        with step('Setting object with bookings'):
+            response = await self.client.get(self._booking_url(), params=params)
+            response.raise_for_status()
+        with step('Checking status code'):
+            assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+            return response
+
+    async def update_booking(self, booking_id, booking_data):
+        with step('Updating booking'):
+            response = await self.client.put(self._booking_url(booking_id), json=booking_data,
+                                             auth=self._basic_auth())
+            response.raise_for_status()
+        with step('Checking status code'):
+            assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+            return response.json()
+
+    async def partial_booking(self, booking_id, booking_data):
+        with step('Partial Updating booking'):
+            response = await self.client.patch(self._booking_url(booking_id), json=booking_data,
+                                               auth=self._basic_auth())
+            response.raise_for_status()
+        with step('Checking status code'):
+            assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
+            return response.json()
+
+    @staticmethod
+    async def _bounded_gather(func, items, concurrency, return_exceptions):
+        # gather() keeps input order; the semaphore caps requests in flight
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(item):
+            async with semaphore:
+                return await func(item)
+
+        return await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions)
+
+    async def create_bookings(self, bookings_data, concurrency=Concurrency.BULK_CONCURRENCY.value,
+                              return_exceptions=False):
+        async def create(booking_data):
+            response = await self._create_booking(booking_data)
+            return response.json()
+
+        bookings_data = list(bookings_data)
+        with step(f'Creating {len(bookings_data)} bookings'):
+            return await self._bounded_gather(create, bookings_data, concurrency, return_exceptions)
+
+    async def get_bookings(self, booking_ids, concurrency=Concurrency.BULK_CONCURRENCY.value,
+                           return_exceptions=False):
+        booking_ids = list(booking_ids)
+        with step(f'Getting {len(booking_ids)} bookings by ID'):
+            return await self._bounded_gather(self._get_booking_by_id, booking_ids, concurrency,
+                                              return_exceptions)
+
+    async def delete_bookings(self, booking_ids, concurrency=Concurrency.BULK_CONCURRENCY.value,
+                              return_exceptions=False):
+        booking_ids = list(booking_ids)
+        with step(f'Deleting {len(booking_ids)} bookings'):
+            return await self._bounded_gather(self._delete_booking, booking_ids, concurrency,
+                                              return_exceptions)
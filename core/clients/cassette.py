@@ -0,0 +1,222 @@
+import atexit
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests import ConnectionError, Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from core.settings.config import CassetteSettings
+
+# Layout: MAGIC, then one zlib-compressed record per response, then the compressed JSON index
+# {key: [[offset, length, scope], ...]}, then a footer with the index position and MAGIC again.
+MAGIC = b"RYCASS2\n"
+FOOTER = struct.Struct("<QQ")
+SCRUBBED_HEADERS = {"authorization", "cookie", "set-cookie", "proxy-authorization"}
+SCRUBBED_BODY_FIELDS = {"token", "password"}
+_DUPLICATE_SLASHES = re.compile("/{2,}")
+
+# Responses are recorded under the test that made the request, so a cassette replays no matter
+# which xdist worker runs the test; pytest sets it before each test's setup
+_scope = None
+
+
+def set_scope(scope):
+    global _scope
+    _scope = scope
+
+
+class CassetteMiss(ConnectionError):
+    pass
+
+
+def normalize_body(body):
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        return body
+
+
+def request_key(method, url, body):
+    # Scheme and host are left out so a cassette replays against any base URL of the environment;
+    # a base URL with a trailing slash makes paths like //auth, which are the same request
+    parts = urlsplit(url)
+    path = _DUPLICATE_SLASHES.sub("/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha256(f"{method.upper()} {path}?{query}\n".encode())
+    digest.update(normalize_body(body))
+    return digest.hexdigest()
+
+
+def scrub_headers(headers):
+    return {name: value for name, value in headers.items() if name.lower() not in SCRUBBED_HEADERS}
+
+
+def scrub_body(content):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    if not isinstance(data, dict) or not SCRUBBED_BODY_FIELDS & data.keys():
+        return content
+    return json.dumps({key: "scrubbed" if key in SCRUBBED_BODY_FIELDS else value
+                       for key, value in data.items()}).encode()
+
+
+class CassetteRecorder:
+    mode = "record"
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._index = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def record(self, request, response):
+        meta = {
+            "method": request.method,
+            "url": urlsplit(request.url).path,
+            "request_headers": scrub_headers(request.headers),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": scrub_headers(response.headers),
+        }
+        meta_bytes = json.dumps(meta).encode()
+        payload = zlib.compress(struct.pack("<I", len(meta_bytes)) + meta_bytes + scrub_body(response.content))
+        self.add(request_key(request.method, request.url, request.body), payload, _scope)
+
+    def add(self, key, payload, scope):
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(payload)
+            self._index.setdefault(key, []).append([offset, len(payload), scope])
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            index = zlib.compress(json.dumps(self._index).encode())
+            index_offset = self._file.tell()
+            self._file.write(index)
+            self._file.write(FOOTER.pack(index_offset, len(index)) + MAGIC)
+            self._file.close()
+
+
+class CassettePlayer:
+    mode = "replay"
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_start = len(self._mmap) - FOOTER.size - len(MAGIC)
+        if self._mmap[:len(MAGIC)] != MAGIC or self._mmap[footer_start + FOOTER.size:] != MAGIC:
+            raise ValueError(f"Not a complete cassette file: {path}")
+        index_offset, index_length = FOOTER.unpack_from(self._mmap, footer_start)
+        self._index = json.loads(zlib.decompress(self._mmap[index_offset:index_offset + index_length]))
+        self._plays = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def records(self):
+        # (key, compressed record, scope) in recorded order per key
+        for key, entries in self._index.items():
+            for offset, length, scope in entries:
+                yield key, self._mmap[offset:offset + length], scope
+
+    def play(self, request):
+        key = request_key(request.method, request.url, request.body)
+        entries = self._index.get(key)
+        if not entries:
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url} in {self.path}",
+                               request=request)
+        # The current test's own recordings first; requests of session fixtures run in the setup of
+        # whichever test comes first, so they fall back to the same request from any test
+        scope = _scope
+        scoped = [entry for entry in entries if entry[2] == scope]
+        if not scoped:
+            scope, scoped = None, entries
+        # Repeated identical requests replay in recorded order, then stick to the last response
+        with self._lock:
+            play = self._plays.get((scope, key), 0)
+            self._plays[(scope, key)] = play + 1
+        offset, length, _ = scoped[min(play, len(scoped) - 1)]
+        data = zlib.decompress(self._mmap[offset:offset + length])
+        (meta_length,) = struct.unpack_from("<I", data)
+        meta = json.loads(data[4:4 + meta_length])
+
+        response = Response()
+        response.status_code = meta["status"]
+        response.reason = meta["reason"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = data[4 + meta_length:]
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        return response
+
+    def close(self):
+        self._mmap.close()
+
+
+def cassette_mode():
+    return (os.getenv("CASSETTE_MODE") or "off").lower()
+
+
+def cassette_path(worker=None):
+    path = os.getenv("CASSETTE_PATH") or CassetteSettings.PATH.value
+    if worker:
+        root, extension = os.path.splitext(path)
+        path = f"{root}-{worker}{extension}"
+    return path
+
+
+def cassette_from_env():
+    mode = cassette_mode()
+    if mode == "off":
+        return None
+    if mode == "record":
+        # Each xdist worker writes its own file and the controller merges them at session end
+        return CassetteRecorder(cassette_path(os.getenv("PYTEST_XDIST_WORKER")))
+    if mode == "replay":
+        return CassettePlayer(cassette_path())
+    raise ValueError(f"Unsupported CASSETTE_MODE value: {mode}")
+
+
+def merge_worker_cassettes():
+    # Replaces the cassette with the merged recordings of every xdist worker, which are removed
+    path = cassette_path()
+    root, extension = os.path.splitext(path)
+    worker_paths = sorted(glob.glob(f"{glob.escape(root)}-gw*{glob.escape(extension)}"))
+    if not worker_paths:
+        return None
+    merged = CassetteRecorder(path)
+    for worker_path in worker_paths:
+        player = CassettePlayer(worker_path)
+        for key, payload, scope in player.records():
+            merged.add(key, payload, scope)
+        player.close()
+        os.remove(worker_path)
+    merged.close()
+    return path
@@ -0,0 +1,269 @@
+import os
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+from requests import ConnectionError, ConnectTimeout, ReadTimeout, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+from urllib3.util.retry import Retry
+
+from core.clients.timing import current_timing
+from core.clients.transport import ConnectionStats
+from core.settings.config import Pool, Transport
+
+# httpcore trace event -> RequestTiming phase; DNS happens inside connect_tcp and is counted there
+TRACE_PHASES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "send_connection_init": "send",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "server",
+}
+# Connection-specific headers are illegal in HTTP/2 and meaningless to httpx's own pooling
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+def _internal(obj, name):
+    # httpcore has no public way to reach its connections; these attributes are those of the
+    # httpcore pinned in requirements.txt, and a version without them must not go unnoticed
+    try:
+        return getattr(obj, name)
+    except AttributeError:
+        raise RuntimeError(f"httpcore {httpcore.__version__} has no {type(obj).__name__}.{name}, "
+                           f"HttpxAdapter needs the httpcore version pinned in requirements.txt") from None
+
+
+def _pool_connections(client):
+    return list(_internal(_internal(client._transport, "_pool"), "connections"))
+
+
+def h2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpxAdapter(BaseAdapter):
+    # Mounted on a requests.Session in place of PooledAdapter, so ApiClient, auth, cassettes and
+    # mocks keep working while requests go through httpx. With http2=True concurrent requests to
+    # one origin share a connection: TLS origins negotiate HTTP/2 through ALPN, cleartext origins
+    # are tried with prior knowledge and fall back to HTTP/1.1 if the server rejects the preface.
+    # One adapter can be shared by many ApiClients so their requests multiplex.
+
+    def __init__(self, http2=True, stats=None, cassette=None, max_connections=Pool.POOL_MAXSIZE.value,
+                 max_retries=None):
+        super().__init__()
+        self.http2 = http2 and h2_available()
+        self.stats = stats or ConnectionStats()
+        self.cassette = cassette
+        self.max_retries = Retry.from_int(max_retries) if max_retries is not None else None
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.protocols = {}
+        self._clients = {}
+        self._http1_origins = set()
+        self._http2_origins = set()
+        self._lock = threading.Lock()
+        # The stream lock the current thread holds, if any
+        self._held = threading.local()
+
+    def _client(self, prior_knowledge, verify, cert=None, proxy=None):
+        key = (prior_knowledge, verify, cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # Proxies come from requests, which has already merged the session's and the
+                # environment's, so httpx does not read the environment again
+                client = httpx.Client(http1=not prior_knowledge, http2=self.http2,
+                                      verify=self._ssl_context(verify, cert), proxy=proxy, trust_env=False,
+                                      limits=self.limits, follow_redirects=False)
+                self._clients[key] = client
+            return client
+
+    @staticmethod
+    def _ssl_context(verify, cert):
+        # requests passes a CA bundle path and a client certificate path or (cert, key) pair,
+        # httpx wants an SSL context
+        if isinstance(verify, str):
+            context = (ssl.create_default_context(capath=verify) if os.path.isdir(verify)
+                       else ssl.create_default_context(cafile=verify))
+        elif cert is None:
+            return verify
+        else:
+            context = httpx.create_ssl_context(verify=verify)
+        if cert is not None:
+            context.load_cert_chain(*((cert,) if isinstance(cert, str) else cert))
+        return context
+
+    def _lock_stream_ids(self):
+        # httpcore's sync HTTP/2 picks the next stream id without a lock, so two threads can open
+        # the same stream and the server drops the connection. Each HTTP/2 connection gets a lock
+        # held from picking a stream id until its HEADERS are sent, installed when the connection
+        # sends its preface and so before its first stream; connecting, TLS and waiting for the
+        # response all happen outside it, and responses still multiplex
+        with self._lock:
+            for client in self._clients.values():
+                for connection in _pool_connections(client):
+                    h2_connection = _internal(connection, "_connection")
+                    if not isinstance(h2_connection, httpcore.HTTP2Connection):
+                        continue
+                    state = _internal(h2_connection, "_h2_state")
+                    if not hasattr(state, "stream_lock"):
+                        state.stream_lock = threading.Lock()
+                        state.get_next_available_stream_id = self._locked(
+                            state.stream_lock, state.get_next_available_stream_id)
+
+    def _locked(self, lock, next_stream_id):
+        def get_next_available_stream_id():
+            lock.acquire()
+            self._held.lock = lock
+            try:
+                return next_stream_id()
+            except BaseException:
+                self._release_stream()
+                raise
+
+        return get_next_available_stream_id
+
+    def _release_stream(self):
+        lock = getattr(self._held, "lock", None)
+        if lock is not None:
+            self._held.lock = None
+            lock.release()
+
+    def _trace(self):
+        timing = current_timing()
+        started = {}
+
+        def trace(event, info):
+            name, _, state = event.rpartition(".")
+            step = name.split(".", 1)[-1]
+            if state == "started":
+                if step == "send_connection_init":
+                    self._lock_stream_ids()
+                started[step] = time.perf_counter()
+            elif state == "complete":
+                if step == "connect_tcp":
+                    self.stats.connection_opened()
+                elif step == "send_request_headers":
+                    self._release_stream()
+                phase = TRACE_PHASES.get(step)
+                if timing is not None and phase and step in started:
+                    setattr(timing, phase, getattr(timing, phase) + time.perf_counter() - started[step])
+
+        return trace
+
+    @staticmethod
+    def _timeout(timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+        return httpx.Timeout(timeout)
+
+    def _send_once(self, request, timeout, verify, cert=None, proxy=None):
+        origin = urlsplit(request.url)
+        headers = [(name, value) for name, value in request.headers.items()
+                   if name.lower() not in HOP_BY_HOP_HEADERS]
+        resends = 0
+        while True:
+            prior_knowledge = (self.http2 and origin.scheme == "http"
+                               and origin.netloc not in self._http1_origins)
+            try:
+                try:
+                    response = self._client(prior_knowledge, verify, cert, proxy).request(
+                        request.method, request.url, headers=headers, content=request.body,
+                        timeout=self._timeout(timeout), extensions={"trace": self._trace()})
+                finally:
+                    # Sending HEADERS failed after a stream id was picked
+                    self._release_stream()
+            except (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError) as error:
+                if self._resendable(request, error) and resends < Transport.GOAWAY_RESENDS.value:
+                    resends += 1
+                    continue
+                if not prior_knowledge or origin.netloc in self._http2_origins:
+                    raise
+                # The server has never answered h2c, so it rejected the preface without parsing the
+                # request and resending over HTTP/1.1 is safe; the origin is not tried with h2c again
+                self._http1_origins.add(origin.netloc)
+                continue
+            if prior_knowledge:
+                self._http2_origins.add(origin.netloc)
+            return response
+
+    def _resendable(self, request, error):
+        # Servers send GOAWAY after a number of requests per connection (nginx and hypercorn
+        # default to 1000). httpcore moves streams the server never accepted to a new connection
+        # itself, but fails the ones still waiting for their response; only idempotent requests
+        # can be sent again. httpx keeps the httpcore error, carrying the h2 event, as the cause
+        if not self.http2 or request.method not in Retry.DEFAULT_ALLOWED_METHODS or error.__cause__ is None:
+            return False
+        from h2.events import ConnectionTerminated
+
+        return bool(error.__cause__.args) and isinstance(error.__cause__.args[0], ConnectionTerminated)
+
+    def _retry_after(self, request, status, attempt):
+        retry = self.max_retries
+        if (retry is None or not retry.total or not retry.status_forcelist or attempt >= retry.total
+                or request.method not in retry.allowed_methods or status not in retry.status_forcelist):
+            return None
+        return retry.backoff_factor * (2 ** attempt) if attempt else 0.0
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self.cassette.play(request)
+        proxy = select_proxy(request.url, proxies) if proxies else None
+        attempt = 0
+        while True:
+            self.stats.request_sent()
+            try:
+                raw = self._send_once(request, timeout, verify, cert, proxy)
+            except httpx.ConnectTimeout as error:
+                raise ConnectTimeout(error, request=request)
+            except httpx.TimeoutException as error:
+                raise ReadTimeout(error, request=request)
+            except httpx.TransportError as error:
+                raise ConnectionError(error, request=request)
+            delay = self._retry_after(request, raw.status_code, attempt)
+            if delay is None:
+                break
+            time.sleep(delay)
+            attempt += 1
+
+        with self._lock:
+            self.protocols[raw.http_version] = self.protocols.get(raw.http_version, 0) + 1
+        response = self.build_response(request, raw)
+        if self.cassette is not None:
+            self.cassette.record(request, response)
+        return response
+
+    @staticmethod
+    def build_response(request, raw):
+        response = Response()
+        response.status_code = raw.status_code
+        response.reason = raw.reason_phrase
+        response.headers = CaseInsensitiveDict(raw.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = raw.content
+        response.url = request.url
+        response.request = request
+        response.http_version = raw.http_version
+        return response
+
+    def open_connections(self):
+        # httpcore keeps every open connection, idle or busy, in the pool's connection list
+        with self._lock:
+            clients = list(self._clients.values())
+        return sum(len(_pool_connections(client)) for client in clients)
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
@@ -0,0 +1,246 @@
+import collections
+import contextlib
+import contextvars
+import json
+import threading
+import time
+
+from core.load.histogram import LatencyHistogram
+from core.settings.config import Reporting
+
+# Allure is imported on first use: under pytest allure-pytest has loaded it already, load
+# scripts and CLIs that only use the clients never pay for it
+
+# The StepBuffer steps and attachments go to instead of Allure, None for full reporting
+_buffer = None
+# Titles of the buffered steps open around the current code. A context variable rather than a
+# thread local, since AsyncApiClient keeps steps open across awaits and coroutines on one loop
+# share a thread; each asyncio task gets its own copy, each new thread starts empty
+_step_path = contextvars.ContextVar("buffered_step_path", default=())
+
+
+def _allure():
+    import allure
+
+    return allure
+
+
+def step(title):
+    buffer = _buffer
+    if buffer is not None:
+        return BufferedStep(buffer, title)
+    return _allure().step(title)
+
+
+def attach_json(data, name):
+    buffer = _buffer
+    if buffer is not None:
+        buffer.attached(name)
+        return
+    allure = _allure()
+    allure.attach(json.dumps(data), name=name, attachment_type=allure.attachment_type.JSON)
+
+
+def current_buffer():
+    return _buffer
+
+
+def use_buffer(buffer):
+    # Installs the buffer for every thread and returns the previous one
+    global _buffer
+    previous, _buffer = _buffer, buffer
+    return previous
+
+
+def buffer_from_env():
+    if Reporting.MODE.value != 'buffered':
+        return None
+    return StepBuffer()
+
+
+class StepFailed(Exception):
+    pass
+
+
+class StepAggregate:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.failures = 0
+        self.samples = []
+
+    def add(self, duration, error, sample_every, max_samples):
+        self.histogram.record(duration)
+        if error is not None:
+            self.failures += 1
+        # Failures are always worth seeing on their own, successes only every Nth call
+        sampled = error is not None or (sample_every and self.histogram.count % sample_every == 0)
+        if sampled and len(self.samples) < max_samples:
+            self.samples.append((self.histogram.count, duration, error))
+
+    def describe(self, title):
+        summary = self.histogram.summary()
+        text = f"{title} ×{self.histogram.count}, p50={summary['p50_ms']:.1f} ms, p99={summary['p99_ms']:.1f} ms"
+        if self.failures:
+            text += f", {self.failures} failed"
+        return text
+
+    def to_dict(self):
+        return {**self.histogram.summary(), "failures": self.failures}
+
+
+class BufferedStep:
+    __slots__ = ("buffer", "title", "started", "path", "token")
+
+    def __init__(self, buffer, title):
+        self.buffer = buffer
+        self.title = title
+
+    def __enter__(self):
+        self.path = _step_path.get() + (self.title,)
+        self.token = _step_path.set(self.path)
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter() - self.started
+        error = None
+        if exc_type is not None:
+            error = (issubclass(exc_type, AssertionError), f"{exc_type.__name__}: {exc_val}")
+        self.buffer.record(self.path, duration, error)
+        _step_path.reset(self.token)
+
+
+class StepBuffer:
+    # Recording a step is one append to a bounded deque, which is atomic, so client threads never
+    # lock. A background thread folds the records into per-step aggregates; flush() writes those to
+    # Allure from the calling thread, since Allure ties steps to the thread running the test. When
+    # the buffer is full the oldest records are dropped and counted
+
+    def __init__(self, capacity=Reporting.BUFFER_SIZE.value, interval=Reporting.DRAIN_INTERVAL.value,
+                 sample_every=Reporting.SAMPLE_EVERY.value, max_samples=Reporting.MAX_SAMPLES.value):
+        self.capacity = capacity
+        self.interval = interval
+        self.sample_every = sample_every
+        self.max_samples = max_samples
+        self.aggregates = {}
+        self.attachments = collections.Counter()
+        self.dropped = 0
+        self._records = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="allure-step-buffer", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def record(self, path, duration, error=None):
+        if len(self._records) >= self.capacity:
+            with self._lock:
+                self.dropped += 1
+        self._records.append((path, duration, error))
+
+    def attached(self, name):
+        with self._lock:
+            self.attachments[name] += 1
+
+    def drain(self):
+        records = self._records
+        with self._lock:
+            while records:
+                try:
+                    path, duration, error = records.popleft()
+                except IndexError:
+                    break
+                aggregate = self.aggregates.get(path)
+                if aggregate is None:
+                    aggregate = self.aggregates[path] = StepAggregate()
+                aggregate.add(duration, error, self.sample_every, self.max_samples)
+
+    def take(self):
+        # Everything aggregated so far, leaving the buffer empty for the next test or batch
+        self.drain()
+        with self._lock:
+            aggregates, self.aggregates = self.aggregates, {}
+            attachments, self.attachments = self.attachments, collections.Counter()
+            dropped, self.dropped = self.dropped, 0
+        return aggregates, attachments, dropped
+
+    def flush(self):
+        aggregates, attachments, dropped = self.take()
+        if not aggregates and not attachments:
+            return {}
+        allure = _allure()
+        self._emit(allure, self._tree(aggregates))
+        summary = {
+            "steps": {" / ".join(path): aggregate.to_dict() for path, aggregate in aggregates.items()},
+            "attachments": dict(attachments),
+            "dropped": dropped,
+        }
+        allure.attach(json.dumps(summary), name="Buffered steps", attachment_type=allure.attachment_type.JSON)
+        return summary
+
+    @staticmethod
+    def _tree(aggregates):
+        # Nested steps finish, and are recorded, before their parent; rebuild the nesting from paths
+        root = {}
+        for path, aggregate in aggregates.items():
+            node = root
+            for title in path[:-1]:
+                node = node.setdefault(title, [None, {}])[1]
+            node.setdefault(path[-1], [None, {}])[0] = aggregate
+        return root
+
+    def _emit(self, allure, nodes):
+        for title, (aggregate, children) in nodes.items():
+            try:
+                with allure.step(aggregate.describe(title) if aggregate else title):
+                    for index, duration, error in aggregate.samples if aggregate else ():
+                        self._emit_sample(allure, f"{title} #{index}, {duration * 1000:.1f} ms", error)
+                    self._emit(allure, children)
+                    if aggregate and aggregate.failures:
+                        raise StepFailed(f"{aggregate.failures} of {aggregate.histogram.count} failed")
+            except StepFailed:
+                pass
+
+    @staticmethod
+    def _emit_sample(allure, title, error):
+        try:
+            with allure.step(title):
+                if error is not None:
+                    assertion, message = error
+                    raise (AssertionError if assertion else StepFailed)(message)
+        except (AssertionError, StepFailed):
+            pass
+
+
+@contextlib.contextmanager
+def buffered(**buffer_kwargs):
+    # with buffered(): ... routes steps into a StepBuffer and writes the aggregates to Allure on exit
+    buffer = StepBuffer(**buffer_kwargs).start()
+    previous = use_buffer(buffer)
+    try:
+        yield buffer
+    finally:
+        use_buffer(previous)
+        buffer.close()
+        buffer.flush()
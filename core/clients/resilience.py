@@ -0,0 +1,184 @@
+import threading
+import time
+
+from requests import ConnectionError
+
+from core.settings.config import AdaptiveConcurrency, CircuitBreakerSettings
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+def is_overload(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+class AdaptiveLimiter:
+    # AIMD on the number of requests in flight: every success within the latency tolerance adds
+    # 1/limit (about +1 per round trip of a full window), a timeout, 429 or 5xx multiplies the limit
+    # by BACKOFF. Requests already in flight when the limit was cut report the same congestion,
+    # so there is at most one cut per baseline round trip
+
+    def __init__(self, initial_limit=AdaptiveConcurrency.INITIAL_LIMIT.value,
+                 min_limit=AdaptiveConcurrency.MIN_LIMIT.value, max_limit=AdaptiveConcurrency.MAX_LIMIT.value,
+                 backoff=AdaptiveConcurrency.BACKOFF.value,
+                 latency_tolerance=AdaptiveConcurrency.LATENCY_TOLERANCE.value, smoothing=0.05,
+                 clock=time.monotonic):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.clock = clock
+        self.limit = float(initial_limit)
+        self.peak_limit = self.limit
+        self.in_flight = 0
+        self.baseline = None
+        self.increases = 0
+        self.decreases = 0
+        self._started = self._changed = self.clock()
+        self._last_decrease = None
+        self._limit_seconds = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency=None, overloaded=False):
+        # latency=None and overloaded=False releases the slot without adjusting the limit
+        with self._condition:
+            self.in_flight -= 1
+            now = self.clock()
+            if overloaded:
+                window = self.baseline or latency or 0.0
+                if self._last_decrease is None or now - self._last_decrease >= window:
+                    self._last_decrease = now
+                    self.decreases += 1
+                    self._set_limit(max(self.min_limit, self.limit * self.backoff), now)
+            elif latency is not None:
+                if self.baseline is None:
+                    self.baseline = latency
+                if latency <= self.baseline * self.latency_tolerance and self.limit < self.max_limit:
+                    before = int(self.limit)
+                    self._set_limit(min(self.max_limit, self.limit + 1 / self.limit), now)
+                    if int(self.limit) > before:
+                        self.increases += 1
+                self.baseline += self.smoothing * (latency - self.baseline)
+            self._condition.notify_all()
+
+    def _set_limit(self, limit, now):
+        self._limit_seconds += self.limit * (now - self._changed)
+        self._changed = now
+        self.limit = limit
+        self.peak_limit = max(self.peak_limit, limit)
+
+    def snapshot(self):
+        with self._condition:
+            now = self.clock()
+            elapsed = now - self._started
+            limit_seconds = self._limit_seconds + self.limit * (now - self._changed)
+            return {
+                "limit": int(self.limit),
+                "peak_limit": int(self.peak_limit),
+                "mean_limit": round(limit_seconds / elapsed, 2) if elapsed else float(int(self.limit)),
+                "in_flight": self.in_flight,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "baseline_ms": round(self.baseline * 1000, 3) if self.baseline is not None else None,
+            }
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=CircuitBreakerSettings.FAILURE_THRESHOLD.value,
+                 reset_timeout=CircuitBreakerSettings.RESET_TIMEOUT.value, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self, probe=None):
+        # Once reset_timeout has passed one caller moves the breaker to half-open and runs the
+        # probe; everyone else keeps failing fast until it closes. Without a probe the request
+        # itself is the trial and record() decides
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN or self.clock() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for {self.name} is {self.state}")
+            self.state = self.HALF_OPEN
+        if probe is None:
+            return
+        try:
+            healthy = bool(probe())
+        except Exception:
+            healthy = False
+        with self._lock:
+            if healthy:
+                self._close()
+                return
+            self._open()
+            self.rejected += 1
+        raise CircuitOpenError(f"Circuit for {self.name} is open, probe failed")
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                if self.state == self.HALF_OPEN:
+                    self._close()
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED
+                                                and self.failures >= self.failure_threshold):
+                self._open()
+
+    def _open(self):
+        # A failed half-open trial re-opens the same trip
+        if self.state == self.CLOSED:
+            self.trips += 1
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "trips": self.trips,
+                    "rejected": self.rejected}
+
+
+class CircuitBreakers:
+    # One breaker per endpoint label ("GET /booking/{id}"), created on first use and shared by
+    # every client holding this registry
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, **self.breaker_kwargs))
+        return breaker
+
+    def snapshot(self):
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
@@ -0,0 +1,142 @@
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from core.settings.config import ResponseCacheSettings
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.revalidated
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CacheEntry:
+    __slots__ = ("response", "etag", "expires", "size")
+
+    def __init__(self, response, expires):
+        self.response = response
+        self.etag = response.headers.get("ETag")
+        self.expires = expires
+        self.size = len(response.content)
+
+
+class ResponseCache:
+    # LRU over successful GET responses, bounded by entry count and body bytes. Entries past their
+    # TTL are kept while they carry an ETag, so the next read can revalidate with If-None-Match
+
+    def __init__(self, max_entries=ResponseCacheSettings.MAX_ENTRIES.value,
+                 max_bytes=ResponseCacheSettings.MAX_BYTES.value, ttl=ResponseCacheSettings.TTL.value,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.enabled = True
+        self.stats = CacheStats()
+        self.size = 0
+        # Bumped on every invalidation so a GET that was in flight meanwhile is not stored
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(path, params=None):
+        return path, tuple(sorted((params or {}).items()))
+
+    def lookup(self, key):
+        # Returns (entry, fresh); a stale entry is only returned when it can be revalidated, and is
+        # counted by the caller once the conditional GET shows whether it was still current
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= self.clock() and not entry.etag:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.stats.count("misses")
+                return None, False
+            self._entries.move_to_end(key)
+            fresh = entry.expires > self.clock()
+        if fresh:
+            self.stats.count("hits")
+        return entry, fresh
+
+    def store(self, key, response, generation=None):
+        if response.status_code != 200 or len(response.content) > self.max_bytes:
+            return
+        entry = CacheEntry(response, self.clock() + self.ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += entry.size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats.count("evictions")
+
+    def revalidated(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = self.clock() + self.ttl
+        self.stats.count("revalidated")
+        return entry
+
+    def invalidate(self, *paths):
+        # Drops every cached query string of the given paths
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._entries if key[0] in paths]
+            for key in keys:
+                self._remove(key)
+        if keys:
+            self.stats.count("invalidations", len(keys))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    @contextlib.contextmanager
+    def disabled(self):
+        previous, self.enabled = self.enabled, False
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+    def _remove(self, key):
+        self.size -= self._entries.pop(key).size
+
+
+def cache_from_env():
+    if (os.getenv("API_CACHE") or "off").lower() in ("off", "0", "false", "no"):
+        return None
+    return ResponseCache()
@@ -0,0 +1,211 @@
+import json
+import re
+import socket
+import threading
+import time
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import ConnectTimeoutError
+
+from core.load.histogram import LatencyHistogram
+
+
+PHASES = ("dns", "connect", "tls", "send", "server", "transfer", "total")
+
+_local = threading.local()
+
+
+class RequestTiming:
+    __slots__ = PHASES + ("decode", "bytes_in", "bytes_out")
+
+    def __init__(self):
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.decode = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def finish(self, total, response):
+        self.total = total
+        network = self.dns + self.connect + self.tls + self.send + self.server
+        self.transfer = max(total - network, 0.0)
+        body = getattr(getattr(response, "request", None), "body", None)
+        content = getattr(response, "content", None)
+        self.bytes_out = len(body) if isinstance(body, (bytes, str)) else 0
+        self.bytes_in = len(content) if isinstance(content, (bytes, bytearray)) else 0
+
+    def to_dict(self):
+        timings = {f"{phase}_ms": round(getattr(self, phase) * 1000, 3) for phase in PHASES}
+        timings["decode_ms"] = round(self.decode * 1000, 3)
+        timings["bytes_in"] = self.bytes_in
+        timings["bytes_out"] = self.bytes_out
+        return timings
+
+
+def start_timing():
+    _local.timing = RequestTiming()
+    return _local.timing
+
+
+def stop_timing():
+    _local.timing = None
+
+
+def current_timing():
+    return getattr(_local, "timing", None)
+
+
+_ID_SEGMENT = re.compile(r"/\d+")
+
+
+def endpoint_label(method, path):
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+class _TimedConnectionMixin:
+    # Phases are added rather than assigned, so retries on a fresh connection accumulate
+
+    def _new_conn(self):
+        timing = current_timing()
+        if timing is None:
+            return super()._new_conn()
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = list(dict.fromkeys(
+                info[4][0] for info in socket.getaddrinfo(host, self.port, type=socket.SOCK_STREAM)))
+        except OSError:
+            # Let urllib3 raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        timing.dns += resolved - started
+        try:
+            for position, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                # NewConnectionError subclasses ConnectTimeoutError; like urllib3's own connect, a
+                # timeout or a refusal moves on to the next address
+                except ConnectTimeoutError:
+                    if position == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+        timing.connect += time.perf_counter() - resolved
+        return sock
+
+    def connect(self):
+        timing = current_timing()
+        if timing is None:
+            return super().connect()
+        before = timing.dns + timing.connect
+        started = time.perf_counter()
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            timing.tls += max(time.perf_counter() - started - (timing.dns + timing.connect - before), 0.0)
+
+    def request(self, *args, **kwargs):
+        timing = current_timing()
+        started = time.perf_counter()
+        result = super().request(*args, **kwargs)
+        if timing is not None:
+            timing.send += time.perf_counter() - started
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        timing = current_timing()
+        started = time.perf_counter()
+        response = super().getresponse(*args, **kwargs)
+        if timing is not None:
+            timing.server += time.perf_counter() - started
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class EndpointTimings:
+    def __init__(self):
+        self.phases = {phase: LatencyHistogram() for phase in PHASES + ("decode",)}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, timing):
+        for phase in PHASES:
+            self.phases[phase].record(getattr(timing, phase))
+        self.bytes_in += timing.bytes_in
+        self.bytes_out += timing.bytes_out
+
+    def summary(self):
+        return {
+            "count": self.phases["total"].count,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "phases": {phase: histogram.summary() for phase, histogram in self.phases.items() if histogram.count},
+            # Raw total-latency buckets, so the perf history can bootstrap percentiles later
+            "histogram": self.phases["total"].state(),
+        }
+
+    def state(self):
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "phases": {phase: histogram.state() for phase, histogram in self.phases.items()},
+        }
+
+    def merge_state(self, state):
+        self.bytes_in += state["bytes_in"]
+        self.bytes_out += state["bytes_out"]
+        for phase, histogram in state["phases"].items():
+            self.phases[phase].merge(LatencyHistogram.from_state(histogram))
+
+
+class TimingRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def _endpoint(self, label):
+        endpoint = self.endpoints.get(label)
+        if endpoint is None:
+            endpoint = self.endpoints[label] = EndpointTimings()
+        return endpoint
+
+    def record(self, label, timing):
+        with self._lock:
+            self._endpoint(label).record(timing)
+
+    def record_decode(self, label, seconds):
+        with self._lock:
+            self._endpoint(label).phases["decode"].record(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def state(self):
+        with self._lock:
+            return {label: endpoint.state() for label, endpoint in self.endpoints.items()}
+
+    def merge_state(self, state):
+        # Folds in another process's registry, e.g. what an xdist worker sent back
+        with self._lock:
+            for label, endpoint in state.items():
+                self._endpoint(label).merge_state(endpoint)
+
+    def summary(self):
+        with self._lock:
+            return {label: endpoint.summary() for label, endpoint in sorted(self.endpoints.items())}
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+timing_registry = TimingRegistry()
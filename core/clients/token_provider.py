@@ -0,0 +1,76 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core.settings.config import Users, TokenCache
+
+
+class TokenProvider:
+    # Bearer tokens cached on disk per (base_url, user). The cache is guarded by an flock, so
+    # pytest-xdist workers and consecutive sessions share one /auth call: the first worker fetches
+    # while holding the lock, the others block on it and then read the fresh token.
+
+    def __init__(self, base_url, fetch, username=Users.USERNAME.value, cache_dir=TokenCache.DIRECTORY.value,
+                 ttl=TokenCache.TTL.value):
+        self.fetch = fetch
+        self.ttl = ttl
+        key = hashlib.sha256(f"{base_url}|{username}".encode()).hexdigest()[:32]
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        self.cache_path = os.path.join(cache_dir, f"{key}.json")
+        self.lock_path = os.path.join(cache_dir, f"{key}.lock")
+        self._thread_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.cache_path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created_at", 0) >= self.ttl:
+            return None
+        return entry.get("token")
+
+    def _write(self, token):
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as file:
+            json.dump({"token": token, "created_at": time.time()}, file)
+        os.replace(temp_path, self.cache_path)
+
+    def _fetch_and_store(self):
+        token = self.fetch()
+        self._write(token)
+        return token
+
+    def get_token(self):
+        token = self._read()
+        if token:
+            return token
+        with self._locked():
+            return self._read() or self._fetch_and_store()
+
+    def refresh(self, stale_token):
+        with self._locked():
+            token = self._read()
+            if token and token != stale_token:
+                # Another worker already refreshed while we were waiting for the lock
+                return token
+            return self._fetch_and_store()
+
+    def invalidate(self):
+        with self._locked():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.cache_path)
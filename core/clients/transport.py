@@ -0,0 +1,131 @@
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from core.clients.timing import TimedHTTPConnection, TimedHTTPSConnection
+from core.settings.config import Pool, Retries, Transport
+
+
+class ConnectionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def connection_opened(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self):
+        return max(self.requests - self.new_connections, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+
+class _CountingConnectionMixin:
+    # Counted per socket rather than per pooled connection object: urllib3 keeps the object
+    # and silently reconnects it when the server closes the socket
+    stats = None
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        self.stats.connection_opened()
+        return sock
+
+
+class PooledAdapter(HTTPAdapter):
+    def __init__(self, stats=None, cassette=None, **kwargs):
+        self.stats = stats or ConnectionStats()
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        http_connection = type("CountingHTTPConnection", (_CountingConnectionMixin, TimedHTTPConnection),
+                               {"stats": self.stats})
+        https_connection = type("CountingHTTPSConnection", (_CountingConnectionMixin, TimedHTTPSConnection),
+                                {"stats": self.stats})
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CountingHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http_connection}),
+            "https": type("CountingHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": https_connection}),
+        }
+
+    def open_connections(self):
+        # Idle connections parked in the pools with a live socket; ones checked out by a request
+        # in flight are not counted
+        count = 0
+        for key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(key)
+            if pool is not None and pool.pool is not None:
+                count += sum(1 for conn in list(pool.pool.queue) if conn is not None and conn.sock is not None)
+        return count
+
+    def send(self, request, **kwargs):
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self.cassette.play(request)
+        self.stats.request_sent()
+        response = super().send(request, **kwargs)
+        if self.cassette is not None:
+            self.cassette.record(request, response)
+        return response
+
+
+def build_retry(total=Retries.TOTAL.value, backoff_factor=Retries.BACKOFF_FACTOR.value,
+                status_forcelist=Retries.STATUS_FORCELIST.value):
+    # Only idempotent verbs are retried, POST /booking or /auth must never be sent twice
+    return Retry(
+        total=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def create_adapter(transport=Transport.KIND.value, pool_connections=Pool.POOL_CONNECTIONS.value,
+                   pool_maxsize=Pool.POOL_MAXSIZE.value, pool_block=Pool.POOL_BLOCK.value, max_retries=None,
+                   cassette=None):
+    max_retries = max_retries if max_retries is not None else build_retry()
+    if transport == "requests":
+        return PooledAdapter(
+            cassette=cassette,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=max_retries,
+        )
+    if transport in ("http1", "http2"):
+        from core.clients.httpx_transport import HttpxAdapter
+
+        return HttpxAdapter(http2=transport == "http2", cassette=cassette, max_connections=pool_maxsize,
+                            max_retries=max_retries)
+    raise ValueError(f"Unsupported transport value: {transport}")
+
+
+def create_session(pool_connections=Pool.POOL_CONNECTIONS.value, pool_maxsize=Pool.POOL_MAXSIZE.value,
+                   pool_block=Pool.POOL_BLOCK.value, max_retries=None, cassette=None, transport=None):
+    # transport is a name from Transport.KIND or an adapter already shared with other sessions
+    session = requests.Session()
+    adapter = transport if isinstance(transport, BaseAdapter) else create_adapter(
+        transport or Transport.KIND.value, pool_connections, pool_maxsize, pool_block, max_retries, cassette)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if isinstance(adapter, PooledAdapter):
+        session.headers.update({"Connection": "keep-alive"})
+    return session, adapter
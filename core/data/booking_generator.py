@@ -0,0 +1,109 @@
+import json
+import threading
+import zlib
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from core.settings.config import DataGeneration
+
+_faker_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def shared_faker():
+    # Importing Faker and building its provider tables is the slowest part of startup, so it is
+    # done on first use and the instance is shared by every generator in the process
+    from faker import Faker
+
+    return Faker()
+
+
+class BookingGenerator:
+    # Faker is only used once to fill fixed-size name/sentence pools; every payload after that is
+    # drawn in NumPy batches from a single seeded Generator, so runs are reproducible from the seed
+
+    def __init__(self, seed=None, pool_size=DataGeneration.POOL_SIZE.value, base_date=None,
+                 max_checkin_offset=DataGeneration.MAX_CHECKIN_OFFSET.value,
+                 max_stay=DataGeneration.MAX_STAY.value):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        faker = shared_faker()
+        with _faker_lock:
+            faker.seed_instance(seed)
+            self.firstnames = [faker.first_name() for _ in range(pool_size)]
+            self.lastnames = [faker.last_name() for _ in range(pool_size)]
+            self.additionalneeds = [faker.sentence() for _ in range(pool_size)]
+        self.max_checkin_offset = max_checkin_offset
+        self.max_stay = max_stay
+        base_date = base_date or date.today()
+        # Every reachable checkin/checkout day formatted once, indexed by offset from base_date
+        self.dates = [(base_date + timedelta(days=offset)).isoformat()
+                      for offset in range(max_checkin_offset + max_stay + 1)]
+
+    def _columns(self, size, rng=None):
+        rng = rng or self.rng
+        pool_size = len(self.firstnames)
+        checkin = rng.integers(1, self.max_checkin_offset + 1, size)
+        return (
+            rng.integers(0, pool_size, size).tolist(),
+            rng.integers(0, pool_size, size).tolist(),
+            rng.integers(100, 1000, size).tolist(),
+            (rng.random(size) < 0.5).tolist(),
+            checkin.tolist(),
+            (checkin + rng.integers(1, self.max_stay + 1, size)).tolist(),
+            rng.integers(0, pool_size, size).tolist(),
+        )
+
+    def batch(self, size, rng=None):
+        firstnames, lastnames, dates, needs = self.firstnames, self.lastnames, self.dates, self.additionalneeds
+        return [
+            {
+                "firstname": firstnames[first],
+                "lastname": lastnames[last],
+                "totalprice": price,
+                "depositpaid": deposit,
+                "bookingdates": {"checkin": dates[checkin], "checkout": dates[checkout]},
+                "additionalneeds": needs[need],
+            }
+            for first, last, price, deposit, checkin, checkout, need in zip(*self._columns(size, rng))
+        ]
+
+    def for_key(self, key):
+        # Same seed and key give the same payload regardless of what else was drawn before,
+        # e.g. keyed by test node id so data does not depend on test order or xdist distribution
+        if self.seed is None:
+            return self.batch(1)[0]
+        return self.batch(1, rng=np.random.default_rng([self.seed, zlib.crc32(key.encode())]))[0]
+
+    def iter_bookings(self, count, batch_size=DataGeneration.BATCH_SIZE.value):
+        remaining = count
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            yield from self.batch(size)
+            remaining -= size
+
+    def stream(self, batch_size=DataGeneration.BATCH_SIZE.value):
+        while True:
+            yield from self.batch(batch_size)
+
+    def write_jsonl(self, path, count, batch_size=DataGeneration.BATCH_SIZE.value):
+        # Pools are JSON-encoded once, so each line is plain string formatting instead of json.dumps
+        firstnames = [json.dumps(name) for name in self.firstnames]
+        lastnames = [json.dumps(name) for name in self.lastnames]
+        needs = [json.dumps(sentence) for sentence in self.additionalneeds]
+        dates = self.dates
+        with open(path, "w") as file:
+            remaining = count
+            while remaining > 0:
+                size = min(batch_size, remaining)
+                file.writelines(
+                    f'{{"firstname": {firstnames[first]}, "lastname": {lastnames[last]}, '
+                    f'"totalprice": {price}, "depositpaid": {"true" if deposit else "false"}, '
+                    f'"bookingdates": {{"checkin": "{dates[checkin]}", "checkout": "{dates[checkout]}"}}, '
+                    f'"additionalneeds": {needs[need]}}}\n'
+                    for first, last, price, deposit, checkin, checkout, need in zip(*self._columns(size))
+                )
+                remaining -= size
+        return path
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+import uuid
+
+from core.clients.reporting import step
+from core.settings.config import Concurrency
+
+
+class DataScope:
+    # Namespaces test data per pytest-xdist worker so parallel workers never read each other's bookings
+    def __init__(self, worker_id=None, run_id=None, per_worker=True):
+        self.worker_id = worker_id or os.getenv("PYTEST_XDIST_WORKER", "master")
+        self.run_id = run_id or os.getenv("PYTEST_XDIST_TESTRUNUID", uuid.uuid4().hex)[:8]
+        # Cassettes key requests by their bodies, which must not depend on the worker a test lands on
+        self.prefix = f"{self.worker_id}-{self.run_id}" if per_worker else self.run_id
+
+    def firstname(self, firstname):
+        return f"{self.prefix}-{firstname}"
+
+    def apply(self, booking_data):
+        return {**booking_data, "firstname": self.firstname(booking_data["firstname"])}
+
+
+class BookingRegistry:
+    # Tracks which test created which booking, so the worker can delete all of them at session end
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._owners = {}
+
+    def __len__(self):
+        return len(self._owners)
+
+    def track(self, booking_id, owner):
+        with self._lock:
+            self._owners[booking_id] = owner
+
+    def release(self, booking_id):
+        with self._lock:
+            self._owners.pop(booking_id, None)
+
+    def owned_by(self, owner):
+        with self._lock:
+            return [booking_id for booking_id, booking_owner in self._owners.items() if booking_owner == owner]
+
+    def for_owner(self, owner):
+        return OwnedBookings(self, owner)
+
+    def cleanup(self, concurrency=Concurrency.BULK_CONCURRENCY.value):
+        with self._lock:
+            booking_ids = list(self._owners)
+            self._owners.clear()
+        if not booking_ids:
+            return []
+
+        # httpx is only imported when a session actually has bookings to clean up
+        from core.clients.async_api_client import AsyncApiClient
+
+        async def delete_all():
+            async with AsyncApiClient(base_url=self.client.base_url) as client:
+                return await client.delete_bookings(booking_ids, concurrency=concurrency, return_exceptions=True)
+
+        with step(f'Cleaning up {len(booking_ids)} bookings'):
+            results = asyncio.run(delete_all())
+        # Bookings a test already deleted come back as 405 and are not worth reporting; the ids of
+        # the others that were not deleted are returned
+        return [booking_id for booking_id, result in zip(booking_ids, results)
+                if result is not True and not already_deleted(result)]
+
+
+def already_deleted(result):
+    response = getattr(result, "response", None)
+    return response is not None and response.status_code == 405
+
+
+class OwnedBookings:
+    def __init__(self, registry, owner):
+        self.registry = registry
+        self.owner = owner
+
+    @property
+    def ids(self):
+        return self.registry.owned_by(self.owner)
+
+    def create(self, booking_data):
+        response = self.registry.client.create_booking(booking_data)
+        self.registry.track(response.json()["bookingid"], self.owner)
+        return response
+
+    def delete(self, booking_id):
+        result = self.registry.client.delete_booking(booking_id)
+        self.registry.release(booking_id)
+        return result
@@ -0,0 +1,139 @@
+import argparse
+import contextlib
+import os
+import sys
+
+from core.clients.api_client import ApiClient
+from core.clients.resilience import AdaptiveLimiter, CircuitBreakers
+from core.clients.response_cache import ResponseCache
+from core.clients.transport import build_retry, create_adapter
+from core.load.distributed import Coordinator
+from core.load.runner import LoadRunner
+from core.load.scenario import Scenario, DEFAULT_MIX
+from core.server.booking_server import Faults, LocalBookingServer
+from core.settings.config import Transport
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.load",
+                                     description="Generate load against the booking API through ApiClient.")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument("--rate", type=float, default=50, help="open loop: arrivals per second")
+    parser.add_argument("--users", type=int, default=10, help="closed loop: number of virtual users")
+    parser.add_argument("--workers", type=int, default=64, help="open loop: max requests in flight")
+    parser.add_argument("--duration", type=float, default=10, help="run length in seconds")
+    parser.add_argument("--mix", type=Scenario.parse_mix,
+                        default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+                        help="weighted operations, e.g. get_bookings_ids=60,get_booking_by_id=30")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--base-url", default=None, help="defaults to the URL for $ENVIRONMENT")
+    parser.add_argument("--local", action="store_true", help="run against an in-process stand-in server")
+    parser.add_argument("--transport", choices=("requests", "http1", "http2"), default=Transport.KIND.value,
+                        help="http1/http2 share one httpx pool across all users so HTTP/2 can multiplex")
+    parser.add_argument("--cache", action="store_true",
+                        help="give every virtual user a read-through cache for booking GETs")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="share an AIMD concurrency limiter across users; its limit converges on what "
+                             "the API sustains")
+    parser.add_argument("--breaker", action="store_true",
+                        help="per-endpoint circuit breakers that fail fast and probe with ping() to recover")
+    parser.add_argument("--local-latency", type=float, default=0.0,
+                        help="with --local: service time per request in seconds")
+    parser.add_argument("--local-capacity", type=int, default=None,
+                        help="with --local: requests in flight above this get 503")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="run the scenario in N worker processes (users/workers are per process); "
+                             "--cache, --adaptive and --breaker only apply in-process")
+    parser.add_argument("--listen", default=None,
+                        help="host:port or socket path where remote workers (python -m core.load.worker) report")
+    parser.add_argument("--remote-workers", type=int, default=0, help="remote workers to wait for before starting")
+    parser.add_argument("--authkey", default=os.getenv("LOAD_AUTHKEY"),
+                        help="shared secret for remote workers, defaults to $LOAD_AUTHKEY; with --listen and "
+                             "no key a random one is generated and printed")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def run_in_process(args, base_url):
+    caches = []
+    limiter = AdaptiveLimiter() if args.adaptive else None
+    breakers = CircuitBreakers() if args.breaker else None
+    # Retrying 503s inside urllib3 would hide the overload signal from the limiter and add load
+    max_retries = build_retry(status_forcelist=()) if limiter is not None else None
+    # requests keeps its per-user pools; httpx transports are shared so HTTP/2 streams multiplex
+    transport = None if args.transport == "requests" else create_adapter(
+        args.transport, pool_maxsize=args.workers, max_retries=max_retries)
+
+    def client_factory():
+        cache = None
+        if args.cache:
+            cache = ResponseCache()
+            caches.append(cache)
+        return ApiClient(base_url=base_url, attach_timings=False, cache=cache,
+                         transport=transport or "requests", limiter=limiter, breakers=breakers,
+                         max_retries=max_retries)
+
+    runner = LoadRunner(client_factory, Scenario(args.mix, seed=args.seed), args.duration)
+    if args.mode == "open":
+        report = runner.run_open(args.rate, max_workers=args.workers)
+    else:
+        report = runner.run_closed(args.users)
+
+    if caches:
+        totals = {}
+        for cache in caches:
+            for name, value in cache.stats.snapshot().items():
+                if name != "hit_ratio":
+                    totals[name] = totals.get(name, 0) + value
+        report.sections["cache"] = totals
+    if limiter is not None:
+        report.sections["limiter"] = limiter.snapshot()
+    if breakers is not None:
+        report.sections["breakers"] = breakers.snapshot()
+
+    return report
+
+
+def run_distributed(args, base_url):
+    # Every process runs the full scenario, so an open-loop rate is split between them
+    workers = args.processes + args.remote_workers
+    config = {
+        "base_url": base_url,
+        "mode": args.mode,
+        "rate": args.rate / max(workers, 1),
+        "users": args.users,
+        "workers": args.workers,
+        "duration": args.duration,
+        "mix": args.mix,
+        "seed": args.seed,
+        "transport": args.transport,
+    }
+    coordinator = Coordinator(config, args.processes, listen=args.listen, remote_workers=args.remote_workers,
+                              authkey=args.authkey.encode() if args.authkey else None)
+    return coordinator.run()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.processes == 0 and args.listen and not args.remote_workers:
+        raise SystemExit("--listen without --processes needs --remote-workers to know when to start")
+    with contextlib.ExitStack() as stack:
+        base_url = args.base_url
+        if args.local:
+            faults = Faults(latency=args.local_latency, capacity=args.local_capacity)
+            base_url = stack.enter_context(LocalBookingServer(faults=faults)).url
+        base_url = base_url or ApiClient.base_url_from_env()
+        if args.processes or args.listen:
+            report = run_distributed(args, base_url)
+        else:
+            report = run_in_process(args, base_url)
+
+    print(report.to_text())
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            file.write(report.to_json())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
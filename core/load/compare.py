@@ -0,0 +1,403 @@
+import argparse
+import contextlib
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from core.clients.api_client import ApiClient
+from core.clients.timing import TimingRegistry
+from core.load.scenario import Scenario, random_booking
+from core.perf.gate import percentile_ci
+from core.settings.config import Transport
+from core.settings.environments import Environment, load_environment
+
+DEFAULT_MIX = {"get_bookings_ids": 20, "get_booking_by_id": 50, "create_booking": 20, "partial_booking": 10}
+# Values each environment assigns on its own; compared by shape, not by value
+VOLATILE_PATHS = {("bookingid",)}
+MAX_EXAMPLES = 20
+
+
+class CompareStep:
+    def __init__(self, index, operation, payload=None, booking=None):
+        self.index = index
+        self.operation = operation
+        self.payload = payload
+        # Index of the create_booking step whose booking this step reads or changes
+        self.booking = booking
+
+
+def plan_steps(count, mix=None, seed=None):
+    # The same logical steps run against every target; booking references point at earlier
+    # create steps and are resolved to each target's own booking id
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unsupported operations in comparison mix: {', '.join(sorted(unknown))}")
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    rng = random.Random(seed)
+    steps, created = [], []
+    for index in range(count):
+        operation = rng.choices(names, weights=weights)[0]
+        if operation in ("get_booking_by_id", "partial_booking") and not created:
+            operation = "create_booking"
+        if operation == "create_booking":
+            steps.append(CompareStep(index, operation, payload=random_booking(rng)))
+            created.append(index)
+        elif operation == "partial_booking":
+            steps.append(CompareStep(index, operation, payload={"firstname": rng.choice(("Anna", "Omar", "Li"))},
+                                     booking=rng.choice(created)))
+        elif operation == "get_booking_by_id":
+            steps.append(CompareStep(index, operation, booking=rng.choice(created)))
+        else:
+            steps.append(CompareStep(index, operation))
+    return steps
+
+
+def _get_bookings_ids(client, step, booking_id):
+    response = client.get_bookings_ids()
+    return response.status_code, response.json()
+
+
+def _get_booking_by_id(client, step, booking_id):
+    return 200, client.get_booking_by_id(booking_id)
+
+
+def _create_booking(client, step, booking_id):
+    response = client.create_booking(step.payload)
+    return response.status_code, response.json()
+
+
+def _partial_booking(client, step, booking_id):
+    return 200, client.partial_booking(booking_id, step.payload)
+
+
+OPERATIONS = {
+    "get_bookings_ids": _get_bookings_ids,
+    "get_booking_by_id": _get_booking_by_id,
+    "create_booking": _create_booking,
+    "partial_booking": _partial_booking,
+}
+
+
+def shape(value):
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # Length and order aside, the kinds of elements a list holds
+        return sorted({json.dumps(shape(item), sort_keys=True) for item in value})
+    return type(value).__name__
+
+
+def diff_json(left, right, path=()):
+    # [(path, left, right)] for every differing leaf; volatile fields only have to agree in type
+    if path in VOLATILE_PATHS or path[-1:] in VOLATILE_PATHS:
+        left, right = shape(left), shape(right)
+    if isinstance(left, dict) and isinstance(right, dict):
+        differences = []
+        for key in list(left) + [key for key in right if key not in left]:
+            differences.extend(diff_json(left.get(key, MISSING), right.get(key, MISSING), path + (key,)))
+        return differences
+    if isinstance(left, list) and isinstance(right, list) and len(left) == len(right):
+        differences = []
+        for index, (left_item, right_item) in enumerate(zip(left, right)):
+            differences.extend(diff_json(left_item, right_item, path + (index,)))
+        return differences
+    return [] if left == right else [(path, left, right)]
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+class Exchange:
+    def __init__(self, status=None, body=None, seconds=0.0, error=None):
+        self.status = status
+        self.body = body
+        self.seconds = seconds
+        self.error = error
+
+    def comparable(self, operation):
+        # get_bookings_ids lists whatever each environment holds, possibly nothing yet, so only the
+        # type of the body can be expected to match
+        body = type(self.body).__name__ if operation == "get_bookings_ids" else self.body
+        # Error messages name the host, only the kind of error has to match
+        error = self.error and self.error.partition(":")[0]
+        return {"status": self.status, "body": body, "error": error}
+
+
+class Target:
+    def __init__(self, name, base_url, transport=None, users=4):
+        self.name = name
+        self.base_url = base_url
+        self.timings = TimingRegistry()
+        # Own client, so every environment gets its own session and connection pool
+        self.client = ApiClient(base_url=base_url, timings=self.timings, attach_timings=False, transport=transport,
+                                pool_maxsize=users)
+        self.executor = ThreadPoolExecutor(max_workers=users, thread_name_prefix=f"compare-{name}")
+        self.bookings = {}
+        self.latest = {}
+
+    def execute(self, step, previous=None):
+        booking_id = None
+        if previous is not None:
+            # Steps on one booking keep their planned order, otherwise a read may overtake a patch.
+            # The pool takes tasks in submission order, so the earlier step is already running
+            previous.result()
+        if step.booking is not None:
+            created = self.bookings[step.booking].result()
+            booking_id = (created.body or {}).get("bookingid") if isinstance(created.body, dict) else None
+            if booking_id is None:
+                return Exchange(error=f"booking from step {step.booking} was not created")
+        started = time.perf_counter()
+        try:
+            status, body = OPERATIONS[step.operation](self.client, step, booking_id)
+        except requests.HTTPError as error:
+            status, body = error.response.status_code, _body(error.response)
+        except (requests.RequestException, AssertionError) as error:
+            return Exchange(seconds=time.perf_counter() - started, error=f"{type(error).__name__}: {error}")
+        return Exchange(status, body, time.perf_counter() - started)
+
+    def submit(self, step):
+        booking = step.index if step.operation == "create_booking" else step.booking
+        future = self.executor.submit(self.execute, step, self.latest.get(booking))
+        if step.operation == "create_booking":
+            self.bookings[step.index] = future
+        if booking is not None:
+            self.latest[booking] = future
+        return future
+
+    def cleanup(self):
+        for future in self.bookings.values():
+            body = future.result().body
+            if isinstance(body, dict) and body.get("bookingid") is not None:
+                try:
+                    self.client.delete_booking(body["bookingid"])
+                except (requests.RequestException, AssertionError):
+                    pass
+
+    def close(self):
+        self.executor.shutdown()
+        self.client.session.close()
+
+
+def _body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def targets_from_env():
+    # Every Environment whose base URL is configured, e.g. in .env
+    load_environment()
+    targets = {}
+    for environment in Environment:
+        base_url = ApiClient.get_base_url(environment)
+        if base_url:
+            targets[environment.name] = base_url.rstrip("/")
+    return targets
+
+
+class ComparisonReport:
+    def __init__(self, baseline, targets, steps, exchanges, timings, elapsed, confidence=0.95, seed=None):
+        self.baseline = baseline
+        self.targets = targets
+        self.steps = steps
+        self.exchanges = exchanges
+        self.timings = timings
+        self.elapsed = elapsed
+        self.confidence = confidence
+        self.seed = seed
+
+    def mismatches(self):
+        # Per target, every step whose status, body or error differs from the baseline's
+        result = {name: [] for name in self.targets if name != self.baseline}
+        for step, exchanges in zip(self.steps, self.exchanges):
+            expected = exchanges[self.baseline].comparable(step.operation)
+            for name in result:
+                differences = diff_json(expected, exchanges[name].comparable(step.operation))
+                if differences:
+                    result[name].append((step, differences))
+        return result
+
+    def latency(self):
+        rng = np.random.default_rng(self.seed)
+        endpoints = {}
+        for name, summary in self.timings.items():
+            for endpoint, item in summary.items():
+                total = item["phases"].get("total")
+                if not total:
+                    continue
+                _, interval = percentile_ci(item["histogram"], 50, self.confidence, rng=rng)
+                endpoints.setdefault(endpoint, {})[name] = {
+                    "requests": item["count"], "p50_ms": total["p50_ms"], "p90_ms": total["p90_ms"],
+                    "p99_ms": total["p99_ms"], "p50_ci_ms": [round(bound, 3) for bound in interval],
+                }
+        for endpoint, targets in endpoints.items():
+            baseline = targets.get(self.baseline)
+            if baseline is None:
+                continue
+            for name, item in targets.items():
+                if name == self.baseline:
+                    continue
+                item["p50_change"] = round(item["p50_ms"] / baseline["p50_ms"] - 1, 4) if baseline["p50_ms"] else None
+                item["p99_change"] = round(item["p99_ms"] / baseline["p99_ms"] - 1, 4) if baseline["p99_ms"] else None
+                # Disjoint bootstrap intervals: the difference is not just noise
+                item["p50_significant"] = (item["p50_ci_ms"][0] > baseline["p50_ci_ms"][1]
+                                           or item["p50_ci_ms"][1] < baseline["p50_ci_ms"][0])
+        return endpoints
+
+    def to_dict(self):
+        mismatches = {}
+        for name, items in self.mismatches().items():
+            by_operation = {}
+            for step, _ in items:
+                by_operation[step.operation] = by_operation.get(step.operation, 0) + 1
+            mismatches[name] = {
+                "steps": len(items),
+                "by_operation": by_operation,
+                "examples": [{"step": step.index, "operation": step.operation,
+                              "differences": [{"path": "/".join(map(str, path)), self.baseline: repr(left),
+                                               name: repr(right)} for path, left, right in differences]}
+                             for step, differences in items[:MAX_EXAMPLES]],
+            }
+        return {
+            "baseline": self.baseline,
+            "targets": self.targets,
+            "steps": len(self.steps),
+            "elapsed_s": round(self.elapsed, 3),
+            "latency": self.latency(),
+            "mismatches": mismatches,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_text(self):
+        result = self.to_dict()
+        names = list(self.targets)
+        lines = [f"{len(self.steps)} steps against {', '.join(f'{name}={url}' for name, url in self.targets.items())}"
+                 f" in {self.elapsed:.2f}s, baseline {self.baseline}", ""]
+        header = f"{'endpoint':<22}{'target':<12}{'requests':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'p50 Δ':>9}{'p99 Δ':>9}"
+        lines += [header, "-" * len(header)]
+        for endpoint, targets in sorted(result["latency"].items()):
+            for name in names:
+                item = targets.get(name)
+                if item is None:
+                    continue
+                p50_change = f"{item['p50_change']:+.1%}" if item.get("p50_change") is not None else ""
+                p99_change = f"{item['p99_change']:+.1%}" if item.get("p99_change") is not None else ""
+                marker = " *" if item.get("p50_significant") else ""
+                lines.append(f"{endpoint:<22}{name:<12}{item['requests']:>9}{item['p50_ms']:>9.2f}"
+                             f"{item['p90_ms']:>9.2f}{item['p99_ms']:>9.2f}{p50_change:>9}{p99_change:>9}{marker}")
+        lines.append(f"* p50 {self.confidence:.0%} bootstrap intervals do not overlap the baseline's")
+        for name, item in result["mismatches"].items():
+            lines.append("")
+            lines.append(f"{name} vs {self.baseline}: {item['steps']} of {len(self.steps)} steps differ"
+                         + (f" ({', '.join(f'{op} {count}' for op, count in item['by_operation'].items())})"
+                            if item["by_operation"] else ""))
+            for example in item["examples"][:5]:
+                for difference in example["differences"][:3]:
+                    lines.append(f"  step {example['step']} {example['operation']} {difference['path'] or '/'}: "
+                                 f"{difference[self.baseline]} != {difference[name]}")
+        return "\n".join(lines)
+
+
+class ComparisonRunner:
+    # Runs one planned sequence of steps against every target at the same time, each target on its
+    # own client and thread pool, so all environments see the same network conditions; results are
+    # lined up per step for body diffs and per endpoint for latency
+
+    def __init__(self, targets, baseline=None, steps=200, mix=None, users=4, seed=None, transport=None):
+        if len(targets) < 2:
+            raise ValueError("Comparison needs at least two targets")
+        self.targets = dict(targets)
+        self.baseline = baseline or (Environment.PROD.name if Environment.PROD.name in self.targets
+                                     else next(iter(self.targets)))
+        if self.baseline not in self.targets:
+            raise ValueError(f"Baseline {self.baseline} is not one of the targets: {', '.join(self.targets)}")
+        self.steps = plan_steps(steps, mix, seed)
+        self.users = users
+        self.seed = seed
+        self.transport = transport
+
+    def run(self):
+        targets = {name: Target(name, url, self.transport, self.users) for name, url in self.targets.items()}
+        try:
+            with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+                list(pool.map(lambda target: target.client.auth(), targets.values()))
+            for target in targets.values():
+                target.timings.reset()
+
+            started = time.perf_counter()
+            futures = [{name: target.submit(step) for name, target in targets.items()} for step in self.steps]
+            exchanges = [{name: future.result() for name, future in row.items()} for row in futures]
+            elapsed = time.perf_counter() - started
+            timings = {name: target.timings.summary() for name, target in targets.items()}
+
+            with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+                list(pool.map(lambda target: target.cleanup(), targets.values()))
+        finally:
+            for target in targets.values():
+                target.close()
+        return ComparisonReport(self.baseline, self.targets, self.steps, exchanges, timings, elapsed, seed=self.seed)
+
+
+def main(argv=None):
+    # Flask is only needed for the stand-in
+    from core.server.booking_server import Faults, LocalBookingServer
+
+    parser = argparse.ArgumentParser(prog="python -m core.load.compare",
+                                     description="Run one scenario against several environments at once and "
+                                                 "compare latency and response bodies.")
+    parser.add_argument("--target", action="append", default=[], metavar="NAME=URL",
+                        help="extra or overriding target; repeatable")
+    parser.add_argument("--only", default=None, help="comma-separated target names to keep")
+    parser.add_argument("--local", action="store_true", help="add an in-process stand-in server as LOCAL")
+    parser.add_argument("--local-latency", type=float, default=0.0, help="with --local: service time per request")
+    parser.add_argument("--baseline", default=None, help="target the others are compared with, defaults to PROD")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--users", type=int, default=4, help="requests in flight per target")
+    parser.add_argument("--mix", type=Scenario.parse_mix,
+                        default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--transport", choices=("requests", "http1", "http2"), default=Transport.KIND.value)
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        targets = targets_from_env()
+        if args.local:
+            targets[Environment.LOCAL.name] = stack.enter_context(
+                LocalBookingServer(faults=Faults(latency=args.local_latency))).url
+        for item in args.target:
+            name, _, url = item.partition("=")
+            if not url:
+                parser.error(f"--target expects NAME=URL, got {item!r}")
+            targets[name] = url.rstrip("/")
+        if args.only:
+            targets = {name: url for name, url in targets.items() if name in args.only.split(",")}
+        if len(targets) < 2:
+            parser.error(f"need at least two targets, have {', '.join(targets) or 'none'}")
+        report = ComparisonRunner(targets, args.baseline, args.steps, args.mix, args.users, args.seed,
+                                  args.transport).run()
+
+    print(report.to_text())
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            file.write(report.to_json())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import multiprocessing
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from core.clients.api_client import ApiClient
+from core.load.histogram import BUCKET_COUNT, HIGHEST_TRACKABLE_US, LatencyHistogram, bucket_index
+from core.load.runner import EndpointStats, LoadReport, LoadRunner
+from core.load.scenario import OPERATIONS, Scenario
+
+# Per worker thread ("slot") and endpoint one int64 row: histogram buckets, then errors, summed
+# latency and max latency. Every slot has a single writer, so workers never lock or send anything
+# per request; readers may see a row mid-update, which only matters for the live output
+ENDPOINTS = [operation.endpoint for operation in OPERATIONS.values()]
+ENDPOINT_INDEX = {endpoint: index for index, endpoint in enumerate(ENDPOINTS)}
+ERRORS, TOTAL_US, MAX_US = BUCKET_COUNT, BUCKET_COUNT + 1, BUCKET_COUNT + 2
+COLUMNS = BUCKET_COUNT + 3
+REPORT_INTERVAL = 1.0
+STARTUP_TIMEOUT = 60
+
+
+def slots_for(config):
+    return config["users"] if config["mode"] == "closed" else config["workers"]
+
+
+def sum_slots(array):
+    totals = array.sum(axis=0)
+    totals[:, MAX_US] = array[:, :, MAX_US].max(axis=0) if len(array) else 0
+    return totals
+
+
+def merge_totals(blocks):
+    blocks = [block for block in blocks if block is not None]
+    if not blocks:
+        return np.zeros((len(ENDPOINTS), COLUMNS), dtype=np.int64)
+    return sum_slots(np.stack(blocks))
+
+
+def endpoint_stats(totals):
+    endpoints = {}
+    for endpoint, row in zip(ENDPOINTS, totals):
+        stats = EndpointStats()
+        stats.histogram = LatencyHistogram.from_counts(row[:BUCKET_COUNT].tolist(), int(row[TOTAL_US]),
+                                                       int(row[MAX_US]))
+        stats.errors = int(row[ERRORS])
+        if stats.histogram.count or stats.errors:
+            endpoints[endpoint] = stats
+    return endpoints
+
+
+class SharedWorkerStats:
+    # WorkerStats over one slot of the shared array
+    def __init__(self, rows):
+        self.rows = rows
+
+    def record(self, endpoint, seconds, error=False):
+        row = self.rows[ENDPOINT_INDEX[endpoint]]
+        if error:
+            row[ERRORS] += 1
+            return
+        value_us = min(max(int(seconds * 1_000_000), 0), HIGHEST_TRACKABLE_US)
+        row[bucket_index(value_us)] += 1
+        row[TOTAL_US] += value_us
+        if value_us > row[MAX_US]:
+            row[MAX_US] = value_us
+
+    @property
+    def endpoints(self):
+        return endpoint_stats(self.rows)
+
+
+class StatsBlock:
+    def __init__(self, memory, slots, owner):
+        self.memory = memory
+        self.slots = slots
+        self.owner = owner
+        self.array = np.ndarray((slots, len(ENDPOINTS), COLUMNS), dtype=np.int64, buffer=memory.buf)
+
+    @classmethod
+    def create(cls, slots):
+        memory = shared_memory.SharedMemory(create=True, size=max(slots, 1) * len(ENDPOINTS) * COLUMNS * 8)
+        block = cls(memory, slots, owner=True)
+        block.array[:] = 0
+        return block
+
+    @classmethod
+    def attach(cls, name, slots):
+        return cls(shared_memory.SharedMemory(name=name), slots, owner=False)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def totals(self):
+        return sum_slots(self.array.copy())
+
+    def close(self):
+        del self.array
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def run_worker(config, index, stats_factory):
+    def client_factory():
+        return ApiClient(base_url=config["base_url"], attach_timings=False, transport=config["transport"])
+
+    seed = config["seed"]
+    scenario = Scenario(config["mix"], seed=None if seed is None else seed + 1000 * index)
+    runner = LoadRunner(client_factory, scenario, config["duration"], stats_factory=stats_factory)
+    if config["mode"] == "open":
+        runner.run_open(config["rate"], max_workers=config["workers"])
+    else:
+        runner.run_closed(config["users"])
+
+
+def _local_worker(config, index, memory_name, total_slots, first_slot, ready, start):
+    block = StatsBlock.attach(memory_name, total_slots)
+    try:
+        ready.wait(STARTUP_TIMEOUT)
+        start.wait()
+        run_worker(config, index, lambda slot: SharedWorkerStats(block.array[first_slot + slot]))
+    finally:
+        block.close()
+
+
+def check_authkey(authkey):
+    # multiprocessing.connection unpickles whatever an authenticated peer sends, so the key is all
+    # that keeps anyone who can reach the address from running code on the coordinator or a worker
+    if not authkey:
+        raise ValueError("Remote workers need a shared key: pass --authkey or set $LOAD_AUTHKEY")
+    return authkey
+
+
+def parse_address(value):
+    # host:port for TCP, anything else is a Unix socket path
+    host, _, port = value.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return value
+
+
+class Coordinator:
+    def __init__(self, config, processes, listen=None, remote_workers=0, authkey=None,
+                 interval=REPORT_INTERVAL, out=sys.stdout):
+        self.config = config
+        self.processes = processes
+        self.listen = listen
+        self.remote_workers = remote_workers
+        # Without a key a random one is made and printed for the workers when listening
+        self.generated_authkey = authkey is None and listen is not None
+        self.authkey = secrets.token_hex(32).encode() if self.generated_authkey else authkey
+        if listen is not None:
+            check_authkey(self.authkey)
+        self.interval = interval
+        self.out = out
+        self._remote = {}
+        self._remote_done = 0
+        self._remote_lock = threading.Lock()
+        self._remote_joined = threading.Semaphore(0)
+        self._started = None
+
+    def _serve_remote(self, connection, index):
+        with connection:
+            connection.recv()
+            remaining = self.config["duration"]
+            if self._started is not None:
+                remaining = max(remaining - (time.perf_counter() - self._started), 0.0)
+            connection.send({**self.config, "duration": remaining, "index": index})
+            self._remote_joined.release()
+            try:
+                while True:
+                    kind, payload = connection.recv()
+                    totals = np.frombuffer(payload, dtype=np.int64).reshape(len(ENDPOINTS), COLUMNS)
+                    with self._remote_lock:
+                        self._remote[index] = totals
+                        if kind == "done":
+                            self._remote_done += 1
+                            return
+            except EOFError:
+                with self._remote_lock:
+                    self._remote_done += 1
+
+    def _accept(self, listener):
+        index = self.processes
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError):
+                return
+            threading.Thread(target=self._serve_remote, args=(connection, index), daemon=True).start()
+            index += 1
+
+    def _totals(self, block):
+        with self._remote_lock:
+            remote = list(self._remote.values())
+        return merge_totals([block.totals() if block else None, *remote])
+
+    def _print_interval(self, tick, delta, seconds):
+        histogram = LatencyHistogram.from_counts(delta[:, :BUCKET_COUNT].sum(axis=0).tolist(),
+                                                 int(delta[:, TOTAL_US].sum()))
+        errors = int(delta[:, ERRORS].sum())
+        total = histogram.count + errors
+        summary = histogram.summary()
+        print(f"[{tick * self.interval:>5g}s] {total / seconds:>8.0f} req/s  errors {errors / total if total else 0:>6.2%}"
+              f"  p50 {summary['p50_ms']:>8.2f} ms  p99 {summary['p99_ms']:>8.2f} ms"
+              f"  p99.9 {summary['p99.9_ms']:>8.2f} ms", file=self.out, flush=True)
+
+    def run(self):
+        slots = slots_for(self.config)
+        block = StatsBlock.create(self.processes * slots) if self.processes else None
+        context = multiprocessing.get_context("spawn")
+        ready = context.Barrier(self.processes + 1)
+        start = context.Event()
+        workers = [context.Process(target=_local_worker, name=f"load-worker-{index}",
+                                   args=(self.config, index, block.name, self.processes * slots, index * slots,
+                                         ready, start))
+                   for index in range(self.processes)]
+        listener = Listener(parse_address(self.listen), authkey=self.authkey) if self.listen else None
+        try:
+            for worker in workers:
+                worker.start()
+            if listener is not None:
+                if self.generated_authkey:
+                    print(f"Remote workers: python -m core.load.worker --connect {self.listen} "
+                          f"--authkey {self.authkey.decode()}", file=self.out, flush=True)
+                threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+            ready.wait(STARTUP_TIMEOUT)
+            for _ in range(self.remote_workers):
+                self._remote_joined.acquire()
+            self._started = time.perf_counter()
+            start.set()
+
+            previous = self._totals(block)
+            tick = 1
+            while any(worker.is_alive() for worker in workers) or self._remote_pending():
+                time.sleep(min(0.05, max(self._started + tick * self.interval - time.perf_counter(), 0)))
+                if time.perf_counter() >= self._started + tick * self.interval:
+                    current = self._totals(block)
+                    self._print_interval(tick, current - previous, self.interval)
+                    previous = current
+                    tick += 1
+            elapsed = time.perf_counter() - self._started
+            for worker in workers:
+                worker.join()
+            totals = self._totals(block)
+            partial = elapsed - (tick - 1) * self.interval
+            if partial > 0 and (totals - previous).any():
+                self._print_interval(tick, totals - previous, partial)
+            report = LoadReport(self.config["mode"], elapsed, endpoint_stats(totals))
+            report.sections["workers"] = {"processes": self.processes, "remote": len(self._remote)}
+            return report
+        finally:
+            if listener is not None:
+                listener.close()
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            if block is not None:
+                block.close()
+
+    def _remote_pending(self):
+        with self._remote_lock:
+            return self._remote_done < len(self._remote) or self._remote_done < self.remote_workers
+
+
+def run_remote_worker(address, authkey, base_url=None, interval=REPORT_INTERVAL):
+    # Runs the coordinator's scenario here and pushes this host's running totals once per interval
+    check_authkey(authkey)
+    with Client(parse_address(address), authkey=authkey) as connection:
+        connection.send({"host": socket.gethostname(), "pid": os.getpid()})
+        config = connection.recv()
+        if base_url:
+            config["base_url"] = base_url
+        array = np.zeros((slots_for(config), len(ENDPOINTS), COLUMNS), dtype=np.int64)
+        finished = threading.Event()
+
+        def report():
+            while not finished.wait(interval):
+                connection.send(("counts", sum_slots(array.copy()).tobytes()))
+
+        reporter = threading.Thread(target=report, daemon=True)
+        reporter.start()
+        try:
+            run_worker(config, config["index"], lambda slot: SharedWorkerStats(array[slot]))
+        finally:
+            finished.set()
+            reporter.join()
+            connection.send(("done", sum_slots(array).tobytes()))
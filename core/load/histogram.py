@@ -0,0 +1,122 @@
+import math
+
+# Log-linear buckets in the spirit of HdrHistogram: values below 2 ** (SUB_BUCKET_BITS + 1)
+# microseconds are exact, above that every power of two is split into 2 ** SUB_BUCKET_BITS
+# linear sub-buckets, giving < 1% relative error up to HIGHEST_TRACKABLE_US.
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+LINEAR_LIMIT = SUB_BUCKET_COUNT << 1
+HIGHEST_TRACKABLE_US = 120_000_000
+
+
+def bucket_index(value_us):
+    if value_us < LINEAR_LIMIT:
+        return value_us
+    shift = value_us.bit_length() - (SUB_BUCKET_BITS + 1)
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKET_COUNT + (value_us >> shift) - SUB_BUCKET_COUNT
+
+
+def bucket_range(index):
+    if index < LINEAR_LIMIT:
+        return index, index
+    shift, offset = divmod(index - LINEAR_LIMIT, SUB_BUCKET_COUNT)
+    shift += 1
+    lowest = (SUB_BUCKET_COUNT + offset) << shift
+    return lowest, lowest + (1 << shift) - 1
+
+
+BUCKET_COUNT = bucket_index(HIGHEST_TRACKABLE_US) + 1
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    def __init__(self, counts=None):
+        self.counts = counts if counts is not None else [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    @classmethod
+    def from_counts(cls, counts, total_us=0, max_us=0):
+        # Rebuilds a histogram from bucket counts kept elsewhere (e.g. shared memory); min, and max
+        # unless given, are only known to bucket precision
+        histogram = cls(list(counts))
+        histogram.count = sum(histogram.counts)
+        histogram.total_us = total_us
+        filled = [index for index, bucket_count in enumerate(histogram.counts) if bucket_count]
+        if filled:
+            histogram.min_us = bucket_range(filled[0])[0]
+            histogram.max_us = max_us or bucket_range(filled[-1])[1]
+        return histogram
+
+    def state(self):
+        # Sparse, JSON-friendly form for shipping between processes or storing
+        return {
+            "counts": {str(index): bucket_count for index, bucket_count in enumerate(self.counts) if bucket_count},
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        histogram = cls()
+        for index, bucket_count in state["counts"].items():
+            histogram.counts[int(index)] = bucket_count
+        histogram.count = sum(state["counts"].values())
+        histogram.total_us = state["total_us"]
+        histogram.min_us = state["min_us"]
+        histogram.max_us = state["max_us"]
+        return histogram
+
+    def record(self, seconds):
+        self.record_us(int(seconds * 1_000_000))
+
+    def record_us(self, value_us):
+        value_us = min(max(value_us, 0), HIGHEST_TRACKABLE_US)
+        self.counts[bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other):
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    @property
+    def mean_us(self):
+        return self.total_us / self.count if self.count else 0.0
+
+    def percentile_us(self, percentile):
+        if not self.count:
+            return 0
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                lowest, highest = bucket_range(index)
+                return min((lowest + highest) // 2, self.max_us)
+        return self.max_us
+
+    def summary(self, percentiles=PERCENTILES):
+        summary = {
+            "count": self.count,
+            "min_ms": (self.min_us or 0) / 1000,
+            "mean_ms": round(self.mean_us / 1000, 3),
+            "max_ms": self.max_us / 1000,
+        }
+        for percentile in percentiles:
+            summary[f"p{percentile:g}_ms"] = self.percentile_us(percentile) / 1000
+        return summary
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.load.histogram import LatencyHistogram
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        return self
+
+
+class WorkerStats:
+    # Each worker thread owns one of these, so the hot path records without locking
+    def __init__(self):
+        self.endpoints = {}
+
+    def record(self, endpoint, seconds, error=False):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        if error:
+            stats.errors += 1
+        else:
+            stats.histogram.record(seconds)
+
+
+class LoadReport:
+    def __init__(self, mode, elapsed, endpoints):
+        self.mode = mode
+        self.elapsed = elapsed
+        self.endpoints = endpoints
+        # Extra named snapshots, e.g. cache, limiter or breaker state at the end of the run
+        self.sections = {}
+
+    @classmethod
+    def from_workers(cls, mode, elapsed, workers):
+        endpoints = {}
+        for worker in workers:
+            for endpoint, stats in worker.endpoints.items():
+                endpoints.setdefault(endpoint, EndpointStats()).merge(stats)
+        return cls(mode, elapsed, endpoints)
+
+    def to_dict(self):
+        endpoints = {}
+        for endpoint, stats in sorted(self.endpoints.items()):
+            total = stats.histogram.count + stats.errors
+            endpoints[endpoint] = {
+                "requests": total,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / total, 4) if total else 0.0,
+                "throughput_rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+                "latency": stats.histogram.summary(),
+            }
+        return {"mode": self.mode, "elapsed_s": round(self.elapsed, 3), "endpoints": endpoints, **self.sections}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_text(self):
+        header = (f"{'endpoint':<20}{'requests':>10}{'rps':>10}{'errors':>9}"
+                  f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}")
+        lines = [f"mode={self.mode} elapsed={self.elapsed:.2f}s", header, "-" * len(header)]
+        for endpoint, item in self.to_dict()["endpoints"].items():
+            latency = item["latency"]
+            lines.append(f"{endpoint:<20}{item['requests']:>10}{item['throughput_rps']:>10.1f}"
+                         f"{item['error_rate']:>9.2%}{latency['p50_ms']:>10.2f}{latency['p90_ms']:>10.2f}"
+                         f"{latency['p99_ms']:>10.2f}{latency['p99.9_ms']:>10.2f}")
+        for name, section in self.sections.items():
+            nested = all(isinstance(value, dict) for value in section.values())
+            for label, values in (section.items() if nested and section else [(None, section)]):
+                title = f"{name} {label}" if label else name
+                lines.append(f"{title}: " + ", ".join(f"{key}={value}" for key, value in values.items()))
+        return "\n".join(lines)
+
+
+class LoadRunner:
+    def __init__(self, client_factory, scenario, duration, stats_factory=None):
+        self.client_factory = client_factory
+        self.scenario = scenario
+        self.duration = duration
+        # Called with the worker thread index; anything with WorkerStats.record works
+        self.stats_factory = stats_factory or (lambda index: WorkerStats())
+        self._local = threading.local()
+        self._workers = []
+        self._workers_lock = threading.Lock()
+
+    def _worker(self):
+        # Lazily gives every pool thread its own client (own session) and stats
+        worker = getattr(self._local, "worker", None)
+        if worker is None:
+            with self._workers_lock:
+                index = len(self._workers)
+                stats = self.stats_factory(index)
+                self._workers.append(stats)
+            worker = self._local.worker = (self.client_factory(), stats, self.scenario.rng(index + 1))
+        return worker
+
+    def _execute(self, operation, intended_start, rng=None):
+        client, stats, worker_rng = self._worker()
+        rng = rng or worker_rng
+        try:
+            operation.func(client, self.scenario.pool, rng)
+        except Exception:
+            stats.record(operation.endpoint, 0, error=True)
+        else:
+            stats.record(operation.endpoint, time.perf_counter() - intended_start)
+
+    def run_closed(self, users):
+        self.scenario.prepare(self.client_factory())
+        started = time.perf_counter()
+        deadline = started + self.duration
+
+        def virtual_user(index):
+            rng = self.scenario.rng(index)
+            while time.perf_counter() < deadline:
+                self._execute(self.scenario.pick(rng), time.perf_counter(), rng)
+
+        with ThreadPoolExecutor(max_workers=users, thread_name_prefix="load-vu") as executor:
+            list(executor.map(virtual_user, range(users)))
+        return LoadReport.from_workers("closed", time.perf_counter() - started, self._workers)
+
+    def run_open(self, rate, max_workers=64):
+        # Arrivals follow a fixed schedule, and latency is measured from the intended send time,
+        # so a slow server shows up as queueing delay instead of hiding behind fewer requests
+        self.scenario.prepare(self.client_factory())
+        rng = self.scenario.rng()
+        interval = 1.0 / rate
+        total = int(rate * self.duration)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load-open") as executor:
+            for index in range(total):
+                intended_start = started + index * interval
+                delay = intended_start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._execute, self.scenario.pick(rng), intended_start)
+        return LoadReport.from_workers("open", time.perf_counter() - started, self._workers)
@@ -0,0 +1,103 @@
+import random
+import threading
+from datetime import date, timedelta
+
+
+class Operation:
+    def __init__(self, name, endpoint, func):
+        self.name = name
+        self.endpoint = endpoint
+        self.func = func
+
+
+class BookingPool:
+    # Booking ids shared by all virtual users, read by get_booking_by_id and fed by create_booking
+    def __init__(self, booking_ids=()):
+        self._lock = threading.Lock()
+        self._ids = list(booking_ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, booking_id):
+        with self._lock:
+            self._ids.append(booking_id)
+
+    def choice(self, rng):
+        with self._lock:
+            return rng.choice(self._ids) if self._ids else None
+
+
+def random_booking(rng):
+    checkin = date.today() + timedelta(days=rng.randint(1, 365))
+    return {
+        "firstname": rng.choice(("Jim", "Mary", "Sally", "Eric", "Susan", "Mark")),
+        "lastname": rng.choice(("Brown", "Wilson", "Jones", "Smith", "Ericsson")),
+        "totalprice": rng.randint(100, 999),
+        "depositpaid": rng.random() < 0.5,
+        "bookingdates": {
+            "checkin": checkin.isoformat(),
+            "checkout": (checkin + timedelta(days=rng.randint(1, 14))).isoformat(),
+        },
+        "additionalneeds": rng.choice(("Breakfast", "Dinner", "Late checkout", None)),
+    }
+
+
+def _get_bookings_ids(client, pool, rng):
+    client.get_bookings_ids()
+
+
+def _get_booking_by_id(client, pool, rng):
+    booking_id = pool.choice(rng)
+    if booking_id is None:
+        raise LookupError("No booking ids available for get_booking_by_id")
+    client.get_booking_by_id(booking_id)
+
+
+def _create_booking(client, pool, rng):
+    response = client.create_booking(random_booking(rng))
+    pool.add(response.json()["bookingid"])
+
+
+OPERATIONS = {
+    "get_bookings_ids": Operation("get_bookings_ids", "GET /booking", _get_bookings_ids),
+    "get_booking_by_id": Operation("get_booking_by_id", "GET /booking/{id}", _get_booking_by_id),
+    "create_booking": Operation("create_booking", "POST /booking", _create_booking),
+}
+
+DEFAULT_MIX = {"get_bookings_ids": 60, "get_booking_by_id": 30, "create_booking": 10}
+
+
+class Scenario:
+    def __init__(self, mix=None, seed=None):
+        mix = mix or DEFAULT_MIX
+        unknown = set(mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported operations in scenario mix: {', '.join(sorted(unknown))}")
+        self.operations = [OPERATIONS[name] for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[operation.name] for operation in self.operations]
+        if not self.operations:
+            raise ValueError("Scenario mix must have at least one operation with positive weight")
+        self.seed = seed
+        self.pool = BookingPool()
+
+    @staticmethod
+    def parse_mix(value):
+        mix = {}
+        for item in value.split(","):
+            name, _, weight = item.partition("=")
+            mix[name.strip()] = float(weight)
+        return mix
+
+    def rng(self, worker_index=0):
+        return random.Random(None if self.seed is None else self.seed + worker_index)
+
+    def pick(self, rng):
+        return rng.choices(self.operations, weights=self.weights)[0]
+
+    def prepare(self, client):
+        if any(operation.name == "get_booking_by_id" for operation in self.operations):
+            for item in client.get_bookings_ids().json():
+                self.pool.add(item["bookingid"])
+            if not len(self.pool):
+                self.pool.add(client.create_booking(random_booking(self.rng())).json()["bookingid"])
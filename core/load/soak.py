@@ -0,0 +1,371 @@
+import argparse
+import collections
+import contextlib
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from core.clients.api_client import ApiClient
+from core.load.scenario import Scenario, random_booking
+from core.settings.config import Soak, Transport
+
+SOAK_MIX = {"create_booking": 15, "get_booking_by_id": 40, "get_bookings_ids": 10, "partial_booking": 20,
+            "delete_booking": 15}
+
+
+class SoakTraffic:
+    # Mixed booking CRUD through one long-lived client, the way a monitoring loop uses it. Once
+    # max_live bookings exist a create deletes one instead, so the server side stays bounded and
+    # growth measured in this process is the client's
+
+    def __init__(self, client, mix=None, seed=None, max_live=Soak.MAX_LIVE_BOOKINGS.value):
+        mix = mix or SOAK_MIX
+        unknown = set(mix) - set(self.OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported operations in soak mix: {', '.join(sorted(unknown))}")
+        self.client = client
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.seed = seed
+        self.max_live = max_live
+        self.live = collections.deque()
+        self.requests = 0
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def rng(self, index):
+        return random.Random(None if self.seed is None else self.seed + index)
+
+    def _create_booking(self, rng):
+        with self._lock:
+            full = len(self.live) >= self.max_live
+        if full:
+            return self._delete_booking(rng)
+        booking_id = self.client.create_booking(random_booking(rng)).json()["bookingid"]
+        with self._lock:
+            self.live.append(booking_id)
+
+    def _get_booking_by_id(self, rng):
+        booking_id = self._pick(rng)
+        if booking_id is None:
+            return self._create_booking(rng)
+        self.client.get_booking_by_id(booking_id)
+
+    def _get_bookings_ids(self, rng):
+        self.client.get_bookings_ids()
+
+    def _partial_booking(self, rng):
+        booking_id = self._pick(rng)
+        if booking_id is None:
+            return self._create_booking(rng)
+        self.client.partial_booking(booking_id, {"firstname": rng.choice(("Anna", "Omar", "Li"))})
+
+    def _delete_booking(self, rng):
+        with self._lock:
+            booking_id = self.live.popleft() if self.live else None
+        if booking_id is None:
+            return self._create_booking(rng)
+        self.client.delete_booking(booking_id)
+
+    OPERATIONS = {
+        "create_booking": _create_booking,
+        "get_booking_by_id": _get_booking_by_id,
+        "get_bookings_ids": _get_bookings_ids,
+        "partial_booking": _partial_booking,
+        "delete_booking": _delete_booking,
+    }
+
+    def _pick(self, rng):
+        with self._lock:
+            return self.live[rng.randrange(len(self.live))] if self.live else None
+
+    def step(self, rng):
+        name = rng.choices(self.names, weights=self.weights)[0]
+        try:
+            self.OPERATIONS[name](self, rng)
+        except (requests.RequestException, AssertionError, KeyError, ValueError):
+            with self._lock:
+                self.errors[name] += 1
+        with self._lock:
+            self.requests += 1
+
+    def cleanup(self):
+        while self.live:
+            booking_id = self.live.popleft()
+            with contextlib.suppress(requests.RequestException, AssertionError):
+                self.client.delete_booking(booking_id)
+
+
+def fd_counts():
+    # (open file descriptors, of them sockets) from /proc, (None, None) where there is no /proc
+    try:
+        names = os.listdir("/proc/self/fd")
+    except OSError:
+        return None, None
+    sockets = 0
+    for name in names:
+        with contextlib.suppress(OSError):
+            sockets += os.readlink(f"/proc/self/fd/{name}").startswith("socket:")
+    return len(names), sockets
+
+
+class ResourceSample:
+    def __init__(self, elapsed, requests, memory, fds, sockets, connections):
+        self.elapsed = elapsed
+        self.requests = requests
+        self.memory = memory
+        self.fds = fds
+        self.sockets = sockets
+        self.connections = connections
+
+    def to_dict(self):
+        return {"elapsed_s": round(self.elapsed, 3), "requests": self.requests, "memory_kb": round(self.memory / 1024, 1),
+                "fds": self.fds, "sockets": self.sockets, "connections": self.connections}
+
+
+class Trend:
+    # A metric grows without bound when the medians of the first, middle and last third of the
+    # judged samples keep rising and the total rise is over max_growth; max_slope, per request,
+    # additionally keeps a slow one-off rise over a long run from failing it. A pool filling up or
+    # a cache warming levels off, so its last third stops rising
+
+    def __init__(self, name, points, max_growth, max_slope=None):
+        self.name = name
+        self.max_growth = max_growth
+        self.max_slope = max_slope
+        points = [(x, y) for x, y in points if y is not None]
+        self.samples = len(points)
+        self.judged = self.samples >= 6
+        self.first = self.last = self.growth = self.slope = None
+        self.rising = self.unbounded = False
+        if not self.judged:
+            return
+        third = self.samples // 3
+        medians = [statistics.median(y for _, y in part)
+                   for part in (points[:third], points[third:-third], points[-third:])]
+        self.first, self.last = medians[0], medians[2]
+        self.growth = self.last - self.first
+        self.slope = self._slope(points)
+        self.rising = medians[0] < medians[1] < medians[2]
+        self.unbounded = (self.rising and self.growth > max_growth
+                          and (max_slope is None or self.slope > max_slope))
+
+    @staticmethod
+    def _slope(points):
+        # Least squares growth per request
+        mean_x = statistics.fmean(x for x, _ in points)
+        mean_y = statistics.fmean(y for _, y in points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+    def to_dict(self):
+        return {"samples": self.samples, "judged": self.judged, "first": self.first, "last": self.last,
+                "growth": self.growth, "slope_per_request": self.slope, "rising": self.rising,
+                "max_growth": self.max_growth, "unbounded": self.unbounded}
+
+
+class SoakReport:
+    def __init__(self, elapsed, requests, errors, samples, warmup_samples, trends, top_sites):
+        self.elapsed = elapsed
+        self.requests = requests
+        self.errors = errors
+        self.samples = samples
+        self.warmup_samples = warmup_samples
+        self.trends = trends
+        self.top_sites = top_sites
+
+    @property
+    def failed(self):
+        return any(trend.unbounded for trend in self.trends.values())
+
+    def to_dict(self):
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "failed": self.failed,
+            "warmup_samples": self.warmup_samples,
+            "trends": {name: trend.to_dict() for name, trend in self.trends.items()},
+            "top_sites": self.top_sites,
+            "samples": [sample.to_dict() for sample in self.samples],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_text(self):
+        rate = self.requests / self.elapsed if self.elapsed else 0.0
+        errors = sum(self.errors.values())
+        lines = [f"{self.requests} requests in {self.elapsed:.1f}s ({rate:.1f}/s), {errors} errors, "
+                 f"{len(self.samples)} samples, first {self.warmup_samples} as warm-up", ""]
+        header = f"{'metric':<14}{'first':>12}{'last':>12}{'growth':>12}{'per 1k req':>12}  verdict"
+        lines += [header, "-" * len(header)]
+        for name, trend in self.trends.items():
+            if not trend.judged:
+                lines.append(f"{name:<14}{'':>48}  not judged, {trend.samples} samples")
+                continue
+            scale = 1024 if name == "memory" else 1
+            unit = " KB" if name == "memory" else ""
+            verdict = "UNBOUNDED" if trend.unbounded else ("rising" if trend.rising else "bounded")
+            lines.append(f"{name:<14}{trend.first / scale:>12.1f}{trend.last / scale:>12.1f}"
+                         f"{trend.growth / scale:>12.1f}{trend.slope * 1000 / scale:>12.2f}  {verdict}{unit}")
+        if self.top_sites:
+            lines += ["", "Top allocation sites since warm-up:"]
+            for site in self.top_sites:
+                lines.append(f"  {site['size_kb']:>+10.1f} KB {site['count']:>+8} blocks  {site['site']}")
+        return "\n".join(lines)
+
+
+class SoakRunner:
+    # Drives SoakTraffic from `users` threads for `duration` seconds while the calling thread samples
+    # traced Python memory, open fds and sockets, and the client's pooled connections every
+    # `interval` seconds. tracemalloc snapshots bracket the judged part of the run and name the
+    # lines whose allocations grew
+
+    def __init__(self, client, duration=Soak.DURATION.value, interval=Soak.INTERVAL.value, users=1, mix=None,
+                 seed=None, warmup=Soak.WARMUP.value, frames=Soak.TRACE_FRAMES.value, top=Soak.TOP_SITES.value,
+                 max_live=Soak.MAX_LIVE_BOOKINGS.value, max_memory_growth=Soak.MAX_MEMORY_GROWTH_KB.value * 1024,
+                 max_bytes_per_request=Soak.MAX_BYTES_PER_REQUEST.value, max_fd_growth=Soak.MAX_FD_GROWTH.value,
+                 max_connection_growth=Soak.MAX_CONNECTION_GROWTH.value):
+        self.client = client
+        self.traffic = SoakTraffic(client, mix, seed, max_live)
+        self.duration = duration
+        self.interval = interval
+        self.users = users
+        self.warmup = warmup
+        self.frames = frames
+        self.top = top
+        self.limits = {"memory": (max_memory_growth, max_bytes_per_request), "fds": (max_fd_growth, None),
+                       "sockets": (max_fd_growth, None), "connections": (max_connection_growth, None)}
+
+    def _connections(self):
+        open_connections = getattr(self.client.adapter, "open_connections", None)
+        return open_connections() if open_connections is not None else None
+
+    def _sample(self, started):
+        # Unreachable cycles would otherwise show up as growth until the collector gets to them
+        gc.collect()
+        fds, sockets = fd_counts()
+        return ResourceSample(time.perf_counter() - started, self.traffic.requests,
+                              tracemalloc.get_traced_memory()[0], fds, sockets, self._connections())
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _top_sites(self, baseline, final):
+        sites = []
+        for stat in final.compare_to(baseline, "lineno")[:self.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            sites.append({"site": f"{frame.filename}:{frame.lineno}", "size_kb": round(stat.size_diff / 1024, 1),
+                          "count": stat.count_diff})
+        return sites
+
+    def run(self):
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(self.frames)
+        stop = threading.Event()
+
+        def user(index):
+            rng = self.traffic.rng(index)
+            while not stop.is_set():
+                self.traffic.step(rng)
+
+        threads = [threading.Thread(target=user, args=(index,), name=f"soak-user-{index}", daemon=True)
+                   for index in range(self.users)]
+        try:
+            started = time.perf_counter()
+            deadline = started + self.duration
+            warmup_until = started + self.duration * self.warmup
+            for thread in threads:
+                thread.start()
+            samples, baseline, warmup_samples = [], None, 0
+            while True:
+                stop.wait(max(min(self.interval, deadline - time.perf_counter()), 0))
+                samples.append(self._sample(started))
+                if baseline is None:
+                    if time.perf_counter() < warmup_until:
+                        warmup_samples = len(samples)
+                    else:
+                        baseline = self._snapshot()
+                if time.perf_counter() >= deadline:
+                    break
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            final = self._snapshot()
+            top_sites = self._top_sites(baseline, final) if baseline is not None else []
+        finally:
+            stop.set()
+            # Users still running after an error are stopped before their bookings are deleted
+            for thread in threads:
+                if thread.ident is not None:
+                    thread.join()
+            if not tracing:
+                tracemalloc.stop()
+            self.traffic.cleanup()
+
+        judged = samples[warmup_samples:]
+        trends = {name: Trend(name, [(sample.requests, getattr(sample, name)) for sample in judged], *limits)
+                  for name, limits in self.limits.items()}
+        return SoakReport(elapsed, self.traffic.requests, self.traffic.errors, samples, warmup_samples, trends,
+                          top_sites)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.load.soak",
+                                     description="Run mixed booking CRUD through one ApiClient for a long time and "
+                                                 "fail if memory, fds or pooled connections grow without bound.")
+    parser.add_argument("--duration", type=float, default=Soak.DURATION.value, help="run length in seconds")
+    parser.add_argument("--interval", type=float, default=Soak.INTERVAL.value, help="seconds between samples")
+    parser.add_argument("--users", type=int, default=1, help="threads sharing the client")
+    parser.add_argument("--mix", type=Scenario.parse_mix,
+                        default=",".join(f"{name}={weight}" for name, weight in SOAK_MIX.items()))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--base-url", default=None, help="defaults to the URL for $ENVIRONMENT")
+    parser.add_argument("--local", action="store_true", help="run against an in-process stand-in server")
+    parser.add_argument("--transport", choices=("requests", "http1", "http2"), default=Transport.KIND.value)
+    parser.add_argument("--frames", type=int, default=Soak.TRACE_FRAMES.value,
+                        help="traceback depth tracemalloc keeps per allocation")
+    parser.add_argument("--top", type=int, default=Soak.TOP_SITES.value, help="allocation sites to report")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        base_url = args.base_url
+        if args.local:
+            # Flask is only needed for the stand-in
+            from core.server.booking_server import LocalBookingServer
+
+            base_url = stack.enter_context(LocalBookingServer()).url
+        client = ApiClient(base_url=base_url, transport=args.transport, pool_maxsize=max(args.users, 1))
+        stack.callback(client.session.close)
+        client.auth()
+        report = SoakRunner(client, args.duration, args.interval, args.users, args.mix, args.seed,
+                            frames=args.frames, top=args.top).run()
+
+    print(report.to_text())
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            file.write(report.to_json())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import argparse
+import os
+import sys
+
+from core.load.distributed import check_authkey, run_remote_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.load.worker",
+                                     description="Join a distributed load run started with --listen.")
+    parser.add_argument("--connect", required=True, help="coordinator host:port or socket path")
+    parser.add_argument("--base-url", default=None, help="override the coordinator's base URL from this host")
+    parser.add_argument("--authkey", default=os.getenv("LOAD_AUTHKEY"),
+                        help="the coordinator's key, defaults to $LOAD_AUTHKEY")
+    args = parser.parse_args(argv)
+    try:
+        check_authkey(args.authkey and args.authkey.encode())
+    except ValueError as error:
+        parser.error(str(error))
+    run_remote_worker(args.connect, authkey=args.authkey.encode(), base_url=args.base_url)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from functools import lru_cache
+
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional
 from datetime import date
 
@@ -20,3 +22,318 @@ class Booking(BaseModel):
 class BookingResponse(BaseModel):
     booking: Booking
     bookingid: int
+
+
+class BookingId(BaseModel):
+    bookingid: int
+
+
+@lru_cache(maxsize=None)
+def type_adapter(model):
+    # Building a TypeAdapter compiles a validator, so each model type is built only once
+    return TypeAdapter(model)
+
+
+def validate_json(model, raw):
+    # Validates straight from response bytes without an intermediate dict
+    return type_adapter(model).validate_json(raw)
+
+
+def validate_booking(raw) -> Booking:
+    return validate_json(Booking, raw)
+
+
+def validate_booking_response(raw) -> BookingResponse:
+    return validate_json(BookingResponse, raw)
+
+
+def validate_booking_ids(raw) -> list[BookingId]:
+    return validate_json(list[BookingId], raw)
+
+
+# Compact forms for checking many bookings at once: a slotted record per booking, and a batch that
+# keeps each field as one NumPy column with dates as proleptic Gregorian ordinals. A batch holds a
+# large expected set in a fraction of the memory of the payload dicts and reports every mismatch per
+# field; it is not a faster way to compare bookings that are already decoded dicts, building it
+# costs more than the comparisons it replaces
+BOOKING_FIELDS = ("firstname", "lastname", "totalprice", "depositpaid", "checkin", "checkout", "additionalneeds")
+DATE_FIELDS = ("checkin", "checkout")
+# Python types a field may have on the wire; anything else is a difference even when == holds, as
+# with "100" for 100 or 1 for True
+FIELD_TYPES = {
+    "firstname": (str,),
+    "lastname": (str,),
+    "totalprice": (int,),
+    "depositpaid": (bool,),
+    "checkin": (str,),
+    "checkout": (str,),
+    "additionalneeds": (str, type(None)),
+}
+
+FIELD_MESSAGES = {
+    "firstname": "Имя не совпадает",
+    "lastname": "Фамилия не совпадает",
+    "totalprice": "Сумма не совпадает",
+    "depositpaid": "Внесение депозита не совпадает",
+    "checkin": "Дата вселения не совпадает",
+    "checkout": "Дата выселения не совпадает",
+    "additionalneeds": "Дополнительные потребности не совпадают",
+}
+
+# Ordinal for a booking without the date, never a real one
+NO_DATE = 0
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+# Stands in for a field the booking does not have
+MISSING = _Missing()
+
+
+@lru_cache(maxsize=4096)
+def _iso_ordinal(value):
+    return date.fromisoformat(value).toordinal()
+
+
+def date_ordinal(value):
+    if value is None:
+        return NO_DATE
+    if isinstance(value, date):
+        return value.toordinal()
+    return _iso_ordinal(value)
+
+
+def ordinal_date(ordinal):
+    return None if ordinal == NO_DATE else date.fromordinal(int(ordinal)).isoformat()
+
+
+def booking_fields(booking):
+    # Values as they are on the wire, MISSING for absent fields. Takes payloads, {"booking": ...,
+    # "bookingid": ...} responses and pydantic models
+    if isinstance(booking, BaseModel):
+        booking = booking.model_dump(mode="json")
+    if "booking" in booking:
+        booking = booking["booking"]
+    dates = booking.get("bookingdates")
+    dates = dates if isinstance(dates, dict) else {}
+    return (booking.get("firstname", MISSING), booking.get("lastname", MISSING),
+            booking.get("totalprice", MISSING), booking.get("depositpaid", MISSING),
+            dates.get("checkin", MISSING), dates.get("checkout", MISSING), booking.get("additionalneeds", MISSING))
+
+
+def field_differs(expected, actual):
+    if expected is MISSING or actual is MISSING:
+        return expected is not actual
+    return type(expected) is not type(actual) or expected != actual
+
+
+def _describe(value, other):
+    if value is MISSING:
+        return "поле отсутствует"
+    if other is not MISSING and type(value) is not type(other):
+        return f"{value!r} ({type(value).__name__})"
+    return value
+
+
+def field_message(name, expected, actual):
+    return f"{FIELD_MESSAGES[name]}: ожидалось {_describe(expected, actual)}, пришло {_describe(actual, expected)}"
+
+
+def booking_mismatches(actual, expected):
+    return [field_message(name, want, got)
+            for name, want, got in zip(BOOKING_FIELDS, booking_fields(expected), booking_fields(actual))
+            if field_differs(want, got)]
+
+
+def assert_booking_matches(actual, expected):
+    # Plain comparisons field by field, with the messages of the asserts this replaced; every
+    # differing field is reported, not only the first
+    mismatches = booking_mismatches(actual, expected)
+    assert not mismatches, "\n".join(mismatches)
+
+
+class BookingRecord:
+    __slots__ = BOOKING_FIELDS
+
+    def __init__(self, firstname, lastname, totalprice, depositpaid, checkin, checkout, additionalneeds=None):
+        self.firstname = firstname
+        self.lastname = lastname
+        self.totalprice = totalprice
+        self.depositpaid = depositpaid
+        self.checkin = checkin
+        self.checkout = checkout
+        self.additionalneeds = additionalneeds
+
+    @classmethod
+    def from_payload(cls, booking):
+        values = [None if value is MISSING else value for value in booking_fields(booking)]
+        values[4], values[5] = date_ordinal(values[4]), date_ordinal(values[5])
+        return cls(*values)
+
+    def values(self):
+        return tuple(getattr(self, name) for name in BOOKING_FIELDS)
+
+    def display(self, name):
+        value = getattr(self, name)
+        return ordinal_date(value) if name in DATE_FIELDS else value
+
+    def to_payload(self):
+        return {
+            "firstname": self.firstname,
+            "lastname": self.lastname,
+            "totalprice": self.totalprice,
+            "depositpaid": self.depositpaid,
+            "bookingdates": {"checkin": ordinal_date(self.checkin), "checkout": ordinal_date(self.checkout)},
+            "additionalneeds": self.additionalneeds,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, BookingRecord) and self.values() == other.values()
+
+    def __repr__(self):
+        return f"BookingRecord({', '.join(f'{name}={self.display(name)!r}' for name in BOOKING_FIELDS)})"
+
+
+class BookingBatch:
+    # Strings stay Python objects in object columns, shared with the payloads they came from; prices,
+    # flags and date ordinals are packed. Values that are missing or not of the field's type are
+    # kept aside as they came, with a placeholder in the column, and compared one by one
+    COLUMN_TYPES = {"firstname": "object", "lastname": "object", "totalprice": "int64", "depositpaid": "bool",
+                    "checkin": "int32", "checkout": "int32", "additionalneeds": "object"}
+    PLACEHOLDERS = {"firstname": None, "lastname": None, "totalprice": 0, "depositpaid": False,
+                    "checkin": NO_DATE, "checkout": NO_DATE, "additionalneeds": None}
+
+    def __init__(self, columns, ids=None, present=None, odd=None):
+        # NumPy is imported by the batch only, single-booking checks never load it
+        import numpy as np
+
+        self.columns = columns
+        size = len(columns["firstname"])
+        self.ids = np.arange(size) if ids is None else np.asarray(ids)
+        # False where a booking could not be fetched; its fields are placeholders
+        self.present = np.ones(size, dtype=bool) if present is None else np.asarray(present, dtype=bool)
+        # Per field {index: value as it came} for the values kept out of the column
+        self.odd = odd or {}
+
+    @classmethod
+    def from_payloads(cls, bookings, ids=None):
+        # None or an exception in place of a booking marks it missing, e.g. get_bookings(...,
+        # return_exceptions=True) for bookings that were not found
+        import numpy as np
+
+        values = {name: [] for name in BOOKING_FIELDS}
+        odd = {name: {} for name in BOOKING_FIELDS}
+        present = []
+        for index, booking in enumerate(bookings):
+            missing = booking is None or isinstance(booking, BaseException)
+            present.append(not missing)
+            if missing:
+                for name in BOOKING_FIELDS:
+                    values[name].append(cls.PLACEHOLDERS[name])
+                continue
+            for name, value in zip(BOOKING_FIELDS, booking_fields(booking)):
+                if type(value) not in FIELD_TYPES[name]:
+                    odd[name][index], value = value, cls.PLACEHOLDERS[name]
+                elif name in DATE_FIELDS:
+                    try:
+                        value = _iso_ordinal(value)
+                    except ValueError:
+                        odd[name][index], value = value, NO_DATE
+                values[name].append(value)
+        columns = {}
+        for name, column in values.items():
+            if cls.COLUMN_TYPES[name] == "object":
+                columns[name] = np.empty(len(column), dtype=object)
+                columns[name][:] = column
+            else:
+                columns[name] = np.array(column, dtype=cls.COLUMN_TYPES[name])
+        return cls(columns, ids, present, {name: items for name, items in odd.items() if items})
+
+    def __len__(self):
+        return len(self.ids)
+
+    def value(self, name, index):
+        # The field as it came: odd values untouched, dates back as ISO strings
+        odd = self.odd.get(name)
+        if odd and index in odd:
+            return odd[index]
+        value = self.columns[name][index]
+        if name in DATE_FIELDS:
+            return ordinal_date(value)
+        return value.item() if hasattr(value, "item") else value
+
+    def __getitem__(self, index):
+        values = [self.value(name, index) for name in BOOKING_FIELDS]
+        record = BookingRecord(*(None if value is MISSING else value for value in values))
+        record.checkin, record.checkout = int(self.columns["checkin"][index]), int(self.columns["checkout"][index])
+        return record
+
+
+class BookingDiff:
+    def __init__(self, expected, actual, missing, fields):
+        self.expected = expected
+        self.actual = actual
+        # Indices of bookings that were not fetched, and per field the indices that differ
+        self.missing = missing
+        self.fields = fields
+
+    def __bool__(self):
+        return bool(len(self.missing)) or any(len(indices) for indices in self.fields.values())
+
+    def counts(self):
+        return {"missing": int(len(self.missing)),
+                **{name: int(len(indices)) for name, indices in self.fields.items() if len(indices)}}
+
+    def mismatched(self):
+        # Indices of bookings with at least one differing field, in batch order
+        import numpy as np
+
+        indices = [indices for indices in self.fields.values() if len(indices)]
+        return np.unique(np.concatenate(indices)) if indices else np.array([], dtype=np.int64)
+
+    def messages(self, limit=None):
+        # Field by field in the order of BOOKING_FIELDS; a single booking gets the same messages as
+        # assert_booking_matches, a batch prefixes each with the booking id
+        single = len(self.expected) == 1
+        messages = [f"Бронирование {self.expected.ids[index]} не найдено" for index in self.missing]
+        for name in BOOKING_FIELDS:
+            for index in self.fields.get(name, ()):
+                message = field_message(name, self.expected.value(name, index), self.actual.value(name, index))
+                messages.append(message if single else f"Бронирование {self.expected.ids[index]}: {message}")
+        if limit is not None and len(messages) > limit:
+            messages = messages[:limit] + [f"... и ещё {len(messages) - limit}"]
+        return messages
+
+    def message(self, limit=20):
+        return "\n".join(self.messages(limit))
+
+
+def diff_bookings(expected, actual):
+    # expected and actual are BookingBatches of the same bookings in the same order
+    import numpy as np
+
+    if len(expected) != len(actual):
+        raise ValueError(f"Expected {len(expected)} bookings to compare but got {len(actual)}")
+    present = actual.present & expected.present
+    fields = {}
+    for name in BOOKING_FIELDS:
+        differs = np.asarray(expected.columns[name] != actual.columns[name], dtype=bool)
+        # Placeholders may match by accident, values kept out of a column are compared as they came
+        for index in expected.odd.get(name, {}).keys() | actual.odd.get(name, {}).keys():
+            differs[index] = field_differs(expected.value(name, index), actual.value(name, index))
+        fields[name] = np.flatnonzero(differs & present)
+    return BookingDiff(expected, actual, np.flatnonzero(~actual.present), fields)
+
+
+def assert_bookings_match(actual, expected, ids=None, limit=20):
+    # Lists of payloads, responses or models, or BookingBatches; all mismatches are reported at once
+    if not isinstance(expected, BookingBatch):
+        expected = BookingBatch.from_payloads(expected, ids)
+    if not isinstance(actual, BookingBatch):
+        actual = BookingBatch.from_payloads(actual, expected.ids)
+    diff = diff_bookings(expected, actual)
+    assert not diff, diff.message(limit)
+    return diff
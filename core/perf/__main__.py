@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+
+from core.perf.gate import REGRESSION, evaluate, format_results
+from core.perf.history import PerfHistory
+from core.settings.config import PerfGate
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.perf",
+                                     description="Keep per-endpoint API latency across runs and gate on regressions.")
+    parser.add_argument("--db", default=PerfGate.DB_PATH.value, help="SQLite history, defaults to $PERF_HISTORY_DB")
+    parser.add_argument("--environment", default=os.getenv("ENVIRONMENT"), help="defaults to $ENVIRONMENT")
+    parser.add_argument("--commit", default=os.getenv("GIT_COMMIT"), help="defaults to $GIT_COMMIT")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="append an api-timings.json to the history")
+    record.add_argument("timings", help="api-timings.json written by the pytest session")
+
+    gate = commands.add_parser("gate", help="compare the commit's run with the rolling baseline, exit 1 on "
+                                            "a significant p50/p99 regression")
+    gate.add_argument("--baseline-runs", type=int, default=PerfGate.BASELINE_RUNS.value)
+    gate.add_argument("--min-baseline-runs", type=int, default=PerfGate.MIN_BASELINE_RUNS.value)
+    gate.add_argument("--min-samples", type=int, default=PerfGate.MIN_SAMPLES.value,
+                      help="requests an endpoint needs in the current run to be judged")
+    gate.add_argument("--confidence", type=float, default=PerfGate.CONFIDENCE.value,
+                      help="for the whole build: a build without changes fails at most (1 - CONFIDENCE) / 2 of "
+                           "the time, the prediction intervals of the metrics share it")
+    gate.add_argument("--min-effect", type=float, default=PerfGate.MIN_EFFECT.value,
+                      help="smallest relative increase that counts as a regression, e.g. 0.1 for 10%%")
+    gate.add_argument("--bootstrap-samples", type=int, default=PerfGate.BOOTSTRAP_SAMPLES.value,
+                      help="for the reported interval of the current run's percentiles")
+    gate.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not args.environment:
+        parser.error("--environment or $ENVIRONMENT is required")
+    if args.command == "record" and not args.commit:
+        parser.error("--commit or $GIT_COMMIT is required")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with PerfHistory(args.db) as history:
+        if args.command == "record":
+            run_id = history.record_file(args.timings, args.commit, args.environment)
+            print(f"Recorded run {run_id} for {args.commit} on {args.environment} in {args.db}")
+            return 0
+
+        try:
+            run, results = evaluate(history, args.environment, args.commit, args.baseline_runs,
+                                    confidence=args.confidence, min_effect=args.min_effect,
+                                    min_baseline_runs=args.min_baseline_runs, min_samples=args.min_samples,
+                                    samples=args.bootstrap_samples, seed=args.seed)
+        except LookupError as error:
+            print(error, file=sys.stderr)
+            return 2
+
+    print(f"Run {run['id']} ({run['git_commit']}, {run['environment']}) against up to "
+          f"{args.baseline_runs} earlier runs, {args.confidence:.0%} build confidence over the prediction intervals of their p50/p99")
+    print(format_results(results))
+    regressions = [result for result in results if result.status == REGRESSION]
+    if regressions:
+        print(f"{len(regressions)} significant latency regression(s): "
+              + ", ".join(f"{result.endpoint} {result.metric[:3]}" for result in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import functools
+import math
+
+import numpy as np
+
+from core.load.histogram import bucket_range
+from core.settings.config import PerfGate
+
+METRICS = {"p50_ms": 50, "p99_ms": 99}
+
+OK = "ok"
+REGRESSION = "regression"
+IMPROVED = "improved"
+SKIPPED = "skipped"
+
+
+class GateResult:
+    def __init__(self, endpoint, metric, current, baseline_runs, samples):
+        self.endpoint = endpoint
+        self.metric = metric
+        self.status = SKIPPED
+        self.reason = ""
+        self.baseline = None
+        # Prediction interval of the baseline runs
+        self.baseline_range = None
+        self.current = current
+        self.current_ci = None
+        self.baseline_runs = baseline_runs
+        self.samples = samples
+
+    @property
+    def change(self):
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline - 1
+
+
+def mad_scale(values):
+    # The median absolute deviation, scaled to estimate the standard deviation of normal values
+    return 1.4826 * float(np.median(np.abs(values - np.median(values))))
+
+
+@functools.lru_cache(maxsize=64)
+def pivot_quantile(probability, runs, draws=PerfGate.PIVOT_DRAWS.value):
+    # Quantile of (next value - median) / mad_scale over `runs` values when all of them come from
+    # one normal distribution. The MAD has about a third of the efficiency of the standard
+    # deviation, so Student's t is far too narrow for a few dozen runs; the ratio does not depend
+    # on the distribution's mean or spread, so it is simulated once per number of runs
+    rng = np.random.default_rng(0)
+    ratios = []
+    for start in range(0, draws, 50_000):
+        runs_values = rng.standard_normal((min(draws - start, 50_000), runs))
+        center = np.median(runs_values, axis=1)
+        scale = 1.4826 * np.median(np.abs(runs_values - center[:, None]), axis=1)
+        ratios.append((rng.standard_normal(len(center)) - center) / scale)
+    return float(np.quantile(np.concatenate(ratios), probability))
+
+
+def prediction_interval(values, confidence=PerfGate.CONFIDENCE.value):
+    # Where the next run's value should fall if nothing changed. Each baseline value already
+    # carries both the sampling noise within its run and the drift between runs, so their spread
+    # is the yardstick, not how precisely their median is known. Latencies vary by ratio, so the
+    # interval is built on logs, around their median and scaled by their MAD: one baseline run
+    # hit by a network blip moves neither
+    logs = np.log(np.asarray(values, dtype=float))
+    center = float(np.median(logs))
+    margin = pivot_quantile((1 + confidence) / 2, len(logs)) * mad_scale(logs)
+    return math.exp(center), (math.exp(center - margin), math.exp(center + margin))
+
+
+def percentile_ci(histogram, percentile, confidence=PerfGate.CONFIDENCE.value,
+                  samples=PerfGate.BOOTSTRAP_SAMPLES.value, rng=None):
+    # The current run has one value per request only as histogram buckets: resample the request
+    # counts multinomially and read the percentile off each resample at bucket midpoints, the
+    # same way LatencyHistogram.percentile_us does
+    rng = rng or np.random.default_rng()
+    filled = sorted((int(index), bucket_count) for index, bucket_count in histogram["counts"].items())
+    counts = np.array([bucket_count for _, bucket_count in filled], dtype=np.int64)
+    midpoints = np.array([sum(bucket_range(index)) // 2 for index, _ in filled], dtype=float) / 1000
+    total = int(counts.sum())
+    rank = max(math.ceil(percentile / 100 * total), 1)
+
+    point = midpoints[np.searchsorted(np.cumsum(counts), rank)]
+    resampled = rng.multinomial(total, counts / total, size=samples).cumsum(axis=1)
+    estimates = midpoints[(resampled < rank).sum(axis=1)]
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(estimates, [alpha, 1 - alpha])
+    return float(point), (float(low), float(high))
+
+
+def compare(current, baseline, confidence=PerfGate.CONFIDENCE.value, min_effect=PerfGate.MIN_EFFECT.value,
+            min_baseline_runs=PerfGate.MIN_BASELINE_RUNS.value, min_samples=PerfGate.MIN_SAMPLES.value,
+            samples=PerfGate.BOOTSTRAP_SAMPLES.value, seed=None):
+    # current: {endpoint: row} of the run under test; baseline: the same for each earlier run.
+    # A regression needs the value to fall outside the baseline runs' prediction interval and to
+    # move by min_effect, so the build fails neither on run-to-run noise nor on real but
+    # negligible shifts. confidence holds for the build: any judged metric can fail it, so each
+    # gets an equal share of the error rate (Bonferroni)
+    rng = np.random.default_rng(seed)
+    results = []
+    judged = []
+    for endpoint, row in sorted(current.items()):
+        history = [run[endpoint] for run in baseline if endpoint in run]
+        for metric, percentile in METRICS.items():
+            result = GateResult(endpoint, metric, row[metric], len(history), row["count"])
+            results.append(result)
+            if len(history) < min_baseline_runs:
+                result.reason = f"{len(history)} baseline runs, need {min_baseline_runs}"
+                continue
+            if row["count"] < min_samples or not row["histogram"]:
+                result.reason = f"{row['count']} requests, need {min_samples}"
+                continue
+            judged.append((result, [run[metric] for run in history], row["histogram"], percentile))
+
+    metric_confidence = 1 - (1 - confidence) / max(len(judged), 1)
+    for result, values, histogram, percentile in judged:
+        result.baseline, result.baseline_range = prediction_interval(values, metric_confidence)
+        # The point estimate stays the recorded percentile, comparable with the baseline values;
+        # its own interval is only reported, the baseline range already allows for that noise
+        _, result.current_ci = percentile_ci(histogram, percentile, metric_confidence, samples, rng)
+        change = result.change or 0.0
+        if result.current > result.baseline_range[1] and change >= min_effect:
+            result.status = REGRESSION
+        elif result.current < result.baseline_range[0] and -change >= min_effect:
+            result.status = IMPROVED
+        else:
+            result.status = OK
+    return results
+
+
+def evaluate(history, environment, commit=None, baseline_runs=PerfGate.BASELINE_RUNS.value, **compare_kwargs):
+    # Judges the latest run of the commit (or of the environment) against the runs before it
+    run = history.latest_run(environment, commit)
+    if run is None:
+        raise LookupError(f"No recorded run for environment {environment!r}"
+                          + (f" and commit {commit!r}" if commit else ""))
+    runs = history.baseline_runs(environment, baseline_runs, exclude_commit=run["git_commit"],
+                                 before=run["recorded_at"])
+    endpoints = history.endpoints([run["id"], *(baseline["id"] for baseline in runs)])
+    current = endpoints.pop(run["id"])
+    return run, compare(current, list(endpoints.values()), **compare_kwargs)
+
+
+def format_results(results):
+    def interval(value, bounds):
+        if value is None:
+            return "-"
+        if bounds is None:
+            return f"{value:.2f}"
+        return f"{value:.2f} [{bounds[0]:.2f}, {bounds[1]:.2f}]"
+
+    lines = [f"{'endpoint':<26}{'metric':<8}{'baseline ms':>28}{'current ms':>28}{'change':>9}  status"]
+    for result in results:
+        change = f"{result.change:+.1%}" if result.change is not None and result.status != SKIPPED else "-"
+        status = f"{result.status} ({result.reason})" if result.reason else result.status
+        lines.append(f"{result.endpoint:<26}{result.metric[:3]:<8}"
+                     f"{interval(result.baseline, result.baseline_range):>28}"
+                     f"{interval(result.current, result.current_ci):>28}{change:>9}  {status}")
+    return "\n".join(lines)
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import time
+
+from core.settings.config import PerfGate
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    git_commit TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_environment ON runs (environment, recorded_at);
+CREATE TABLE IF NOT EXISTS endpoint_timings (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL NOT NULL,
+    p90_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    mean_ms REAL NOT NULL,
+    histogram TEXT,
+    PRIMARY KEY (run_id, endpoint)
+);
+"""
+
+
+class PerfHistory:
+    # One row per test run and one per endpoint of that run, taken from the api-timings.json
+    # summary; the raw total-latency buckets are kept so percentiles can be resampled later
+
+    def __init__(self, path=PerfGate.DB_PATH.value):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, timings, commit, environment, recorded_at=None):
+        with self.connection:
+            run_id = self.connection.execute(
+                "INSERT INTO runs (git_commit, environment, recorded_at) VALUES (?, ?, ?)",
+                (commit, environment, time.time() if recorded_at is None else recorded_at)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO endpoint_timings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, endpoint, summary["count"], total["p50_ms"], total["p90_ms"], total["p99_ms"],
+                  total["mean_ms"], json.dumps(summary["histogram"]) if "histogram" in summary else None)
+                 for endpoint, summary in sorted(timings.items())
+                 for total in [summary["phases"].get("total")] if total])
+        return run_id
+
+    def record_file(self, path, commit, environment, recorded_at=None):
+        with open(path) as file:
+            return self.record(json.load(file), commit, environment, recorded_at)
+
+    def latest_run(self, environment, commit=None):
+        query = "SELECT * FROM runs WHERE environment = ?"
+        params = [environment]
+        if commit is not None:
+            query += " AND git_commit = ?"
+            params.append(commit)
+        return self.connection.execute(query + " ORDER BY recorded_at DESC, id DESC LIMIT 1", params).fetchone()
+
+    def baseline_runs(self, environment, limit=PerfGate.BASELINE_RUNS.value, exclude_commit=None, before=None):
+        # The most recent runs for the environment; runs of the commit under test are left out so
+        # a rebuild cannot become its own baseline
+        query = "SELECT * FROM runs WHERE environment = ?"
+        params = [environment]
+        if exclude_commit is not None:
+            query += " AND git_commit != ?"
+            params.append(exclude_commit)
+        if before is not None:
+            query += " AND recorded_at <= ?"
+            params.append(before)
+        query += " ORDER BY recorded_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return self.connection.execute(query, params).fetchall()
+
+    def endpoints(self, run_ids):
+        # {run_id: {endpoint: row}} with the histogram decoded
+        run_ids = list(run_ids)
+        result = {run_id: {} for run_id in run_ids}
+        if not run_ids:
+            return result
+        rows = self.connection.execute(
+            f"SELECT * FROM endpoint_timings WHERE run_id IN ({','.join('?' * len(run_ids))})", run_ids)
+        for row in rows:
+            entry = dict(row)
+            entry["histogram"] = json.loads(entry["histogram"]) if entry["histogram"] else None
+            result[row["run_id"]][row["endpoint"]] = entry
+        return result
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+
+def import_times(statement, cwd=None, env=None):
+    # Cold-start breakdown of `python -X importtime -c statement` in a fresh interpreter:
+    # {module: (self_us, cumulative_us)}, in import order
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def format_breakdown(times, top=20):
+    lines = [f"{'cumulative ms':>14}{'self ms':>10}  module"]
+    for module, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][1])[:top]:
+        lines.append(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {module}")
+    return "\n".join(lines)
@@ -0,0 +1,339 @@
+import base64
+import bisect
+import random
+import secrets
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from flask import Flask, Response, jsonify, request
+from pydantic import ValidationError
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from core.models.booking import Booking
+from core.settings.config import Users
+
+
+REQUIRED_FIELDS = ("firstname", "lastname", "totalprice", "depositpaid", "bookingdates")
+
+
+class BookingStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bookings = {}
+        self._next_id = 1
+        self._by_firstname = defaultdict(set)
+        self._by_lastname = defaultdict(set)
+        # Sorted (date, booking_id) pairs, ISO dates sort lexicographically
+        self._by_checkin = []
+        self._by_checkout = []
+
+    def __len__(self):
+        return len(self._bookings)
+
+    def _index(self, booking_id, booking):
+        self._by_firstname[booking["firstname"]].add(booking_id)
+        self._by_lastname[booking["lastname"]].add(booking_id)
+        bisect.insort(self._by_checkin, (booking["bookingdates"]["checkin"], booking_id))
+        bisect.insort(self._by_checkout, (booking["bookingdates"]["checkout"], booking_id))
+
+    def _unindex(self, booking_id, booking):
+        self._by_firstname[booking["firstname"]].discard(booking_id)
+        self._by_lastname[booking["lastname"]].discard(booking_id)
+        for index, key in ((self._by_checkin, "checkin"), (self._by_checkout, "checkout")):
+            position = bisect.bisect_left(index, (booking["bookingdates"][key], booking_id))
+            del index[position]
+
+    def create(self, booking):
+        with self._lock:
+            booking_id = self._next_id
+            self._next_id += 1
+            self._bookings[booking_id] = booking
+            self._index(booking_id, booking)
+            return booking_id
+
+    def get(self, booking_id):
+        with self._lock:
+            return self._bookings.get(booking_id)
+
+    # Both return False when the booking is gone, e.g. deleted by a concurrent request after the
+    # handler looked it up
+    def replace(self, booking_id, booking):
+        with self._lock:
+            current = self._bookings.get(booking_id)
+            if current is None:
+                return False
+            self._unindex(booking_id, current)
+            self._bookings[booking_id] = booking
+            self._index(booking_id, booking)
+            return True
+
+    def delete(self, booking_id):
+        with self._lock:
+            current = self._bookings.pop(booking_id, None)
+            if current is None:
+                return False
+            self._unindex(booking_id, current)
+            return True
+
+    def search(self, firstname=None, lastname=None, checkin=None, checkout=None):
+        with self._lock:
+            candidates = []
+            if firstname is not None:
+                candidates.append(self._by_firstname.get(firstname, set()))
+            if lastname is not None:
+                candidates.append(self._by_lastname.get(lastname, set()))
+            for index, value in ((self._by_checkin, checkin), (self._by_checkout, checkout)):
+                if value is not None:
+                    position = bisect.bisect_left(index, (value, 0))
+                    candidates.append({booking_id for _, booking_id in index[position:]})
+            if not candidates:
+                return sorted(self._bookings)
+            candidates.sort(key=len)
+            return sorted(candidates[0].intersection(*candidates[1:]))
+
+
+class Faults:
+    # capacity caps the requests in flight: extra ones are refused with error_status, and with
+    # latency as the service time the server sustains at most capacity / latency requests per second
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, capacity=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.capacity = capacity
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def reset(self):
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.error_status = 503
+        self.capacity = None
+
+    def apply(self):
+        with self._lock:
+            self.in_flight += 1
+            overloaded = self.capacity is not None and self.in_flight > self.capacity
+        if overloaded:
+            return Response("Service Unavailable", status=self.error_status)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return Response("Service Unavailable", status=self.error_status)
+        return None
+
+    def finish(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def parse_booking(payload, partial_of=None):
+    if not isinstance(payload, dict):
+        return None
+    if partial_of is not None:
+        payload = {**partial_of, **payload,
+                   "bookingdates": {**partial_of["bookingdates"], **(payload.get("bookingdates") or {})}}
+    if any(field not in payload for field in REQUIRED_FIELDS):
+        return None
+    try:
+        booking = Booking.model_validate({**payload, "additionalneeds": payload.get("additionalneeds")})
+    except ValidationError:
+        return None
+    data = booking.model_dump(mode="json")
+    if data["additionalneeds"] is None:
+        del data["additionalneeds"]
+    return data
+
+
+def conditional(response):
+    # Like restful-booker, reads carry an ETag and answer a matching If-None-Match with 304
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def create_app(store=None, faults=None):
+    app = Flask(__name__)
+    app.store = store or BookingStore()
+    app.faults = faults or Faults()
+    tokens = set()
+    basic_credentials = base64.b64encode(f"{Users.USERNAME.value}:{Users.PASSWORD.value}".encode()).decode()
+
+    def authorized():
+        return (request.cookies.get("token") in tokens
+                or request.headers.get("Authorization") == f"Basic {basic_credentials}")
+
+    @app.before_request
+    def inject_faults():
+        return app.faults.apply()
+
+    @app.teardown_request
+    def release_faults(error=None):
+        app.faults.finish()
+
+    @app.get("/ping")
+    def ping():
+        return Response("Created", status=201)
+
+    @app.post("/auth")
+    def auth():
+        payload = request.get_json(silent=True) or {}
+        if payload.get("username") == Users.USERNAME.value and payload.get("password") == Users.PASSWORD.value:
+            token = secrets.token_hex(8)
+            tokens.add(token)
+            return jsonify(token=token)
+        return jsonify(reason="Bad credentials")
+
+    @app.get("/booking")
+    def get_bookings_ids():
+        filters = {key: request.args.get(key) for key in ("firstname", "lastname", "checkin", "checkout")}
+        return conditional(jsonify([{"bookingid": booking_id} for booking_id in app.store.search(**filters)]))
+
+    @app.post("/booking")
+    def create_booking():
+        booking = parse_booking(request.get_json(silent=True))
+        if booking is None:
+            return Response("Internal Server Error", status=500)
+        return jsonify(bookingid=app.store.create(booking), booking=booking)
+
+    @app.get("/booking/<int:booking_id>")
+    def get_booking(booking_id):
+        booking = app.store.get(booking_id)
+        if booking is None:
+            return Response("Not Found", status=404)
+        return conditional(jsonify(booking))
+
+    @app.route("/booking/<int:booking_id>", methods=["PUT", "PATCH"])
+    def update_booking(booking_id):
+        if not authorized():
+            return Response("Forbidden", status=403)
+        current = app.store.get(booking_id)
+        if current is None:
+            return Response("Method Not Allowed", status=405)
+        partial_of = current if request.method == "PATCH" else None
+        booking = parse_booking(request.get_json(silent=True), partial_of=partial_of)
+        if booking is None:
+            return Response("Bad Request", status=400)
+        if not app.store.replace(booking_id, booking):
+            return Response("Method Not Allowed", status=405)
+        return jsonify(booking)
+
+    @app.delete("/booking/<int:booking_id>")
+    def delete_booking(booking_id):
+        if not authorized():
+            return Response("Forbidden", status=403)
+        if not app.store.delete(booking_id):
+            return Response("Method Not Allowed", status=405)
+        return Response("Created", status=201)
+
+    return app
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class LocalBookingServer:
+    def __init__(self, host="127.0.0.1", port=0, store=None, faults=None, quiet=True):
+        self.app = create_app(store=store, faults=faults)
+        self._server = make_server(host, port, self.app, threaded=True,
+                                   request_handler=QuietRequestHandler if quiet else None)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def store(self):
+        return self.app.store
+
+    @property
+    def faults(self):
+        return self.app.faults
+
+    def start(self):
+        # shutdown() waits for the next poll, half a second by default, and tests start many servers
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.01},
+                                        name="local-booking-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class H2BookingServer(LocalBookingServer):
+    # Same app served by hypercorn, which speaks cleartext HTTP/2 (prior knowledge) and keep-alive
+    # HTTP/1.1; Werkzeug only does HTTP/1.1 with Connection: close. hypercorn is optional and only
+    # imported here
+
+    def __init__(self, host="127.0.0.1", port=0, store=None, faults=None, quiet=True):
+        self.app = create_app(store=store, faults=faults)
+        if not port:
+            with socket.socket() as probe:
+                probe.bind((host, 0))
+                port = probe.getsockname()[1]
+        self.host, self.port = host, port
+        self.quiet = quiet
+        self._loop = None
+        self._shutdown = None
+        self._started = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _serve(self):
+        import asyncio
+
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+
+        config = Config()
+        config.bind = [f"{self.host}:{self.port}"]
+        config.graceful_timeout = 0
+        if self.quiet:
+            config.accesslog = None
+            config.errorlog = None
+        self._loop = asyncio.new_event_loop()
+        if self.quiet:
+            # Connections still open at shutdown are cancelled, which asyncio would log as errors
+            self._loop.set_exception_handler(lambda loop, context: None)
+        self._shutdown = asyncio.Event()
+        self._loop.call_soon(self._started.set)
+        self._loop.run_until_complete(serve(self.app, config, shutdown_trigger=self._shutdown.wait, mode="wsgi"))
+        self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="h2-booking-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        # Wait until the listening socket accepts, serve() binds after the loop is running
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection((self.host, self.port), timeout=0.1).close()
+                return self
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._shutdown.set)
+            self._thread.join()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from enum import Enum
 
 
@@ -8,3 +10,123 @@ class Users(Enum):
 
 class Timeouts(Enum):
     TIMEOUT = 5
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 10
+
+
+class EndpointTimeouts(Enum):
+    # (connect, read) per endpoint, looked up by Endpoints member name
+    PING_ENDPOINT = (3.05, 5)
+    AUTH_ENDPOINT = (3.05, 5)
+    BOOKING_ENDPOINT = (3.05, 10)
+
+
+class Pool(Enum):
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 20
+    POOL_BLOCK = False
+
+
+class Retries(Enum):
+    TOTAL = 3
+    BACKOFF_FACTOR = 0.3
+    STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+
+class Concurrency(Enum):
+    MAX_CONNECTIONS = 100
+    BULK_CONCURRENCY = 20
+
+
+class TokenCache(Enum):
+    TTL = 600
+    DIRECTORY = os.getenv('TOKEN_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'rybooking-tokens'))
+
+
+class DataGeneration(Enum):
+    POOL_SIZE = 1000
+    BATCH_SIZE = 10_000
+    MAX_CHECKIN_OFFSET = 365
+    MAX_STAY = 14
+
+
+class CassetteSettings(Enum):
+    PATH = os.path.join('cassettes', 'session.cassette')
+
+
+class ResponseCacheSettings(Enum):
+    MAX_ENTRIES = 1024
+    MAX_BYTES = 8 * 1024 * 1024
+    TTL = 30
+
+
+class Transport(Enum):
+    # requests: urllib3 pool (default); http1 / http2: httpx, HTTP/2 falls back to HTTP/1.1
+    KIND = os.getenv('API_TRANSPORT', 'requests')
+    # Idempotent requests failed by a server GOAWAY are sent again at most this many times
+    GOAWAY_RESENDS = 3
+
+
+class AdaptiveConcurrency(Enum):
+    INITIAL_LIMIT = 10
+    MIN_LIMIT = 1
+    MAX_LIMIT = 200
+    BACKOFF = 0.5
+    # A success slower than this multiple of the latency baseline does not raise the limit
+    LATENCY_TOLERANCE = 2.0
+
+
+class CircuitBreakerSettings(Enum):
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 5.0
+
+
+class PerfGate(Enum):
+    DB_PATH = os.getenv('PERF_HISTORY_DB', 'perf-history.sqlite')
+    BASELINE_RUNS = 20
+    # Fewer baseline runs, or fewer requests in the current run, and the endpoint is not judged
+    MIN_BASELINE_RUNS = 5
+    MIN_SAMPLES = 20
+    # For the whole build, split between the judged metrics: a build without changes fails by
+    # chance at most (1 - CONFIDENCE) / 2 of the time, however many endpoints it has
+    CONFIDENCE = 0.95
+    # A significant change still has to be at least this relative increase to fail the build
+    MIN_EFFECT = 0.10
+    BOOTSTRAP_SAMPLES = 2000
+    # Draws simulating the median/MAD ratio behind the prediction intervals, once per baseline size
+    PIVOT_DRAWS = 200_000
+
+
+class ImportBudget(Enum):
+    # Modules loaded by a cold import in a fresh interpreter. Counted rather than timed so the
+    # check does not depend on machine load; pydantic, numpy or Faker each add well over 100
+    API_CLIENT_MODULES = 300
+    CONFTEST_MODULES = 480
+
+
+class Reporting(Enum):
+    # full: every step and attachment goes to Allure as it happens. buffered: steps are aggregated
+    # in memory and written once per test as "title ×count, p50, p99"; per-request attachments
+    # are only counted
+    MODE = os.getenv('ALLURE_REPORTING', 'full')
+    BUFFER_SIZE = 65_536
+    DRAIN_INTERVAL = 0.2
+    # 0 aggregates only; N also keeps every Nth call of a step as its own step
+    SAMPLE_EVERY = int(os.getenv('ALLURE_SAMPLE_EVERY', '0'))
+    MAX_SAMPLES = 20
+
+
+class Soak(Enum):
+    DURATION = float(os.getenv('SOAK_DURATION', '300'))
+    INTERVAL = float(os.getenv('SOAK_INTERVAL', '5'))
+    # Samples from the first part of the run are not judged: pools fill, caches warm, the token is fetched
+    WARMUP = 0.2
+    # Live bookings are capped, so the server's store stays bounded while traffic keeps creating
+    MAX_LIVE_BOOKINGS = 50
+    TRACE_FRAMES = 1
+    TOP_SITES = 10
+    # Growth across the judged samples that fails the run when it also rises from third to third
+    MAX_MEMORY_GROWTH_KB = 512
+    MAX_BYTES_PER_REQUEST = 64
+    MAX_FD_GROWTH = 8
+    MAX_CONNECTION_GROWTH = 4
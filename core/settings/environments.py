@@ -1,7 +1,16 @@
 from enum import Enum
+from functools import lru_cache
 
 
 class Environment(Enum):
     TEST = "test"
     PROD = "production"
+    LOCAL = "local"
 
+
+@lru_cache(maxsize=None)
+def load_environment():
+    # .env only holds the base URLs, so it is read the first time one is looked up, not on import
+    from dotenv import load_dotenv
+
+    load_dotenv()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import allure
+import httpx
+import pytest
+
+from core.clients.async_api_client import AsyncApiClient
+from core.models.booking import assert_bookings_match
+
+
+BASE_URL = "http://booker.test"
+
+
+def make_booking_handler(state):
+    async def handler(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.001)
+            if request.method == "POST":
+                booking = json.loads(request.content)
+                state["next_id"] += 1
+                return httpx.Response(200, json={"bookingid": state["next_id"], "booking": booking})
+            booking_id = int(request.url.path.rsplit("/", 1)[-1])
+            if request.method == "DELETE":
+                return httpx.Response(201, text="Created")
+            return httpx.Response(200, json={"firstname": f"name-{booking_id}"})
+        finally:
+            state["in_flight"] -= 1
+
+    return handler
+
+
+@pytest.fixture
+def booking_state():
+    return {"in_flight": 0, "max_in_flight": 0, "next_id": 0}
+
+
+@pytest.fixture
+async def mocked_async_client(booking_state):
+    transport = httpx.MockTransport(make_booking_handler(booking_state))
+    async with AsyncApiClient(base_url=BASE_URL, transport=transport) as client:
+        yield client
+
+
+@allure.feature('Test async client')
+@allure.story('Bulk reads keep input order and respect concurrency limit')
+@pytest.mark.anyio
+async def test_get_bookings_keeps_order(mocked_async_client, booking_state):
+    booking_ids = list(range(50, 0, -1))
+
+    bookings = await mocked_async_client.get_bookings(booking_ids, concurrency=5)
+
+    assert [booking["firstname"] for booking in bookings] == [f"name-{i}" for i in booking_ids]
+    assert booking_state["max_in_flight"] <= 5
+
+
+@allure.feature('Test async client')
+@allure.story('Bulk create and delete')
+@pytest.mark.anyio
+async def test_create_and_delete_bookings(mocked_async_client, generate_random_booking_data):
+    payloads = [dict(generate_random_booking_data, firstname=f"user-{i}") for i in range(20)]
+
+    created = await mocked_async_client.create_bookings(payloads, concurrency=4)
+
+    assert [item["booking"]["firstname"] for item in created] == [p["firstname"] for p in payloads]
+    deleted = await mocked_async_client.delete_bookings([item["bookingid"] for item in created])
+    assert all(deleted)
+
+
+@allure.feature('Test async client')
+@allure.story('Concurrent reads through the authenticated session client')
+@pytest.mark.anyio
+async def test_get_bookings_concurrently(async_api_client, generate_random_booking_data):
+    payloads = [dict(generate_random_booking_data, totalprice=100 + i) for i in range(10)]
+    booking_ids = [item["bookingid"] for item in await async_api_client.create_bookings(payloads, concurrency=5)]
+    try:
+        bookings = await async_api_client.get_bookings(booking_ids, concurrency=5)
+
+        assert_bookings_match(bookings, payloads, ids=booking_ids)
+    finally:
+        await async_api_client.delete_bookings(booking_ids, return_exceptions=True)
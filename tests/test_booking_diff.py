@@ -0,0 +1,103 @@
+import json
+import re
+
+import allure
+import pytest
+
+from core.clients.async_api_client import AsyncApiClient
+from core.models.booking import (BookingBatch, BookingRecord, NO_DATE, assert_booking_matches,
+                                 assert_bookings_match, booking_mismatches, diff_bookings, validate_booking)
+
+
+@allure.feature('Test booking diff')
+@allure.story('Single booking mismatches keep the field-by-field messages')
+def test_single_booking_messages(generate_random_booking_data):
+    expected = generate_random_booking_data
+    actual = dict(expected, lastname="Other", depositpaid=not expected["depositpaid"],
+                  bookingdates=dict(expected["bookingdates"], checkout="2030-01-01"))
+
+    with pytest.raises(AssertionError) as error:
+        assert_booking_matches(actual, expected)
+
+    assert str(error.value).splitlines()[:3] == [
+        f"Фамилия не совпадает: ожидалось {expected['lastname']}, пришло Other",
+        f"Внесение депозита не совпадает: ожидалось {expected['depositpaid']}, пришло {actual['depositpaid']}",
+        f"Дата выселения не совпадает: ожидалось {expected['bookingdates']['checkout']}, пришло 2030-01-01",
+    ]
+    assert_booking_matches({"bookingid": 1, "booking": expected}, validate_booking(json.dumps(expected)))
+
+
+@allure.feature('Test booking diff')
+@allure.story('A missing field or a value of another type is a mismatch even where == holds')
+@pytest.mark.parametrize("field, value, message", [
+    ("totalprice", "100", "Сумма не совпадает: ожидалось 100 (int), пришло '100' (str)"),
+    ("depositpaid", None, "Внесение депозита не совпадает: ожидалось False, пришло поле отсутствует"),
+    ("depositpaid", "false", "Внесение депозита не совпадает: ожидалось False (bool), пришло 'false' (str)"),
+])
+def test_type_and_presence_mismatches(generate_random_booking_data, field, value, message):
+    expected = dict(generate_random_booking_data, totalprice=100, depositpaid=False)
+    actual = dict(expected, **{field: value})
+    if value is None:
+        del actual[field]
+
+    assert booking_mismatches(actual, expected) == [message]
+    with pytest.raises(AssertionError, match=re.escape(message)):
+        assert_booking_matches(actual, expected)
+    diff = diff_bookings(BookingBatch.from_payloads([expected, expected]), BookingBatch.from_payloads([expected, actual]))
+    assert diff.counts() == {"missing": 0, field: 1}
+    assert diff.messages() == [f"Бронирование 1: {message}"]
+    assert not diff_bookings(BookingBatch.from_payloads([actual]), BookingBatch.from_payloads([actual]))
+
+
+@allure.feature('Test booking diff')
+@allure.story('Records keep dates as ordinals and round-trip the payload')
+def test_booking_record(generate_random_booking_data):
+    record = BookingRecord.from_payload(generate_random_booking_data)
+
+    assert isinstance(record.checkin, int) and record.checkin < record.checkout
+    assert record.to_payload() == generate_random_booking_data
+    assert not hasattr(record, "__dict__")
+    assert BookingRecord.from_payload({"firstname": "Jim"}).checkin == NO_DATE
+
+
+@allure.feature('Test booking diff')
+@allure.story('Bulk diff reports missing bookings and mismatches per field')
+def test_bulk_diff(booking_generator):
+    expected = list(booking_generator.iter_bookings(20_000))
+    actual = [dict(booking) for booking in expected]
+    actual[10]["totalprice"] += 1
+    actual[20]["bookingdates"] = dict(actual[20]["bookingdates"], checkin="2000-01-01")
+    actual[20]["additionalneeds"] = None
+    actual[30] = None
+
+    diff = diff_bookings(BookingBatch.from_payloads(expected, ids=range(1, 20_001)),
+                         BookingBatch.from_payloads(actual, ids=range(1, 20_001)))
+
+    assert diff.counts() == {"missing": 1, "totalprice": 1, "checkin": 1, "additionalneeds": 1}
+    assert diff.mismatched().tolist() == [10, 20]
+    assert diff.messages()[:2] == [
+        "Бронирование 31 не найдено",
+        f"Бронирование 11: Сумма не совпадает: ожидалось {expected[10]['totalprice']}, "
+        f"пришло {expected[10]['totalprice'] + 1}",
+    ]
+    assert diff.messages(limit=2)[-1] == "... и ещё 2"
+    assert not diff_bookings(BookingBatch.from_payloads(expected), BookingBatch.from_payloads(expected))
+
+
+@allure.feature('Test booking diff')
+@allure.story('Bookings seeded in bulk are verified in one pass')
+@pytest.mark.anyio
+async def test_verify_seeded_bookings(local_server, booking_generator, anyio_backend):
+    expected = list(booking_generator.iter_bookings(300))
+    booking_ids = [local_server.store.create(booking) for booking in expected]
+    try:
+        async with AsyncApiClient(base_url=local_server.url) as client:
+            fetched = await client.get_bookings(booking_ids + [10 ** 9], return_exceptions=True)
+        expected_batch = BookingBatch.from_payloads(expected + [expected[0]], ids=booking_ids + [10 ** 9])
+
+        with pytest.raises(AssertionError, match=f"Бронирование {10 ** 9} не найдено"):
+            assert_bookings_match(fetched, expected_batch)
+        assert_bookings_match(fetched[:-1], expected, ids=booking_ids)
+    finally:
+        for booking_id in booking_ids:
+            local_server.store.delete(booking_id)
@@ -0,0 +1,57 @@
+import json
+from datetime import date
+
+import allure
+
+from core.data.booking_generator import BookingGenerator
+from core.models.booking import Booking
+
+
+@allure.feature('Test booking generator')
+@allure.story('Same seed produces the same payloads')
+def test_seed_reproducible():
+    first = list(BookingGenerator(seed=42).iter_bookings(500, batch_size=128))
+    second = list(BookingGenerator(seed=42).iter_bookings(500, batch_size=128))
+
+    assert first == second
+    assert first != list(BookingGenerator(seed=43).iter_bookings(500, batch_size=128))
+
+
+@allure.feature('Test booking generator')
+@allure.story('Payloads match the Booking model')
+def test_payloads_valid():
+    generator = BookingGenerator(seed=1, base_date=date(2030, 1, 1))
+
+    for payload in generator.iter_bookings(1000):
+        booking = Booking.model_validate(payload)
+        assert 100 <= booking.totalprice <= 999
+        assert date(2030, 1, 1) < booking.bookingdates.checkin < booking.bookingdates.checkout
+
+
+@allure.feature('Test booking generator')
+@allure.story('JSONL stream matches the iterator for the same seed')
+def test_write_jsonl(tmp_path):
+    path = BookingGenerator(seed=7).write_jsonl(tmp_path / "bookings.jsonl", 2500, batch_size=1000)
+
+    with open(path) as file:
+        streamed = [json.loads(line) for line in file]
+    assert streamed == list(BookingGenerator(seed=7).iter_bookings(2500, batch_size=1000))
+
+
+@allure.feature('Test booking generator')
+@allure.story('Keyed payloads do not depend on earlier draws')
+def test_for_key_independent_of_order():
+    first, second = BookingGenerator(seed=3), BookingGenerator(seed=3)
+    second.batch(100)
+
+    assert first.for_key("tests/test_a.py::test_a") == second.for_key("tests/test_a.py::test_a")
+    assert first.for_key("tests/test_a.py::test_a") != first.for_key("tests/test_a.py::test_b")
+
+
+@allure.feature('Test booking generator')
+@allure.story('Fixture data comes from the shared seeded pool')
+def test_fixture_draws_from_pool(generate_random_booking_data, booking_generator, data_scope):
+    firstname = generate_random_booking_data["firstname"].removeprefix(f"{data_scope.prefix}-")
+
+    assert firstname in booking_generator.firstnames
+    assert generate_random_booking_data["lastname"] in booking_generator.lastnames
@@ -0,0 +1,47 @@
+import json
+
+import allure
+import pytest
+from pydantic import ValidationError
+
+from core.clients.api_client import ApiClient
+from core.models.booking import (Booking, BookingId, BookingResponse, type_adapter, validate_booking,
+                                 validate_booking_ids, validate_booking_response)
+
+
+@allure.feature('Test booking validation')
+@allure.story('Raw-bytes validation matches the dict path')
+def test_validate_from_bytes(generate_random_booking_data):
+    payload = {"bookingid": 7, "booking": generate_random_booking_data}
+    raw = json.dumps(payload).encode()
+
+    assert validate_booking_response(raw) == BookingResponse(**payload)
+    assert validate_booking(json.dumps(generate_random_booking_data)) == Booking(**generate_random_booking_data)
+    assert validate_booking_ids(b'[{"bookingid": 1}, {"bookingid": 2}]') == [BookingId(bookingid=1),
+                                                                             BookingId(bookingid=2)]
+
+
+@allure.feature('Test booking validation')
+@allure.story('Adapters are built once per type')
+def test_adapter_cached():
+    assert type_adapter(list[BookingId]) is type_adapter(list[BookingId])
+
+
+@allure.feature('Test booking validation')
+@allure.story('Invalid bytes raise ValidationError')
+def test_invalid_response():
+    with pytest.raises(ValidationError):
+        validate_booking_response(b'{"bookingid": "x", "booking": {}}')
+
+
+@allure.feature('Test booking validation')
+@allure.story('ApiClient returns typed objects on request')
+def test_api_client_model(local_server, generate_random_booking_data):
+    client = ApiClient(base_url=local_server.url, attach_timings=False)
+
+    created = client.create_booking(generate_random_booking_data, model=BookingResponse)
+    booking = client.get_booking_by_id(created.bookingid, model=Booking)
+    ids = client.get_bookings_ids(model=list[BookingId])
+
+    assert booking == created.booking
+    assert BookingId(bookingid=created.bookingid) in ids
@@ -0,0 +1,100 @@
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.clients.cassette import (CassetteMiss, CassettePlayer, CassetteRecorder, cassette_path,
+                                   merge_worker_cassettes, request_key, set_scope)
+from core.server.booking_server import LocalBookingServer
+
+
+@pytest.fixture
+def recorded_cassette(tmp_path, generate_random_booking_data):
+    path = tmp_path / "booking.cassette"
+    with LocalBookingServer() as server:
+        recorder = CassetteRecorder(path)
+        client = ApiClient(base_url=server.url, cassette=recorder, attach_timings=False)
+        client.auth()
+        booking_id = client.create_booking(generate_random_booking_data).json()["bookingid"]
+        client.get_booking_by_id(booking_id)
+        client.partial_booking(booking_id, {"firstname": "Patched"})
+        client.get_booking_by_id(booking_id)
+        recorder.close()
+    return path, booking_id
+
+
+@allure.feature('Test cassette')
+@allure.story('Recorded session replays without a server')
+def test_replay_without_server(recorded_cassette, generate_random_booking_data):
+    path, booking_id = recorded_cassette
+    player = CassettePlayer(path)
+    client = ApiClient(base_url="http://127.0.0.1:9", cassette=player, attach_timings=False, max_retries=0)
+
+    client.auth()
+    assert client.create_booking(generate_random_booking_data).json()["bookingid"] == booking_id
+    assert client.get_booking_by_id(booking_id)["firstname"] == generate_random_booking_data["firstname"]
+    client.partial_booking(booking_id, {"firstname": "Patched"})
+    # Identical requests replay in the order they were recorded
+    assert client.get_booking_by_id(booking_id)["firstname"] == "Patched"
+    assert client.connection_stats.requests == 0
+
+
+@allure.feature('Test cassette')
+@allure.story('Auth secrets are scrubbed')
+def test_auth_scrubbed(recorded_cassette):
+    path, _ = recorded_cassette
+    client = ApiClient(base_url="http://127.0.0.1:9", cassette=CassettePlayer(path), attach_timings=False)
+
+    assert client.fetch_token() == "scrubbed"
+    assert b"password123" not in path.read_bytes()
+
+
+@allure.feature('Test cassette')
+@allure.story('Unrecorded request is a connection error')
+def test_replay_miss(recorded_cassette):
+    path, _ = recorded_cassette
+    client = ApiClient(base_url="http://127.0.0.1:9", cassette=CassettePlayer(path), attach_timings=False)
+
+    with pytest.raises(CassetteMiss):
+        client.get_bookings_ids(params={"firstname": "Nobody"})
+
+
+@allure.feature('Test cassette')
+@allure.story('Request keys ignore host, query order and JSON formatting')
+def test_request_key_normalized():
+    assert request_key("get", "http://a:1/booking?b=2&a=1", None) == \
+        request_key("GET", "https://b/booking?a=1&b=2", b"")
+    assert request_key("POST", "http://a/booking", b'{"b": 1, "a": 2}') == \
+        request_key("POST", "http://a/booking", b'{"a":2,"b":1}')
+    assert request_key("POST", "http://a/booking", b'{"a": 1}') != request_key("POST", "http://a/booking", b'{"a": 2}')
+    assert request_key("POST", "https://b//auth", None) == request_key("POST", "http://a/auth", None)
+
+
+@allure.feature('Test cassette')
+@allure.story('Worker cassettes are merged and replay by test, whichever worker runs it')
+def test_worker_cassettes_merged(tmp_path, monkeypatch, generate_random_booking_data, request):
+    monkeypatch.setenv("CASSETTE_PATH", str(tmp_path / "suite.cassette"))
+    params = {"firstname": generate_random_booking_data["firstname"]}
+    try:
+        with LocalBookingServer() as server:
+            for worker, scope in (("gw0", "test_before"), ("gw1", "test_after")):
+                recorder = CassetteRecorder(cassette_path(worker))
+                client = ApiClient(base_url=server.url, cassette=recorder, attach_timings=False)
+                set_scope(scope)
+                if scope == "test_after":
+                    client.create_booking(generate_random_booking_data)
+                client.get_bookings_ids(params=params)
+                recorder.close()
+
+        assert merge_worker_cassettes() == str(tmp_path / "suite.cassette")
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["suite.cassette"]
+        client = ApiClient(base_url="http://127.0.0.1:9", cassette=CassettePlayer(cassette_path()),
+                           attach_timings=False, max_retries=0)
+        set_scope("test_after")
+        assert len(client.get_bookings_ids(params=params).json()) == 1
+        set_scope("test_before")
+        assert client.get_bookings_ids(params=params).json() == []
+        # A request recorded under another test, like the ones of session fixtures, still replays
+        set_scope("test_elsewhere")
+        assert client.get_bookings_ids(params=params).status_code == 200
+    finally:
+        set_scope(request.node.nodeid)
@@ -0,0 +1,61 @@
+import allure
+import pytest
+
+from core.load.compare import MISSING, ComparisonRunner, Exchange, diff_json, plan_steps
+from core.server.booking_server import Faults, LocalBookingServer
+
+
+@pytest.fixture(scope="module")
+def slow_server():
+    with LocalBookingServer(faults=Faults(latency=0.02)) as server:
+        yield server
+
+
+@allure.feature('Test environment comparison')
+@allure.story('Identical environments line up step by step without body differences')
+def test_compare_identical_environments(local_server, slow_server):
+    bookings = len(local_server.store)
+    report = ComparisonRunner({"PROD": local_server.url, "LOCAL": slow_server.url}, steps=60, seed=5).run()
+    result = report.to_dict()
+
+    assert result["baseline"] == "PROD"
+    assert len(report.exchanges) == 60
+    assert all(row.keys() == {"PROD", "LOCAL"} for row in report.exchanges)
+    assert result["mismatches"]["LOCAL"]["steps"] == 0, report.to_text()
+    assert len(local_server.store) == bookings and len(slow_server.store) == 0
+
+    endpoint = result["latency"]["GET /booking/{id}"]
+    assert endpoint["PROD"]["requests"] == endpoint["LOCAL"]["requests"] > 0
+    assert endpoint["LOCAL"]["p50_change"] > 0.2 and endpoint["LOCAL"]["p50_significant"]
+    assert "LOCAL vs PROD: 0 of 60 steps differ" in report.to_text()
+
+
+@allure.feature('Test environment comparison')
+@allure.story('Booking references only point at earlier create steps')
+def test_plan_steps():
+    steps = plan_steps(200, seed=1)
+    assert [(step.operation, step.booking) for step in steps] == [
+        (step.operation, step.booking) for step in plan_steps(200, seed=1)]
+    assert {step.operation for step in steps} == {"get_bookings_ids", "get_booking_by_id", "create_booking",
+                                                  "partial_booking"}
+    for step in steps:
+        if step.booking is not None:
+            assert step.booking < step.index and steps[step.booking].operation == "create_booking"
+
+    with pytest.raises(ValueError):
+        plan_steps(10, {"delete_booking": 1})
+
+
+@allure.feature('Test environment comparison')
+@allure.story('Body diff ignores environment-assigned ids but reports changed fields')
+def test_diff_bodies():
+    created = {"bookingid": 1, "booking": {"firstname": "Jim", "totalprice": 100}}
+    assert diff_json(created, {"bookingid": 77, "booking": {"firstname": "Jim", "totalprice": 100}}) == []
+    assert diff_json(created, {"bookingid": "77", "booking": {"firstname": "Jim"}}) == [
+        (("bookingid",), "int", "str"), (("booking", "totalprice"), 100, MISSING)]
+
+    ids = Exchange(200, [{"bookingid": 1}, {"bookingid": 2}]).comparable("get_bookings_ids")
+    assert ids == Exchange(200, []).comparable("get_bookings_ids")
+    assert diff_json(Exchange(200, {}).comparable("create_booking"),
+                     Exchange(error="ConnectionError: host b").comparable("create_booking")) == [
+        (("status",), 200, None), (("body",), {}, None), (("error",), None, "ConnectionError")]
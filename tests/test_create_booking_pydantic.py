@@ -1,12 +1,12 @@
 import allure
 import pytest
 from pydantic import ValidationError
-from core.models.booking import BookingResponse
+from core.models.booking import assert_booking_matches, validate_booking_response
 
 
 @allure.feature('Test creating booking')
 @allure.story('Positive: creating booking with custom data')
-def test_create_booking_with_custom_data(api_client):
+def test_create_booking_with_custom_data(booking_registry):
     booking_data = {
         "firstname": "Ivan",
         "lastname": "Ivanovich",
@@ -19,42 +19,24 @@ def test_create_booking_with_custom_data(api_client):
         "additionalneeds": "Dinner"
     }
 
-    response = api_client.create_booking(booking_data)
+    response = booking_registry.create(booking_data)
     try:
-        booking_response_dict = response.json()
-
-        BookingResponse(**booking_response_dict)
+        booking = validate_booking_response(response.content).booking
     except ValidationError as e:
-        raise ValidationError(f"Response validation failed: {e}")
+        pytest.fail(f"Response validation failed: {e}")
 
     # Проверяем соответствие полученных данных отправленным
-    assert booking_response_dict['booking']['firstname'] == booking_data['firstname']
-    assert booking_response_dict['booking']['lastname'] == booking_data['lastname']
-    assert booking_response_dict['booking']['totalprice'] == booking_data['totalprice']
-    assert booking_response_dict['booking']['depositpaid'] == booking_data['depositpaid']
-    assert booking_response_dict['booking']['bookingdates']['checkin'] == booking_data['bookingdates']['checkin']
-    assert booking_response_dict['booking']['bookingdates']['checkout'] == booking_data['bookingdates']['checkout']
-    assert booking_response_dict['booking']['additionalneeds'] == booking_data['additionalneeds']
+    assert_booking_matches(booking, booking_data)
 
 
-def test_create_booking_with_random_data(api_client, generate_random_booking_data):
-    response = api_client.create_booking(generate_random_booking_data)
+def test_create_booking_with_random_data(booking_registry, generate_random_booking_data):
+    response = booking_registry.create(generate_random_booking_data)
     try:
-        booking_data = response.json()
-
-        BookingResponse(**booking_data)
+        booking_data = validate_booking_response(response.content).model_dump(mode="json")
     except ValidationError as e:
-        raise ValidationError(f"Validation failed: {e}")
+        pytest.fail(f"Validation failed: {e}")
 
-        assert booking_data['booking']['firstname'] == generate_random_booking_data['firstname']
-        assert booking_data['booking']['lastname'] == generate_random_booking_data['lastname']
-        assert booking_data['booking']['totalprice'] == generate_random_booking_data['totalprice']
-        assert booking_data['booking']['depositpaid'] == generate_random_booking_data['depositpaid']
-        assert booking_data['booking']['bookingdates']['checkin'] == generate_random_booking_data['bookingdates'][
-            'checkin']
-        assert booking_data['booking']['bookingdates']['checkout'] == generate_random_booking_data['bookingdates'][
-            'checkout']
-        assert booking_data['booking']['additionalneeds'] == generate_random_booking_data['additionalneeds']
+    assert_booking_matches(booking_data, generate_random_booking_data)
 
 
 def test_create_booking_negative_price(api_client, mocker):
@@ -146,7 +128,7 @@ def test_create_booking_empty_additional_needs(api_client, mocker):
                'error'] == "Optional field additionalneeds must be positive", "Ожидаемое сообщение об ошибке не совпадает"
 
 
-def test_create_booking_bookingdates_invalid(api_client):
+def test_create_booking_bookingdates_invalid(booking_registry):
     booking_data = {
         'firstname': 'Jane',
         'lastname': 'Smith',
@@ -159,7 +141,7 @@ def test_create_booking_bookingdates_invalid(api_client):
         "additionalneeds": "Toster"
     }
 
-    response = api_client.create_booking(booking_data)
+    response = booking_registry.create(booking_data)
 
     # Проверяем, что сервер принял запрос, хотя должен был отказать
     assert response.status_code == 200, \
@@ -167,7 +149,7 @@ def test_create_booking_bookingdates_invalid(api_client):
     pytest.fail("Server should reject this request with an appropriate error message.")
 
 
-def test_create_booking_max_string_length(api_client):
+def test_create_booking_max_string_length(booking_registry):
     max_name = "A" * 999  # Максимальная длина строки (например, 9999 символов)
     booking_data = {
         "firstname": max_name,
@@ -181,17 +163,8 @@ def test_create_booking_max_string_length(api_client):
         "additionalneeds": "Gym Room"
     }
 
-    response = api_client.create_booking(booking_data)
+    response = booking_registry.create(booking_data)
     # Получаем тело ответа в виде словаря
     response_json = response.json()
 
-    assert response_json['booking']['firstname'] == booking_data['firstname']
-    assert response_json['booking']['lastname'] == booking_data['lastname']
-    assert response_json['booking']['totalprice'] == booking_data['totalprice']
-    assert response_json['booking']['depositpaid'] == booking_data['depositpaid']
-    assert response_json['booking']['bookingdates']['checkin'] == booking_data['bookingdates'][
-        'checkin']
-    assert response_json['booking']['bookingdates']['checkout'] == booking_data['bookingdates'][
-        'checkout']
-    assert response_json['booking']['additionalneeds'] == booking_data[
-        'additionalneeds']
+    assert_booking_matches(response_json, booking_data)
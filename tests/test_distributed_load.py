@@ -0,0 +1,89 @@
+import io
+import random
+import threading
+
+import allure
+import numpy as np
+import pytest
+
+from core.load.distributed import (COLUMNS, ENDPOINTS, Coordinator, SharedWorkerStats, endpoint_stats,
+                                   run_remote_worker, sum_slots)
+from core.load.runner import WorkerStats
+from core.load.worker import main as worker_main
+
+
+def load_config(base_url, **overrides):
+    return {"base_url": base_url, "mode": "closed", "rate": 20, "users": 2, "workers": 4, "duration": 1.0,
+            "mix": {"get_bookings_ids": 2, "get_booking_by_id": 1}, "seed": 5, "transport": "requests",
+            **overrides}
+
+
+@allure.feature('Test distributed load')
+@allure.story('Shared-memory slots aggregate like in-process worker stats')
+def test_shared_stats_match_worker_stats():
+    rng = random.Random(1)
+    array = np.zeros((2, len(ENDPOINTS), COLUMNS), dtype=np.int64)
+    shared = [SharedWorkerStats(array[0]), SharedWorkerStats(array[1])]
+    local = WorkerStats()
+    for _ in range(2000):
+        endpoint, seconds, error = rng.choice(ENDPOINTS), rng.expovariate(100), rng.random() < 0.05
+        rng.choice(shared).record(endpoint, seconds, error)
+        local.record(endpoint, seconds, error)
+
+    merged = endpoint_stats(sum_slots(array))
+    for endpoint, stats in local.endpoints.items():
+        assert merged[endpoint].errors == stats.errors
+        assert merged[endpoint].histogram.counts == stats.histogram.counts
+        summary, expected = merged[endpoint].histogram.summary(), stats.histogram.summary()
+        # min only survives shared memory to bucket precision
+        assert summary.pop("min_ms") <= expected.pop("min_ms")
+        assert summary == expected
+
+
+@allure.feature('Test distributed load')
+@allure.story('Coordinator merges worker processes into one report')
+def test_coordinator_processes(local_server):
+    out = io.StringIO()
+    report = Coordinator(load_config(local_server.url), processes=2, out=out).run()
+
+    result = report.to_dict()
+    assert result["workers"] == {"processes": 2, "remote": 0}
+    assert result["endpoints"]["GET /booking"]["requests"] > 0
+    assert all(item["errors"] == 0 for item in result["endpoints"].values())
+    assert "req/s" in out.getvalue()
+
+
+@allure.feature('Test distributed load')
+@allure.story('Remote workers report over a socket')
+def test_remote_worker(local_server, tmp_path):
+    address = str(tmp_path / "coordinator.sock")
+    out = io.StringIO()
+    coordinator = Coordinator(load_config(local_server.url), processes=0, listen=address, remote_workers=1,
+                              interval=0.25, out=out)
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("report", coordinator.run()))
+    thread.start()
+    while not (tmp_path / "coordinator.sock").exists():
+        thread.join(0.01)
+
+    with pytest.raises(ValueError):
+        run_remote_worker(address, b"", interval=0.25)
+    run_remote_worker(address, coordinator.authkey, interval=0.25)
+    thread.join(10)
+
+    report = result["report"].to_dict()
+    assert report["workers"] == {"processes": 0, "remote": 1}
+    assert report["endpoints"]["GET /booking"]["requests"] > 0
+
+
+@allure.feature('Test distributed load')
+@allure.story('Listening without a key generates a random one, workers need one')
+def test_authkey_required(local_server, monkeypatch):
+    monkeypatch.delenv("LOAD_AUTHKEY", raising=False)
+    config = load_config(local_server.url)
+    coordinator = Coordinator(config, processes=0, listen="127.0.0.1:0", remote_workers=1)
+    assert coordinator.generated_authkey and len(coordinator.authkey) == 64
+    assert Coordinator(config, processes=0, listen="127.0.0.1:0").authkey != coordinator.authkey
+
+    with pytest.raises(SystemExit):
+        worker_main(["--connect", "127.0.0.1:1"])
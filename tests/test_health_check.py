@@ -1,7 +1,6 @@
 import allure
 import pytest
 import requests
-from pytest_mock import mocker
 from core.clients import api_client
 
 
@@ -26,7 +25,7 @@ def test_ping_wrong_method(api_client, mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 405
     mocker.patch.object(api_client.session, 'get', return_value=mock_response)
-    with pytest.raises(AssertionError, match="Excepted status 201 but got 405"):
+    with pytest.raises(AssertionError, match="Expected status 201 but got 405"):
         api_client.ping()
 
 
@@ -36,7 +35,7 @@ def test_ping_internal_server_error(api_client, mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 500
     mocker.patch.object(api_client.session, 'get', return_value=mock_response)
-    with pytest.raises(AssertionError, match="Excepted status 201 but got 500"):
+    with pytest.raises(AssertionError, match="Expected status 201 but got 500"):
         api_client.ping()
 
 
@@ -46,7 +45,7 @@ def test_ping_not_found(api_client, mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 404
     mocker.patch.object(api_client.session, 'get', return_value=mock_response)
-    with pytest.raises(AssertionError, match="Excepted status 201 but got 404"):
+    with pytest.raises(AssertionError, match="Expected status 201 but got 404"):
         api_client.ping()
 
 
@@ -56,7 +55,7 @@ def test_ping_success_different_code(api_client, mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 200
     mocker.patch.object(api_client.session, 'get', return_value=mock_response)
-    with pytest.raises(AssertionError, match="Excepted status 201 but got 200"):
+    with pytest.raises(AssertionError, match="Expected status 201 but got 200"):
         api_client.ping()
 
 
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import httpcore
+import httpx
+import pytest
+import requests
+
+from core.clients.api_client import ApiClient
+from core.clients.httpx_transport import HttpxAdapter
+from core.clients.transport import build_retry, create_adapter
+from core.server.booking_server import H2BookingServer
+from core.settings.config import Transport
+
+
+@pytest.fixture(scope="module")
+def h2_server():
+    pytest.importorskip("hypercorn")
+    pytest.importorskip("h2")
+    with H2BookingServer() as server:
+        yield server
+
+
+@allure.feature('Test httpx transport')
+@allure.story('Booking CRUD works through the HTTP/1.1 httpx transport')
+def test_http1_crud(local_server, generate_random_booking_data):
+    client = ApiClient(base_url=local_server.url, attach_timings=False, transport="http1")
+    client.auth()
+
+    booking_id = client.create_booking(generate_random_booking_data).json()["bookingid"]
+    assert client.get_booking_by_id(booking_id) == generate_random_booking_data
+    assert client.partial_booking(booking_id, {"firstname": "Patched"})["firstname"] == "Patched"
+    assert client.delete_booking(booking_id)
+    with pytest.raises(requests.HTTPError):
+        client.get_booking_by_id(booking_id)
+    assert client.adapter.protocols == {"HTTP/1.1": 6}
+    client.session.close()
+
+
+@allure.feature('Test httpx transport')
+@allure.story('HTTP/2 falls back to HTTP/1.1 when the server rejects it')
+def test_http2_fallback(local_server, generate_random_booking_data):
+    client = ApiClient(base_url=local_server.url, attach_timings=False, transport="http2")
+
+    booking_id = client.create_booking(generate_random_booking_data).json()["bookingid"]
+    assert client.get_booking_by_id(booking_id) == generate_random_booking_data
+    assert client.adapter.protocols == {"HTTP/1.1": 2}
+    client.session.close()
+
+
+@allure.feature('Test httpx transport')
+@allure.story('Concurrent clients multiplex over one HTTP/2 connection')
+def test_http2_multiplexed(h2_server, generate_random_booking_data):
+    adapter = create_adapter("http2")
+    clients = [ApiClient(base_url=h2_server.url, attach_timings=False, transport=adapter) for _ in range(8)]
+    booking_id = clients[0].create_booking(generate_random_booking_data).json()["bookingid"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        bookings = list(pool.map(lambda client: client.get_booking_by_id(booking_id), clients * 5))
+
+    assert all(booking == generate_random_booking_data for booking in bookings)
+    assert adapter.protocols == {"HTTP/2": 41}
+    assert adapter.stats.snapshot()["new_connections"] == 1
+    adapter.close()
+
+
+@allure.feature('Test httpx transport')
+@allure.story('Requests racing to open the first HTTP/2 connection get distinct streams')
+def test_http2_concurrent_first_requests(h2_server, generate_random_booking_data):
+    adapter = create_adapter("http2")
+    clients = [ApiClient(base_url=h2_server.url, attach_timings=False, transport=adapter) for _ in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda client: client.session.get(f"{h2_server.url}/booking"), clients * 5))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert adapter.protocols == {"HTTP/2": 40}
+    adapter.close()
+
+
+@allure.feature('Test httpx transport')
+@allure.story('Idempotent requests are retried on 5xx')
+def test_retried_on_service_unavailable(local_server, server_faults):
+    server_faults.error_rate = 1.0
+    client = ApiClient(base_url=local_server.url, attach_timings=False,
+                       transport=HttpxAdapter(http2=False, max_retries=build_retry(total=2, backoff_factor=0)))
+
+    response = client.session.get(f"{local_server.url}/booking")
+    assert response.status_code == 503
+    assert client.connection_stats.requests == 3
+    client.session.close()
+
+
+@allure.feature('Test httpx transport')
+@allure.story('A server that keeps sending GOAWAY fails the request after a few resends')
+def test_goaway_resends_bounded(mocker):
+    events = pytest.importorskip("h2.events")
+    adapter = HttpxAdapter(http2=True)
+    error = httpx.RemoteProtocolError("Server disconnected")
+    error.__cause__ = httpcore.RemoteProtocolError(events.ConnectionTerminated())
+    client = mocker.Mock()
+    client.request.side_effect = error
+    mocker.patch.object(adapter, "_client", return_value=client)
+    adapter._http2_origins.add("booker.test")
+
+    with pytest.raises(requests.ConnectionError):
+        adapter.send(requests.Request("GET", "http://booker.test/booking").prepare())
+    assert client.request.call_count == Transport.GOAWAY_RESENDS.value + 1
+
+
+@allure.feature('Test httpx transport')
+@allure.story('Proxies from requests are used and httpcore internals are checked')
+def test_proxies_and_internals(local_server, mocker):
+    client = ApiClient(base_url=local_server.url, attach_timings=False, transport="http1")
+
+    assert client.session.get(f"{local_server.url}/ping").status_code == 201
+    with pytest.raises(requests.ConnectionError):
+        client.session.get(f"{local_server.url}/ping", proxies={"http": "http://127.0.0.1:9"})
+    for httpx_client in client.adapter._clients.values():
+        mocker.patch.object(httpx_client, "_transport", mocker.Mock(spec=["close"]))
+    with pytest.raises(RuntimeError, match="httpcore"):
+        client.adapter.open_connections()
+    client.session.close()
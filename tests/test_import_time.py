@@ -0,0 +1,38 @@
+import os
+
+import allure
+import pytest
+
+from core.perf.importtime import format_breakdown, import_times
+from core.settings.config import ImportBudget
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use only; none of them may be pulled in by importing the client or the fixtures
+LAZY_MODULES = ("allure", "dotenv", "faker", "numpy", "flask", "httpx", "pydantic")
+
+
+@allure.feature('Test import time')
+@allure.story('Heavy dependencies stay out of the cold-start import path')
+@pytest.mark.parametrize("module, budget, lazy", [
+    ("core.clients.api_client", ImportBudget.API_CLIENT_MODULES.value, LAZY_MODULES),
+    # allure is loaded by allure-pytest before conftest anyway
+    ("conftest", ImportBudget.CONFTEST_MODULES.value, LAZY_MODULES[1:]),
+])
+def test_cold_import(module, budget, lazy):
+    times = import_times(f"import {module}", cwd=ROOT)
+    allure.attach(format_breakdown(times), name=f'Import time {module}',
+                  attachment_type=allure.attachment_type.TEXT)
+
+    loaded = sorted(name for name in lazy if name in times)
+    assert not loaded, f"Expected lazy imports but {module} imports {loaded}"
+    assert len(times) <= budget, f"Expected at most {budget} modules but {module} loads {len(times)}"
+
+
+@allure.feature('Test import time')
+@allure.story('Lazily imported modules load on first use')
+def test_lazy_modules_load_on_use():
+    times = import_times("from core.clients.api_client import ApiClient; "
+                         "from core.clients.reporting import step; step('warm up'); "
+                         "from core.data.booking_generator import BookingGenerator; BookingGenerator(pool_size=1)",
+                         cwd=ROOT)
+    assert {"allure", "numpy", "faker"} <= set(times)
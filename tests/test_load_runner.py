@@ -0,0 +1,75 @@
+import json
+
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.load.__main__ import main
+from core.load.histogram import LatencyHistogram, bucket_index, bucket_range
+from core.load.runner import LoadRunner
+from core.load.scenario import Scenario
+
+
+@allure.feature('Test load runner')
+@allure.story('Histogram percentiles stay within one percent')
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value_us in range(1, 100_001):
+        histogram.record_us(value_us)
+
+    assert histogram.count == 100_000
+    assert histogram.percentile_us(50) == pytest.approx(50_000, rel=0.01)
+    assert histogram.percentile_us(99) == pytest.approx(99_000, rel=0.01)
+    assert histogram.percentile_us(99.9) == pytest.approx(99_900, rel=0.01)
+    assert histogram.percentile_us(100) == 100_000
+
+
+@allure.feature('Test load runner')
+@allure.story('Bucket ranges cover the value recorded in them')
+@pytest.mark.parametrize("value_us", [0, 255, 256, 257, 1_023, 1_024, 54_321, 7_654_321])
+def test_bucket_range_contains_value(value_us):
+    lowest, highest = bucket_range(bucket_index(value_us))
+    assert lowest <= value_us <= highest
+
+
+@allure.feature('Test load runner')
+@allure.story('Scenario mix rejects unknown operations')
+def test_scenario_unknown_operation():
+    with pytest.raises(ValueError, match="cancel_booking"):
+        Scenario(Scenario.parse_mix("get_bookings_ids=50,cancel_booking=50"))
+
+
+@allure.feature('Test load runner')
+@allure.story('Open loop keeps the target arrival rate')
+def test_open_loop(local_server):
+    runner = LoadRunner(lambda: ApiClient(base_url=local_server.url), Scenario(seed=7), duration=0.5)
+
+    report = runner.run_open(rate=100, max_workers=8).to_dict()
+
+    assert report["mode"] == "open"
+    assert sum(item["requests"] for item in report["endpoints"].values()) == 50
+    assert all(item["errors"] == 0 for item in report["endpoints"].values())
+
+
+@allure.feature('Test load runner')
+@allure.story('Closed loop reports every endpoint in the mix')
+def test_closed_loop(local_server):
+    mix = {"get_bookings_ids": 1, "get_booking_by_id": 1, "create_booking": 1}
+    runner = LoadRunner(lambda: ApiClient(base_url=local_server.url), Scenario(mix, seed=7), duration=0.3)
+
+    report = runner.run_closed(users=3).to_dict()
+
+    assert set(report["endpoints"]) == {"GET /booking", "GET /booking/{id}", "POST /booking"}
+    assert set(report["endpoints"]["POST /booking"]["latency"]) >= {"p50_ms", "p90_ms", "p99_ms", "p99.9_ms"}
+
+
+@allure.feature('Test load runner')
+@allure.story('CLI writes a JSON report')
+def test_cli_json_report(local_server, tmp_path, capsys):
+    report_path = tmp_path / "report.json"
+
+    main(["--base-url", local_server.url, "--mode", "closed", "--users", "2", "--duration", "0.2",
+          "--mix", "get_bookings_ids=1", "--json", str(report_path)])
+
+    assert "GET /booking" in capsys.readouterr().out
+    assert json.loads(report_path.read_text())["endpoints"]["GET /booking"]["errors"] == 0
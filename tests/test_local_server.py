@@ -0,0 +1,89 @@
+import allure
+import pytest
+import requests
+
+from core.clients.api_client import ApiClient
+from core.models.booking import Booking
+
+
+@pytest.fixture
+def local_client(local_server):
+    client = ApiClient(base_url=local_server.url)
+    client.auth()
+    return client
+
+
+@allure.feature('Test local server')
+@allure.story('Booking CRUD round trip')
+def test_booking_crud(local_client, generate_random_booking_data):
+    created = local_client.create_booking(generate_random_booking_data).json()
+    booking_id = created["bookingid"]
+    assert created["booking"] == generate_random_booking_data
+
+    assert local_client.get_booking_by_id(booking_id) == generate_random_booking_data
+
+    updated = local_client.update_booking(booking_id, dict(generate_random_booking_data, firstname="Updated"))
+    assert updated["firstname"] == "Updated"
+
+    patched = local_client.partial_booking(booking_id, {"bookingdates": {"checkout": "2099-01-01"}})
+    assert patched["bookingdates"] == {"checkin": generate_random_booking_data["bookingdates"]["checkin"],
+                                       "checkout": "2099-01-01"}
+    Booking.model_validate(patched)
+
+    assert local_client.delete_booking(booking_id)
+    with pytest.raises(requests.HTTPError, match="404"):
+        local_client.get_booking_by_id(booking_id)
+
+
+@allure.feature('Test local server')
+@allure.story('Filters match restful-booker query parameters')
+def test_get_bookings_ids_filters(local_client, generate_random_booking_data):
+    payload = dict(generate_random_booking_data, firstname="Filter", lastname="Target",
+                   bookingdates={"checkin": "2031-01-10", "checkout": "2031-01-15"})
+    booking_id = local_client.create_booking(payload).json()["bookingid"]
+
+    def ids(**params):
+        return [item["bookingid"] for item in local_client.get_bookings_ids(params=params).json()]
+
+    assert ids(firstname="Filter", lastname="Target") == [booking_id]
+    assert booking_id in ids(checkin="2031-01-10", checkout="2031-01-15")
+    assert booking_id not in ids(checkin="2031-01-11")
+    assert booking_id not in ids(firstname="Filter", lastname="Other")
+
+
+@allure.feature('Test local server')
+@allure.story('Write endpoints require authorization')
+def test_delete_without_auth_forbidden(local_server, local_client, generate_random_booking_data):
+    booking_id = local_client.create_booking(generate_random_booking_data).json()["bookingid"]
+
+    response = requests.delete(f"{local_server.url}/booking/{booking_id}")
+
+    assert response.status_code == 403
+    assert response.text == "Forbidden"
+
+
+@allure.feature('Test local server')
+@allure.story('Invalid payload is rejected like restful-booker')
+def test_create_booking_missing_fields(local_client):
+    with pytest.raises(requests.HTTPError, match="500"):
+        local_client.create_booking({"firstname": "Jim"})
+
+
+@allure.feature('Test local server')
+@allure.story('Injected latency triggers read timeout')
+def test_injected_latency_times_out(local_server, server_faults):
+    client = ApiClient(base_url=local_server.url, timeouts={"PING_ENDPOINT": (1, 0.1)}, max_retries=0)
+    server_faults.latency = 0.3
+
+    with pytest.raises(requests.Timeout):
+        client.ping()
+
+
+@allure.feature('Test local server')
+@allure.story('Injected errors surface as HTTP errors')
+def test_injected_errors(local_server, server_faults):
+    client = ApiClient(base_url=local_server.url, max_retries=0)
+    server_faults.error_rate = 1.0
+
+    with pytest.raises(requests.HTTPError, match="503"):
+        client.ping()
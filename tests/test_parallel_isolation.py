@@ -0,0 +1,61 @@
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.data.booking_registry import BookingRegistry, DataScope
+
+
+@allure.feature('Test parallel isolation')
+@allure.story('Worker scope prefixes firstname')
+def test_data_scope_prefix(data_scope, generate_random_booking_data):
+    assert generate_random_booking_data["firstname"].startswith(f"{data_scope.prefix}-")
+    assert DataScope(worker_id="gw3", run_id="abc").apply({"firstname": "Jim"}) == {"firstname": "gw3-abc-Jim"}
+
+
+@allure.feature('Test parallel isolation')
+@allure.story('Registry tracks the owning test')
+def test_registry_tracks_owner(booking_registry, generate_random_booking_data, request):
+    booking_id = booking_registry.create(generate_random_booking_data).json()["bookingid"]
+
+    assert booking_registry.ids == [booking_id]
+    assert booking_registry.owner == request.node.nodeid
+
+
+@allure.feature('Test parallel isolation')
+@allure.story('Cleanup deletes every tracked booking concurrently')
+def test_registry_cleanup(local_server, generate_random_booking_data):
+    client = ApiClient(base_url=local_server.url, attach_timings=False)
+    registry = BookingRegistry(client)
+    owned = registry.for_owner("test")
+    booking_ids = [owned.create(generate_random_booking_data).json()["bookingid"] for _ in range(10)]
+    owned.delete(booking_ids[0])
+    # Deleted behind the registry's back, answered with 405 at cleanup
+    local_server.store.delete(booking_ids[1])
+
+    not_deleted = registry.cleanup(concurrency=4)
+
+    assert not_deleted == []
+    assert len(registry) == 0
+    assert all(local_server.store.get(booking_id) is None for booking_id in booking_ids)
+
+
+@allure.feature('Test parallel isolation')
+@allure.story('Cleanup returns the bookings it could not delete')
+def test_registry_cleanup_failures():
+    unreachable = ApiClient(base_url="http://127.0.0.1:9", attach_timings=False)
+    registry = BookingRegistry(unreachable)
+    registry.track(101, "test")
+    registry.track(102, "test")
+
+    assert registry.cleanup() == [101, 102]
+    assert len(registry) == 0
+
+
+@allure.feature('Test parallel isolation')
+@allure.story('Read-only tests share pre-created bookings')
+@pytest.mark.readonly
+def test_shared_bookings_readable(api_client, shared_bookings, data_scope):
+    params = {"firstname": data_scope.firstname("Shared0"), "lastname": "Readonly"}
+    found = [item["bookingid"] for item in api_client.get_bookings_ids(params=params).json()]
+
+    assert found == shared_bookings[:1]
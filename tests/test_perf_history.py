@@ -0,0 +1,154 @@
+import json
+import random
+
+import allure
+import numpy as np
+import pytest
+
+from core.clients.timing import TimingRegistry
+from core.load.histogram import LatencyHistogram
+from core.perf.__main__ import main
+from core.perf.gate import IMPROVED, OK, REGRESSION, SKIPPED, compare, evaluate, percentile_ci
+from core.perf.history import PerfHistory
+
+ENDPOINT = "GET /booking/{id}"
+
+
+def timings(seed, scale=1.0, requests=400, run_noise=0.0):
+    rng = random.Random(seed)
+    histogram = LatencyHistogram()
+    # Machines, neighbours and networks differ between runs: the whole run is slower or faster
+    scale *= rng.lognormvariate(0, run_noise) if run_noise else 1.0
+    for _ in range(requests):
+        histogram.record(rng.lognormvariate(-4.5, 0.3) * scale)
+    return {ENDPOINT: {"count": histogram.count, "phases": {"total": histogram.summary()},
+                       "histogram": histogram.state()}}
+
+
+def rows(summary):
+    # What PerfHistory.endpoints returns for a recorded run
+    return {endpoint: {"count": item["count"], "histogram": item["histogram"],
+                       **{metric: item["phases"]["total"][metric] for metric in ("p50_ms", "p90_ms", "p99_ms")}}
+            for endpoint, item in summary.items()}
+
+
+@pytest.fixture
+def history(tmp_path):
+    with PerfHistory(str(tmp_path / "perf.sqlite")) as history:
+        for run in range(8):
+            history.record(timings(run), f"commit-{run}", "TEST", recorded_at=run)
+        yield history
+
+
+@allure.feature('Test performance gate')
+@allure.story('Recorded runs keep the summary and histogram per endpoint')
+def test_record_round_trip(history):
+    run = history.latest_run("TEST")
+    assert run["git_commit"] == "commit-7"
+
+    row = history.endpoints([run["id"]])[run["id"]][ENDPOINT]
+    expected = timings(7)[ENDPOINT]
+    assert row["count"] == 400
+    assert row["p99_ms"] == expected["phases"]["total"]["p99_ms"]
+    assert LatencyHistogram.from_state(row["histogram"]).counts == LatencyHistogram.from_state(
+        expected["histogram"]).counts
+    assert len(history.baseline_runs("TEST", 5, exclude_commit="commit-7")) == 5
+
+
+@allure.feature('Test performance gate')
+@allure.story('Histogram bootstrap interval covers the recorded percentile')
+def test_percentile_ci():
+    summary = timings(1)[ENDPOINT]
+    point, (low, high) = percentile_ci(summary["histogram"], 99, 0.95, rng=np.random.default_rng(1))
+
+    assert low <= point <= high < point * 1.5
+    assert point == pytest.approx(summary["phases"]["total"]["p99_ms"], rel=0.01)
+
+
+@allure.feature('Test performance gate')
+@allure.story('Slowdowns beyond noise and the minimum effect fail the gate')
+@pytest.mark.parametrize("scale, status", [(1.0, OK), (1.05, OK), (1.5, REGRESSION), (0.6, IMPROVED)])
+def test_gate_verdict(history, scale, status):
+    history.record(timings(101, scale), "candidate", "TEST", recorded_at=100)
+
+    run, results = evaluate(history, "TEST", "candidate", seed=1)
+    assert run["git_commit"] == "candidate"
+    assert {result.metric: result.status for result in results} == {"p50_ms": status, "p99_ms": status}
+
+
+@allure.feature('Test performance gate')
+@allure.story('Builds without changes rarely fail, however many endpoints they judge')
+def test_gate_false_failures_per_build():
+    # A pool of recorded runs per endpoint; every build draws its 20 baseline runs and its own run
+    # from the same pool, as if nothing had changed between them
+    endpoints = [f"GET /endpoint-{index}" for index in range(12)]
+    pool = [{endpoint: rows(timings(run * 100 + index, requests=300, run_noise=0.12))[ENDPOINT]
+             for index, endpoint in enumerate(endpoints)} for run in range(60)]
+    rng = random.Random(1)
+    failed = []
+    for build in range(100):
+        current, *baseline = rng.sample(pool, 21)
+        statuses = [result.status for result in compare(current, baseline, samples=200, seed=build)]
+        assert len(statuses) == 24 and SKIPPED not in statuses
+        failed.append(REGRESSION in statuses)
+
+    # About 2.5% of builds by design; intervals at 99% per metric failed about 1 in 10
+    assert sum(failed) <= 5, sum(failed)
+    slower = dict(current, **{endpoints[0]: rows(timings(9999, scale=1.6, requests=300))[ENDPOINT]})
+    assert REGRESSION in {result.status for result in compare(slower, baseline, samples=200, seed=1)}
+
+
+@allure.feature('Test performance gate')
+@allure.story('One baseline run hit by a network blip does not widen the interval')
+def test_gate_outlier_baseline_run():
+    baseline = [rows(timings(run, requests=300, run_noise=0.12)) for run in range(20)]
+    slower = rows(timings(99, scale=2, requests=300))
+    clean = compare(slower, baseline, seed=1)
+    baseline[3] = rows(timings(3, scale=10, requests=300))
+    blip = compare(slower, baseline, seed=1)
+
+    assert {result.status for result in blip} == {REGRESSION}
+    for with_blip, without in zip(blip, clean):
+        assert with_blip.baseline_range[1] < without.baseline_range[1] * 1.2
+
+
+@allure.feature('Test performance gate')
+@allure.story('Endpoints without enough history or requests are not judged')
+def test_gate_skips_insufficient_data():
+    results = compare(rows(timings(9, scale=3)), [rows(timings(run)) for run in range(3)])
+    assert {result.status for result in results} == {SKIPPED}
+    assert results[0].reason == "3 baseline runs, need 5"
+
+    results = compare(rows(timings(9, scale=3, requests=10)), [rows(timings(run)) for run in range(8)])
+    assert {result.status for result in results} == {SKIPPED}
+    assert results[0].reason == "10 requests, need 20"
+
+
+@allure.feature('Test performance gate')
+@allure.story('CLI records api-timings.json and exits 1 on regression')
+def test_cli(tmp_path, capsys):
+    db = str(tmp_path / "perf.sqlite")
+    for run in range(6):
+        path = tmp_path / f"timings-{run}.json"
+        path.write_text(json.dumps(timings(run, scale=2.0 if run == 5 else 1.0)))
+        assert main(["--db", db, "--environment", "TEST", "--commit", f"c{run}", "record", str(path)]) == 0
+
+    assert main(["--db", db, "--environment", "TEST", "--commit", "c5", "gate", "--seed", "1"]) == 1
+    output = capsys.readouterr().out
+    assert "regression" in output and ENDPOINT in output
+    assert main(["--db", db, "--environment", "PROD", "gate"]) == 2
+
+
+@allure.feature('Test performance gate')
+@allure.story('xdist worker timings merge into one registry')
+def test_registry_state_merge():
+    workers = [TimingRegistry(), TimingRegistry()]
+    merged = TimingRegistry()
+    for index, registry in enumerate(workers):
+        registry._endpoint(ENDPOINT).phases["total"].merge(
+            LatencyHistogram.from_state(timings(index)[ENDPOINT]["histogram"]))
+        merged.merge_state(json.loads(json.dumps(registry.state())))
+
+    expected = LatencyHistogram.from_state(timings(0)[ENDPOINT]["histogram"]).merge(
+        LatencyHistogram.from_state(timings(1)[ENDPOINT]["histogram"]))
+    assert merged.summary()[ENDPOINT]["phases"]["total"] == expected.summary()
@@ -0,0 +1,89 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.clients.reporting import StepBuffer, buffered, current_buffer, step, use_buffer
+
+
+@allure.feature('Test reporting')
+@allure.story('Buffered mode aggregates client steps and counts attachments')
+@pytest.mark.full_reporting
+def test_buffered_client_steps(local_server, generate_random_booking_data):
+    assert current_buffer() is None
+    client = ApiClient(base_url=local_server.url)
+    booking_id = client.create_booking(generate_random_booking_data).json()["bookingid"]
+
+    buffer = StepBuffer().start()
+    previous = use_buffer(buffer)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: client.get_booking_by_id(booking_id), range(50)))
+    finally:
+        use_buffer(previous)
+        buffer.close()
+
+    summary = buffer.flush()
+    assert summary["steps"]["Getting Booking by ID"]["count"] == 50
+    assert summary["steps"]["Assert status code"]["failures"] == 0
+    assert summary["attachments"] == {"Timings GET /booking/{id}": 50}
+    assert summary["dropped"] == 0
+    assert buffer.flush() == {}
+
+
+@allure.feature('Test reporting')
+@allure.story('Nested steps keep their path, failures are sampled and still raised')
+def test_buffered_nesting_and_failures():
+    with buffered(sample_every=100) as buffer:
+        for index in range(1000):
+            with step("Outer"):
+                if index % 250 == 0:
+                    with pytest.raises(AssertionError):
+                        with step("Inner"):
+                            assert index < 0, "Expected negative index"
+                else:
+                    with step("Inner"):
+                        pass
+        aggregates, _, _ = buffer.take()
+
+    outer, inner = aggregates[("Outer",)], aggregates[("Outer", "Inner")]
+    assert outer.histogram.count == inner.histogram.count == 1000
+    assert outer.failures == 0 and inner.failures == 4
+    assert len(inner.samples) == 4 + 10
+    assertion, message = [sample for sample in inner.samples if sample[2]][0][2]
+    assert assertion and message.startswith("AssertionError: Expected negative index")
+    assert "Inner ×1000" in inner.describe("Inner") and "4 failed" in inner.describe("Inner")
+
+
+@allure.feature('Test reporting')
+@allure.story('A full ring buffer drops the oldest steps and counts them')
+def test_ring_buffer_overflow():
+    buffer = StepBuffer(capacity=10)
+    for index in range(25):
+        buffer.record(("Step",), index / 1000)
+
+    aggregates, _, dropped = buffer.take()
+    assert aggregates[("Step",)].histogram.count == 10
+    assert dropped == 15
+    assert aggregates[("Step",)].histogram.min_us == 15_000
+
+
+@allure.feature('Test reporting')
+@allure.story('Steps of concurrent coroutines keep their own paths')
+def test_buffered_async_steps():
+    async def operation(title):
+        with step(title):
+            await asyncio.sleep(0.01)
+            with step("Request"):
+                await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(operation("A"), operation("B"), operation("C"))
+
+    with buffered() as buffer:
+        asyncio.run(main())
+        aggregates, _, _ = buffer.take()
+
+    assert sorted(aggregates) == [("A",), ("A", "Request"), ("B",), ("B", "Request"), ("C",), ("C", "Request")]
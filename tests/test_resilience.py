@@ -0,0 +1,109 @@
+import threading
+
+import allure
+import pytest
+import requests
+
+from core.clients.api_client import ApiClient
+from core.clients.resilience import AdaptiveLimiter, CircuitBreaker, CircuitBreakers, CircuitOpenError
+from core.clients.transport import build_retry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@allure.feature('Test resilience')
+@allure.story('Limiter grows additively and backs off multiplicatively')
+def test_limiter_aimd():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=100, clock=clock)
+
+    for _ in range(40):
+        limiter.acquire()
+        clock.now += 0.01
+        limiter.release(0.01)
+    # +1/limit per success: limit**2 grows by about 2 per success, 16 + 80 -> limit 9.8
+    assert 9 < limiter.limit < 10
+
+    limiter.acquire()
+    limiter.acquire()
+    limiter.release(None, overloaded=True)
+    # A second overload signal inside the same round trip is the same congestion event
+    limiter.release(None, overloaded=True)
+    assert int(limiter.limit) == 4
+    assert limiter.snapshot()["decreases"] == 1
+
+    # Successes well above the latency baseline hold the limit until the baseline catches up
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.5)
+    assert int(limiter.limit) == 4
+
+
+@allure.feature('Test resilience')
+@allure.story('Limiter caps requests in flight')
+def test_limiter_blocks_at_limit():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    thread.start()
+
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+
+
+@allure.feature('Test resilience')
+@allure.story('Breaker opens, fails fast and recovers through the probe')
+def test_breaker_states():
+    clock = FakeClock()
+    breaker = CircuitBreaker("GET /booking", failure_threshold=3, reset_timeout=5, clock=clock)
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    clock.now += 5
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(probe=lambda: False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 5
+    breaker.before_request(probe=lambda: True)
+    assert breaker.snapshot() == {"state": "closed", "failures": 0, "trips": 1, "rejected": 2}
+
+
+@allure.feature('Test resilience')
+@allure.story('ApiClient reports overload to the limiter and breakers')
+def test_api_client_overload(local_server, server_faults):
+    limiter = AdaptiveLimiter(initial_limit=8)
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=0)
+    client = ApiClient(base_url=local_server.url, attach_timings=False, limiter=limiter, breakers=breakers,
+                       max_retries=build_retry(status_forcelist=()))
+    client.get_bookings_ids()
+
+    server_faults.error_rate = 1.0
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get_bookings_ids()
+    assert breakers.snapshot()["GET /booking"]["state"] == "open"
+    assert limiter.limit < 8
+
+    # ping() probes the open breaker; the server is still failing, so requests keep failing fast
+    with pytest.raises(CircuitOpenError):
+        client.get_bookings_ids()
+
+    server_faults.reset()
+    client.get_bookings_ids()
+    assert breakers.snapshot()["GET /booking"] == {"state": "closed", "failures": 0, "trips": 1, "rejected": 1}
+    assert limiter.in_flight == 0
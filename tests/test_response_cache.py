@@ -0,0 +1,100 @@
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.clients.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cached_client(local_server, clock):
+    return ApiClient(base_url=local_server.url, attach_timings=False, cache=ResponseCache(ttl=30, clock=clock))
+
+
+@allure.feature('Test response cache')
+@allure.story('Repeated reads are served from the cache')
+def test_repeated_reads_hit(cached_client, generate_random_booking_data):
+    booking_id = cached_client.create_booking(generate_random_booking_data).json()["bookingid"]
+    sent = cached_client.connection_stats.requests
+
+    for _ in range(5):
+        assert cached_client.get_booking_by_id(booking_id) == generate_random_booking_data
+
+    assert cached_client.connection_stats.requests == sent + 1
+    assert cached_client.cache.stats.snapshot()["hits"] == 4
+
+
+@allure.feature('Test response cache')
+@allure.story('Writes invalidate cached reads')
+def test_writes_invalidate(cached_client, generate_random_booking_data):
+    booking_id = cached_client.create_booking(generate_random_booking_data).json()["bookingid"]
+    lastname = generate_random_booking_data["lastname"]
+    cached_client.get_booking_by_id(booking_id)
+    matching = len(cached_client.get_bookings_ids(params={"lastname": lastname}).json())
+
+    cached_client.partial_booking(booking_id, {"firstname": "Patched"})
+    assert cached_client.get_booking_by_id(booking_id)["firstname"] == "Patched"
+
+    cached_client.create_booking(generate_random_booking_data)
+    assert len(cached_client.get_bookings_ids(params={"lastname": lastname}).json()) == matching + 1
+
+    cached_client.delete_booking(booking_id)
+    assert {"bookingid": booking_id} not in cached_client.get_bookings_ids(params={"lastname": lastname}).json()
+    assert cached_client.cache.stats.snapshot()["invalidations"] >= 3
+
+
+@allure.feature('Test response cache')
+@allure.story('Expired entries revalidate with ETag')
+def test_revalidate_with_etag(cached_client, local_server, clock, generate_random_booking_data):
+    booking_id = cached_client.create_booking(generate_random_booking_data).json()["bookingid"]
+    first = cached_client.get_booking_by_id(booking_id)
+
+    clock.now += 31
+    assert cached_client.get_booking_by_id(booking_id) == first
+    assert cached_client.cache.stats.snapshot()["revalidated"] == 1
+
+    # Changed behind the client's back: the ETag no longer matches, so the new body is fetched
+    local_server.store.replace(booking_id, {**first, "firstname": "Elsewhere"})
+    clock.now += 31
+    assert cached_client.get_booking_by_id(booking_id)["firstname"] == "Elsewhere"
+    stats = cached_client.cache.stats.snapshot()
+    assert (stats["revalidated"], stats["misses"], stats["hit_ratio"]) == (1, 2, 0.3333)
+
+
+@allure.feature('Test response cache')
+@allure.story('Cache stays within its entry and byte bounds')
+def test_lru_eviction(local_server):
+    cache = ResponseCache(max_entries=2)
+    client = ApiClient(base_url=local_server.url, attach_timings=False, cache=cache)
+
+    for lastname in ("A", "B", "A", "C"):
+        client.get_bookings_ids(params={"lastname": lastname})
+
+    assert len(cache) == 2
+    assert cache.key("/booking", {"lastname": "B"}) not in cache._entries
+    assert cache.stats.snapshot()["evictions"] == 1
+    assert cache.size == sum(entry.size for entry in cache._entries.values())
+
+
+@allure.feature('Test response cache')
+@allure.story('Disabled cache reads from the server')
+def test_disabled(cached_client, local_server, generate_random_booking_data):
+    booking_id = cached_client.create_booking(generate_random_booking_data).json()["bookingid"]
+    booking = cached_client.get_booking_by_id(booking_id)
+    local_server.store.replace(booking_id, {**booking, "firstname": "Elsewhere"})
+
+    assert cached_client.get_booking_by_id(booking_id)["firstname"] == booking["firstname"]
+    with cached_client.cache.disabled():
+        assert cached_client.get_booking_by_id(booking_id)["firstname"] == "Elsewhere"
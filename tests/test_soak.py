@@ -0,0 +1,67 @@
+import socket
+
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.load.soak import SoakRunner, Trend
+from core.clients.timing import TimingRegistry
+
+
+@pytest.fixture
+def soak_client(local_server):
+    client = ApiClient(base_url=local_server.url, timings=TimingRegistry(), attach_timings=False)
+    client.auth()
+    yield client
+    client.session.close()
+
+
+@allure.feature('Test soak mode')
+@allure.story('Mixed CRUD through one client stays bounded')
+def test_soak_bounded(soak_client, local_server):
+    bookings = len(local_server.store)
+    report = SoakRunner(soak_client, duration=3, interval=0.1, users=2, seed=1).run()
+
+    assert not report.failed, report.to_text()
+    assert report.requests > 50
+    assert all(trend.judged for trend in report.trends.values()), report.to_text()
+    assert report.warmup_samples > 0
+    assert len(local_server.store) == bookings
+
+
+@allure.feature('Test soak mode')
+@allure.story('Memory and sockets kept per response fail the soak and name the allocation site')
+def test_soak_detects_leak(soak_client):
+    leaked = []
+
+    def leak(response, *args, **kwargs):
+        leaked.append(bytearray(16384))
+        if len(leaked) % 3 == 0:
+            leaked.append(socket.socket())
+
+    soak_client.session.hooks["response"].append(leak)
+    try:
+        report = SoakRunner(soak_client, duration=3, interval=0.1, users=2, seed=1).run()
+    finally:
+        for item in leaked:
+            if isinstance(item, socket.socket):
+                item.close()
+
+    assert report.failed
+    assert report.trends["memory"].unbounded and report.trends["sockets"].unbounded, report.to_text()
+    assert not report.trends["connections"].unbounded
+    assert any(site["site"].endswith(f"{__file__}:{leak.__code__.co_firstlineno + 1}") for site in report.top_sites)
+    assert "UNBOUNDED" in report.to_text()
+
+
+@allure.feature('Test soak mode')
+@allure.story('Growth that levels off is not a leak')
+def test_trend_plateau():
+    plateau = Trend("memory", [(index, min(index, 10) * 1000) for index in range(30)], max_growth=500)
+    rising = Trend("memory", [(index, index * 1000) for index in range(30)], max_growth=500)
+    too_few = Trend("memory", [(index, index * 1000) for index in range(5)], max_growth=500)
+
+    assert plateau.judged and not plateau.rising and not plateau.unbounded
+    assert rising.unbounded and rising.slope == pytest.approx(1000)
+    assert not too_few.judged and not too_few.unbounded
+    assert not Trend("memory", [(index, index) for index in range(30)], max_growth=500, max_slope=2).unbounded
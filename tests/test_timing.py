@@ -0,0 +1,103 @@
+import json
+import socket
+
+import allure
+import pytest
+from urllib3.util import connection
+
+from core.clients.api_client import ApiClient
+from core.clients.timing import TimingRegistry, endpoint_label, timing_registry
+
+
+@allure.feature('Test timings')
+@allure.story('Endpoint labels collapse booking ids')
+@pytest.mark.parametrize("method, path, label", [
+    ("get", "/booking/42", "GET /booking/{id}"),
+    ("post", "/booking", "POST /booking"),
+    ("get", "/booking?firstname=Jim", "GET /booking"),
+])
+def test_endpoint_label(method, path, label):
+    assert endpoint_label(method, path) == label
+
+
+@allure.feature('Test timings')
+@allure.story('Phases and bytes are aggregated per endpoint')
+def test_timings_aggregated(local_server, generate_random_booking_data):
+    timings = TimingRegistry()
+    client = ApiClient(base_url=local_server.url, timings=timings, attach_timings=False)
+
+    booking_id = client.create_booking(generate_random_booking_data).json()["bookingid"]
+    for _ in range(3):
+        client.get_booking_by_id(booking_id)
+
+    summary = timings.summary()
+    get_by_id = summary["GET /booking/{id}"]
+    assert get_by_id["count"] == 3
+    assert get_by_id["bytes_in"] > 0
+    assert get_by_id["phases"]["decode"]["count"] == 3
+    assert get_by_id["phases"]["server"]["max_ms"] > 0
+    assert summary["POST /booking"]["bytes_out"] == len(json.dumps(generate_random_booking_data))
+    # The werkzeug stand-in closes every connection, so each request pays a connect
+    assert get_by_id["phases"]["connect"]["min_ms"] > 0
+
+
+@allure.feature('Test timings')
+@allure.story('A connect timeout on one address moves on to the next')
+def test_connect_next_address(local_server, mocker):
+    port = int(local_server.url.rsplit(":", 1)[1])
+    mocker.patch("core.clients.timing.socket.getaddrinfo", return_value=[
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.1", port)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port)),
+    ])
+    create_connection = connection.create_connection
+
+    def connect(address, *args, **kwargs):
+        if address[0] == "192.0.2.1":
+            raise socket.timeout("timed out")
+        return create_connection(address, *args, **kwargs)
+
+    mocker.patch("urllib3.util.connection.create_connection", side_effect=connect)
+    timings = TimingRegistry()
+
+    ApiClient(base_url=local_server.url, timings=timings, attach_timings=False).ping()
+    assert timings.summary()["GET /ping"]["count"] == 1
+
+
+@allure.feature('Test timings')
+@allure.story('Timings are attached to the current Allure step')
+@pytest.mark.full_reporting
+def test_timings_attached(local_server, mocker):
+    attach = mocker.patch("allure.attach")
+    client = ApiClient(base_url=local_server.url, timings=TimingRegistry())
+
+    client.ping()
+
+    body = json.loads(attach.call_args.args[0])
+    assert attach.call_args.kwargs["name"] == "Timings GET /ping"
+    assert body["total_ms"] >= body["server_ms"] > 0
+
+
+@allure.feature('Test timings')
+@allure.story('Session summary is written as JSON')
+def test_write_summary(local_server, tmp_path):
+    timings = TimingRegistry()
+    ApiClient(base_url=local_server.url, timings=timings, attach_timings=False).ping()
+
+    timings.write_json(tmp_path / "api-timings.json")
+
+    assert json.loads((tmp_path / "api-timings.json").read_text())["GET /ping"]["count"] == 1
+
+
+@allure.feature('Test timings')
+@allure.story('Only the api_client fixture records into the session summary')
+def test_session_registry_only_api_client(local_server, api_client):
+    def session_pings():
+        return timing_registry.summary().get("GET /ping", {}).get("count", 0)
+
+    before = session_pings()
+    client = ApiClient(base_url=local_server.url, attach_timings=False)
+    client.ping()
+
+    assert client.timings.summary()["GET /ping"]["count"] == 1
+    assert session_pings() == before
+    assert api_client.timings is timing_registry
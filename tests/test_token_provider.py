@@ -0,0 +1,91 @@
+import threading
+import time
+
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.clients.token_provider import TokenProvider
+
+
+class CountingFetch:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return f"token-{self.calls}"
+
+
+@pytest.fixture
+def fetch():
+    return CountingFetch()
+
+
+@allure.feature('Test token provider')
+@allure.story('Token is cached across providers for the same base URL and user')
+def test_token_cached_on_disk(tmp_path, fetch):
+    first = TokenProvider("http://booker.test", fetch, cache_dir=tmp_path)
+    second = TokenProvider("http://booker.test", fetch, cache_dir=tmp_path)
+
+    assert first.get_token() == second.get_token() == "token-1"
+    assert fetch.calls == 1
+    assert TokenProvider("http://other.test", fetch, cache_dir=tmp_path).get_token() == "token-2"
+
+
+@allure.feature('Test token provider')
+@allure.story('Expired token is fetched again')
+def test_token_ttl(tmp_path, fetch):
+    provider = TokenProvider("http://booker.test", fetch, cache_dir=tmp_path, ttl=0)
+
+    provider.get_token()
+    provider.get_token()
+
+    assert fetch.calls == 2
+
+
+@allure.feature('Test token provider')
+@allure.story('Concurrent workers share one /auth call')
+def test_concurrent_fetch_coalesced(tmp_path):
+    fetch = CountingFetch(delay=0.05)
+    providers = [TokenProvider("http://booker.test", fetch, cache_dir=tmp_path) for _ in range(8)]
+    tokens = []
+    threads = [threading.Thread(target=lambda p=provider: tokens.append(p.get_token())) for provider in providers]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert set(tokens) == {"token-1"}
+
+
+@allure.feature('Test token provider')
+@allure.story('Stale token is refreshed only once')
+def test_refresh_coalesced(tmp_path, fetch):
+    first = TokenProvider("http://booker.test", fetch, cache_dir=tmp_path)
+    second = TokenProvider("http://booker.test", fetch, cache_dir=tmp_path)
+    stale = first.get_token()
+
+    assert first.refresh(stale) == "token-2"
+    assert second.refresh(stale) == "token-2"
+    assert fetch.calls == 2
+
+
+@allure.feature('Test token provider')
+@allure.story('ApiClient refreshes the token once on 403')
+def test_api_client_refreshes_on_forbidden(tmp_path, fetch, mocker):
+    client = ApiClient(base_url="http://booker.test", attach_timings=False)
+    client.auth(TokenProvider("http://booker.test", fetch, cache_dir=tmp_path))
+    forbidden, ok = mocker.Mock(status_code=403), mocker.Mock(status_code=200)
+    ok.json.return_value = {"firstname": "Jim"}
+    get = mocker.patch.object(client.session, 'get', side_effect=[forbidden, ok])
+
+    assert client.get_booking_by_id(1) == {"firstname": "Jim"}
+    assert get.call_count == 2
+    assert client.session.headers["Authorization"] == "Bearer token-2"
@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import allure
+import pytest
+
+from core.clients.api_client import ApiClient
+from core.clients.transport import build_retry
+from core.settings.config import EndpointTimeouts
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if KeepAliveHandler.failures_left > 0:
+            KeepAliveHandler.failures_left -= 1
+            self._reply(503, {"error": "Service Unavailable"})
+        else:
+            self._reply(200, {"firstname": "Jim", "authorization": self.headers.get("Authorization")})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def keep_alive_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    KeepAliveHandler.failures_left = 0
+
+
+@allure.feature('Test transport')
+@allure.story('Requests reuse one pooled connection')
+def test_connection_reused(keep_alive_url):
+    client = ApiClient(base_url=keep_alive_url, transport="requests")
+    client.session.headers.update({"Authorization": "Bearer token"})
+
+    for _ in range(5):
+        booking = client.get_booking_by_id(1)
+
+    stats = client.connection_stats.snapshot()
+    assert stats == {"requests": 5, "new_connections": 1, "reused_connections": 4}
+    assert booking["authorization"] == "Bearer token"
+
+
+@allure.feature('Test transport')
+@allure.story('Idempotent requests are retried on 5xx')
+def test_get_retried_on_service_unavailable(keep_alive_url):
+    KeepAliveHandler.failures_left = 2
+    client = ApiClient(base_url=keep_alive_url, max_retries=build_retry(backoff_factor=0))
+
+    assert client.get_booking_by_id(1)["firstname"] == "Jim"
+    assert KeepAliveHandler.failures_left == 0
+
+
+@allure.feature('Test transport')
+@allure.story('Timeouts are resolved per endpoint')
+def test_timeout_for_endpoint():
+    client = ApiClient(base_url="http://booker.test", timeouts={"AUTH_ENDPOINT": (1, 2)})
+    assert client.timeout_for("/booking/1") == EndpointTimeouts.BOOKING_ENDPOINT.value
+    assert client.timeout_for("/auth") == (1, 2)
+
+
+@allure.feature('Test transport')
+@allure.story('POST is not retried')
+def test_post_not_retried():
+    retry = build_retry()
+    assert "POST" not in retry.allowed_methods